@@ -146,6 +146,30 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Simulation worker pool (ASGI simulate/optimize endpoints)
+# Processes in the shared pool; each request's games are split into chunks
+# of at most SIMULATION_CHUNK_GAMES so a cancelled request frees the pool
+# within one chunk.
+SIMULATION_WORKERS = env.int("SIMULATION_WORKERS", default=os.cpu_count() or 1)
+SIMULATION_CHUNK_GAMES = env.int("SIMULATION_CHUNK_GAMES", default=500)
+# Scheduler (simulator.services.scheduler): cores this process may spend on
+# simulations/optimizations at once (set to cores / gunicorn workers), jobs
+# allowed to wait, running + queued jobs per user, and the longest wait (s)
+SIMULATION_CORE_BUDGET = env.int("SIMULATION_CORE_BUDGET", default=os.cpu_count() or 1)
+SIMULATION_MAX_QUEUE = env.int("SIMULATION_MAX_QUEUE", default=32)
+SIMULATION_MAX_PER_USER = env.int("SIMULATION_MAX_PER_USER", default=2)
+SIMULATION_QUEUE_TIMEOUT = env.float("SIMULATION_QUEUE_TIMEOUT", default=30.0)
+# Longest a simulation/optimization may run (s); a request's time_budget_ms
+# can only shorten it. Past it, finished chunks are returned as a partial result
+SIMULATION_MAX_SECONDS = env.float("SIMULATION_MAX_SECONDS", default=60.0)
+# Most games a time-budgeted request (time_budget_ms without num_games) plays
+SIMULATION_BUDGET_MAX_GAMES = env.int("SIMULATION_BUDGET_MAX_GAMES", default=1_000_000)
+# Largest run the engine selector hands to the batch engine on threads in the
+# web process (batches of SIMULATION_BATCH_GAMES); larger runs and time-budget
+# runs go to an engine on the process pool (see simulator/services/engines.py)
+SIMULATION_THREAD_MAX_GAMES = env.int("SIMULATION_THREAD_MAX_GAMES", default=20000)
+SIMULATION_BATCH_GAMES = env.int("SIMULATION_BATCH_GAMES", default=2000)
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
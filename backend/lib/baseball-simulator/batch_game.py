@@ -0,0 +1,434 @@
+"""
+Vectorized batch engine: plays many games at once with NumPy arrays.
+
+Follows the same rules as baseball.Game (steals before every plate
+appearance, the same base-running probabilities, sac flies and double plays
+on balls in play), but advances every unfinished game by one plate
+appearance per step, so a batch of thousands of games costs about as many
+array operations as one game. Base states are 3-bit masks (1 = runner on
+1st, 2 = on 2nd, 4 = on 3rd) and every transition is a table lookup.
+
+NumPy releases the GIL inside its array kernels, so batches also run well on
+threads: ThreadedBatchGame plays shards on a ThreadPoolExecutor in the
+calling process (no pool start-up, nothing pickled), each shard with its own
+Generator over one shared read-only probability table. Every batch argument
+pickles, so the same runner also drives a ProcessPoolExecutor; with a
+shared_table the batches carry only row indices into a probability table in
+shared memory (see parallel_game.play_games_chunk_shared).
+"""
+
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+from parallel_game import ChunkSizer
+
+# Outcome order of Batter.probs
+STRIKE_OUT, IN_PLAY_OUT, WALK, SINGLE, DOUBLE, TRIPLE, HOMERUN = range(7)
+
+
+def _transition_tables():
+    """
+    (next_bases, runs) of shape (7, 8, 2, 2): outcome, base state and two
+    base-running draws. For a single the draws are "runner scores from 2nd"
+    and "runner goes 1st to 3rd"; for a double the first draw is "runner
+    scores from 1st". Outs and the in-play-out extras are handled separately.
+    """
+    next_bases = np.zeros((7, 8, 2, 2), dtype=np.intp)
+    runs = np.zeros((7, 8, 2, 2), dtype=np.int64)
+    for bases in range(8):
+        on_base = bin(bases).count("1")
+        next_bases[STRIKE_OUT, bases] = bases
+        next_bases[IN_PLAY_OUT, bases] = bases
+        next_bases[WALK, bases] = (1, 3, 3, 7, 5, 7, 7, 7)[bases]
+        runs[WALK, bases] = 1 if bases == 7 else 0
+        next_bases[TRIPLE, bases] = 4
+        runs[TRIPLE, bases] = on_base
+        next_bases[HOMERUN, bases] = 0
+        runs[HOMERUN, bases] = on_base + 1
+
+    # Single: [bases][scores from 2nd][1st to 3rd] -> (next, runs)
+    single = {
+        0: lambda a, b: (1, 0),
+        1: lambda a, b: (5 if b else 3, 0),
+        2: lambda a, b: (1, 1) if a else (5, 0),
+        3: lambda a, b: ((5 if b else 3), 1) if a else (7, 0),
+        4: lambda a, b: (1, 1),
+        5: lambda a, b: (5 if b else 3, 1),
+        6: lambda a, b: (1, 2) if a else (5, 1),
+        7: lambda a, b: ((5 if b else 3), 2) if a else (7, 1),
+    }
+    # Double: [bases][scores from 1st] -> (next, runs)
+    double = {
+        0: lambda c: (2, 0),
+        1: lambda c: (2, 1) if c else (6, 0),
+        2: lambda c: (2, 1),
+        3: lambda c: (2, 2) if c else (6, 1),
+        4: lambda c: (2, 1),
+        5: lambda c: (2, 2) if c else (6, 1),
+        6: lambda c: (2, 2),
+        7: lambda c: (2, 3) if c else (6, 2),
+    }
+    for bases in range(8):
+        for a in (0, 1):
+            for b in (0, 1):
+                next_bases[SINGLE, bases, a, b], runs[SINGLE, bases, a, b] = single[bases](a, b)
+                next_bases[DOUBLE, bases, a, b], runs[DOUBLE, bases, a, b] = double[bases](a)
+    for table in (next_bases, runs):
+        table.setflags(write=False)
+    return next_bases, runs
+
+
+NEXT_BASES, RUNS = _transition_tables()
+# Ball in play with runners on: runners advance (sac fly / bunt) ...
+SAC_NEXT = np.array([0, 2, 4, 6, 0, 2, 4, 6], dtype=np.intp)
+SAC_RUNS = np.array([0, 0, 0, 0, 1, 1, 1, 1], dtype=np.int64)
+# ... or a double play (the run from 3rd with a runner on 1st counts only
+# when the inning goes on)
+DP_NEXT = np.array([0, 0, 0, 4, 0, 0, 2, 6], dtype=np.intp)
+DP_RUNS = np.array([0, 0, 0, 0, 0, 1, 0, 0], dtype=np.int64)
+
+
+class BatchGame:
+    """Plays batches of games for one lineup; the same rules as baseball.Game."""
+
+    def __init__(
+        self,
+        probabilities,
+        nr_innings=9,
+        prob_advance_runner_on_out=0.2,
+        prob_double_play=0.4,
+        prob_steal_2nd_base=0.05,
+        prob_steal_3rd_base=0.01,
+        prob_steal_home=0.001,
+        prob_1st_to_3rd=0.2,
+        prob_score_from_2nd_on_single=0.5,
+        prob_score_from_1st_on_double=0.3,
+    ):
+        """
+        Args:
+            probabilities: (9, 7) outcome probabilities in batting order
+                           (rows of Batter.probs; normalized here)
+            nr_innings, prob_*: As for baseball.Game
+        """
+        probs = np.asarray(probabilities, dtype=np.float64)
+        if probs.shape != (9, 7):
+            raise ValueError(f"probabilities must have shape (9, 7), got {probs.shape}")
+        cumulative = np.cumsum(probs, axis=1)
+        cumulative /= cumulative[:, -1:]
+        # A uniform draw u picks the outcome count(u >= cumulative)
+        cumulative[:, -1] = np.inf
+        self.cumulative = cumulative
+        self.nr_innings = nr_innings
+        self.prob_advance_runner_on_out = prob_advance_runner_on_out
+        self.prob_double_play = prob_double_play
+        self.prob_steal_2nd_base = prob_steal_2nd_base
+        self.prob_steal_3rd_base = prob_steal_3rd_base
+        self.prob_steal_home = prob_steal_home
+        # Per-outcome probability of each base-running draw (see _transition_tables)
+        self.first_draw = np.zeros(7)
+        self.first_draw[SINGLE] = prob_score_from_2nd_on_single
+        self.first_draw[DOUBLE] = prob_score_from_1st_on_double
+        self.second_draw = np.zeros(7)
+        self.second_draw[SINGLE] = prob_1st_to_3rd
+
+    def play(self, num_games, rng):
+        """
+        Play num_games games.
+
+        Args:
+            num_games: Number of games
+            rng: numpy.random.Generator (not shared with other threads)
+
+        Returns:
+            np.ndarray of int64 scores
+        """
+        final = np.zeros(num_games, dtype=np.int64)
+        game_ids = np.arange(num_games)
+        score = np.zeros(num_games, dtype=np.int64)
+        bases = np.zeros(num_games, dtype=np.intp)
+        outs = np.zeros(num_games, dtype=np.int64)
+        inning = np.zeros(num_games, dtype=np.int64)
+        batter = np.zeros(num_games, dtype=np.intp)
+
+        while game_ids.size:
+            draws = rng.random((7, game_ids.size))
+
+            # Steals before the pitch: 1st -> 2nd, 2nd -> 3rd (double steal
+            # with a runner on 1st), 3rd -> home
+            steal = ((bases & 3) == 1) & (draws[0] < self.prob_steal_2nd_base)
+            bases = bases + steal
+            steal = ((bases & 6) == 2) & (draws[1] < self.prob_steal_3rd_base)
+            bases = np.where(steal, bases + np.where(bases & 1, 3, 2), bases)
+            steal = ((bases & 4) != 0) & (draws[2] < self.prob_steal_home)
+            score += steal
+            bases = bases - 4 * steal
+
+            # Plate appearance
+            outcome = (draws[3][:, None] >= self.cumulative[batter]).sum(axis=1)
+            first = draws[4] < self.first_draw[outcome]
+            second = draws[5] < self.second_draw[outcome]
+            new_bases = NEXT_BASES[outcome, bases, first.astype(np.intp), second.astype(np.intp)]
+            score += RUNS[outcome, bases, first.astype(np.intp), second.astype(np.intp)]
+            outs += outcome <= IN_PLAY_OUT
+
+            # Ball in play with runners on and the inning still going
+            in_play = (outcome == IN_PLAY_OUT) & (bases > 0) & (outs < 3)
+            sac = in_play & (draws[6] < self.prob_advance_runner_on_out)
+            double_play = in_play & ~sac & (
+                draws[6] < self.prob_advance_runner_on_out + self.prob_double_play)
+            new_bases = np.where(sac, SAC_NEXT[bases], new_bases)
+            score += sac * SAC_RUNS[bases]
+            outs += double_play
+            score += double_play * (outs < 3) * DP_RUNS[bases]
+            bases = np.where(double_play, DP_NEXT[bases], new_bases)
+
+            batter = (batter + 1) % 9
+            inning_over = outs >= 3
+            inning += inning_over
+            bases[inning_over] = 0
+            outs[inning_over] = 0
+
+            finished = inning >= self.nr_innings
+            if finished.any():
+                final[game_ids[finished]] = score[finished]
+                keep = ~finished
+                game_ids, score, bases, outs, inning, batter = (
+                    game_ids[keep], score[keep], bases[keep], outs[keep], inning[keep], batter[keep])
+        return final
+
+
+def play_batch(args):
+    """
+    Play one batch of games (worker function for threads or processes).
+
+    Args:
+        args: Tuple of (probabilities, num_games, seed, game_params) where
+              seed is anything numpy.random.default_rng accepts (a
+              SeedSequence per batch keeps batches independent)
+
+    Returns:
+        list: Scores of the games in this batch
+    """
+    probabilities, num_games, seed, game_params = args
+    engine = BatchGame(probabilities, **game_params)
+    return engine.play(num_games, np.random.default_rng(seed)).tolist()
+
+
+def play_batch_shared(args):
+    """
+    Play one batch from a probability table in shared memory.
+
+    Args:
+        args: Tuple of (shared_table, lineup_rows, num_games, seed,
+              game_params) where shared_table is (block name, number of
+              rows, byte offset of the (rows, 7) float64 probability table)
+
+    Returns:
+        list: Scores of the games in this batch
+    """
+    (name, num_rows, offset), lineup_rows, num_games, seed, game_params = args
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        table = np.ndarray((num_rows, 7), dtype=np.float64, buffer=shm.buf,
+                           offset=offset)
+        # Fancy indexing copies the 9 rows out of the block
+        probabilities = table[list(lineup_rows)]
+    finally:
+        # Views into the buffer must be gone before it can be closed
+        table = None
+        shm.close()
+    return play_batch((probabilities, num_games, seed, game_params))
+
+
+class ThreadedBatchGame:
+    """
+    Runs the batch engine on a thread pool inside the calling process.
+
+    Same surface as parallel_game.ParallelGame (play / get_scores /
+    games_played / partial), but shards share one read-only probability
+    table instead of pickling a lineup per chunk, and no processes start.
+    """
+
+    def __init__(self, probabilities, num_games=10000, num_threads=None, seed=None,
+                 batch_games=2000, executor=None, stream_position=0,
+                 shared_table=None, lineup_rows=None, **game_params):
+        """
+        Args:
+            probabilities: (9, 7) outcome probabilities in batting order
+            num_games: Total number of games to simulate
+            num_threads: Batches in flight at once (None = one per CPU)
+            seed: Optional seed; the same seed gives the same scores
+            batch_games: Largest batch (the deadline is checked between batches)
+            executor: Optional shared executor - a ThreadPoolExecutor, or a
+                      ProcessPoolExecutor to run batches in other processes
+                      (a private thread pool is started and stopped otherwise)
+            stream_position: Batches of this seed already played (an earlier
+                             run's stream_position); they are skipped, so a
+                             continued run only plays new games
+            shared_table: Optional (name, rows, offset) of a probability table
+                          in shared memory; batches then carry lineup_rows
+                          instead of the probabilities (for process pools)
+            lineup_rows: Table rows of the 9 batters when using shared_table
+            **game_params: nr_innings / prob_* as for baseball.Game
+        """
+        if shared_table is not None and lineup_rows is None:
+            raise ValueError("lineup_rows is required with shared_table")
+        self.shared_table = None if shared_table is None else tuple(shared_table)
+        self.lineup_rows = None if lineup_rows is None else tuple(lineup_rows)
+        self.probabilities = np.array(probabilities, dtype=np.float64)
+        self.probabilities.setflags(write=False)
+        self.num_games = num_games
+        self.num_threads = num_threads or 1
+        if num_threads is None:
+            import os
+            self.num_threads = os.cpu_count() or 1
+        self.seed = seed
+        self.batch_games = batch_games
+        self.executor = executor
+        self.game_params = game_params
+        # Batches draw successive children of one SeedSequence, so however the
+        # games are split the stream never repeats
+        self.seed_sequence = np.random.SeedSequence(seed, n_children_spawned=stream_position)
+        self.scores = None
+
+    @property
+    def stream_position(self):
+        """Batches handed out from this seed so far (pass it on to continue the stream)."""
+        return self.seed_sequence.n_children_spawned
+
+    @property
+    def worker(self):
+        """Module-level function that plays one batch."""
+        return play_batch if self.shared_table is None else play_batch_shared
+
+    def plan_chunks(self, num_chunks=None):
+        """
+        Split the games into batch arguments, none larger than batch_games.
+        Each batch gets its own child SeedSequence.
+
+        The default split depends only on num_games and batch_games, never on
+        num_threads, so a seed gives the same scores however many threads play.
+        """
+        if num_chunks is None:
+            num_chunks = math.ceil(self.num_games / max(1, self.batch_games))
+        num_chunks = max(1, min(num_chunks, self.num_games))
+        sizes = [self.num_games // num_chunks + (1 if i < self.num_games % num_chunks else 0)
+                 for i in range(num_chunks)]
+        sizes = [size for size in sizes if size > 0]
+        seeds = self.seed_sequence.spawn(len(sizes))
+        return [self._batch_args(size, seq) for size, seq in zip(sizes, seeds)]
+
+    def chunk_args(self, num_games):
+        """Argument of one more batch of num_games, with the next child seed."""
+        return self._batch_args(num_games, self.seed_sequence.spawn(1)[0])
+
+    def _batch_args(self, num_games, seed):
+        """Worker argument of one batch; only row indices when sharing memory."""
+        if self.shared_table is None:
+            return (self.probabilities, num_games, seed, self.game_params)
+        return (self.shared_table, self.lineup_rows, num_games, seed,
+                self.game_params)
+
+    def play(self, deadline=None):
+        """
+        Play every batch, at most num_threads at a time.
+
+        Args:
+            deadline: Optional time.monotonic() value; batches not finished
+                      when it passes are dropped (see games_played / partial)
+        """
+        chunks = self.plan_chunks()
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.num_threads)
+        results = [None] * len(chunks)
+        pending = {}
+        next_index = 0
+        try:
+            while next_index < len(chunks) or pending:
+                while next_index < len(chunks) and len(pending) < self.num_threads:
+                    pending[executor.submit(self.worker, chunks[next_index])] = next_index
+                    next_index += 1
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if self.executor is None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self.collect(result for result in results if result is not None)
+
+    def play_for(self, deadline, probe_games=500, **sizer_options):
+        """
+        Play as many games as fit before deadline, at most num_games.
+
+        Same scheme as ParallelGame.play_for: num_threads batches in flight,
+        each sized by a ChunkSizer from the measured throughput; batches
+        still running at the deadline are dropped.
+
+        Args:
+            deadline: time.monotonic() value to stop by
+            probe_games: Size of the first batches (before any measurement)
+            **sizer_options: Other ChunkSizer options
+        """
+        sizer = ChunkSizer(deadline, max_games=self.num_games,
+                           probe_games=probe_games, **sizer_options)
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.num_threads)
+        results = []
+        pending = {}
+        try:
+            while True:
+                while len(pending) < self.num_threads:
+                    games = sizer.next_chunk()
+                    if games <= 0:
+                        break
+                    future = executor.submit(self.worker, self.chunk_args(games))
+                    pending[future] = (games, time.monotonic())
+                if not pending:
+                    break
+                timeout = max(0.0, deadline - time.monotonic())
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    games, submitted = pending.pop(future)
+                    results.append(future.result())
+                    sizer.record(games, time.monotonic() - submitted)
+        finally:
+            for future in pending:
+                future.cancel()
+            if self.executor is None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self.collect(results)
+
+    def collect(self, results):
+        """Flatten per-batch score lists into self.scores."""
+        self.scores = []
+        for batch_scores in results:
+            self.scores.extend(batch_scores)
+
+    @property
+    def games_played(self):
+        """Number of games actually played (fewer than num_games when cut off)."""
+        return len(self.get_scores())
+
+    @property
+    def partial(self):
+        """True when a deadline stopped the run before every game was played."""
+        return self.games_played < self.num_games
+
+    def get_scores(self):
+        """
+        Get list of all game scores.
+
+        Returns:
+            list: Scores from all simulated games
+        """
+        if self.scores is None:
+            raise RuntimeError("Must call play() before get_scores()")
+        return self.scores
@@ -0,0 +1,189 @@
+"""
+Exact score distribution of a lineup, without simulating games.
+
+A half-inning is a Markov chain over (outs, base state) that moves one plate
+appearance at a time, with the same rules and probabilities as
+baseball.Game (the transition tables come from batch_game). Dynamic
+programming over that chain gives, for every leadoff hitter, the exact
+distribution of runs scored and of who leads off the next inning; chaining
+nr_innings of those gives the distribution of the final score. Runs in one
+inning are capped at MAX_INNING_RUNS (the mass above it is far below
+TOLERANCE for any real lineup).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from batch_game import (DOUBLE, DP_NEXT, DP_RUNS, IN_PLAY_OUT, NEXT_BASES,
+                        RUNS, SAC_NEXT, SAC_RUNS, SINGLE)
+
+MAX_INNING_RUNS = 40
+TOLERANCE = 1e-12
+MAX_PLATE_APPEARANCES = 10000
+# Rows of a transition matrix: 24 (outs, bases) states, then "inning over"
+INNING_OVER = 24
+# Most runs one plate appearance can add: a steal of home, then a grand slam
+MAX_PA_RUNS = 5
+
+DEFAULT_GAME_PARAMS = {
+    'nr_innings': 9,
+    'prob_advance_runner_on_out': 0.2,
+    'prob_double_play': 0.4,
+    'prob_steal_2nd_base': 0.05,
+    'prob_steal_3rd_base': 0.01,
+    'prob_steal_home': 0.001,
+    'prob_1st_to_3rd': 0.2,
+    'prob_score_from_2nd_on_single': 0.5,
+    'prob_score_from_1st_on_double': 0.3,
+}
+
+
+def _steal_branches(bases, params):
+    """(bases, runs, probability) after the steal attempts before a pitch."""
+    branches = [(bases, 0, 1.0)]
+    steps = (
+        (lambda b: (b & 3) == 1, lambda b: b + 1, 0,
+         params['prob_steal_2nd_base']),
+        (lambda b: (b & 6) == 2, lambda b: b + (3 if b & 1 else 2), 0,
+         params['prob_steal_3rd_base']),
+        (lambda b: b & 4, lambda b: b - 4, 1, params['prob_steal_home']),
+    )
+    for applies, move, runs, prob in steps:
+        next_branches = []
+        for b, r, p in branches:
+            if applies(b) and prob > 0:
+                next_branches.append((move(b), r + runs, p * prob))
+                next_branches.append((b, r, p * (1 - prob)))
+            else:
+                next_branches.append((b, r, p))
+        branches = next_branches
+    return branches
+
+
+def plate_appearance_matrix(batter_probs, params):
+    """
+    Transition matrices of one plate appearance (steals included).
+
+    Returns:
+        Array T of shape (MAX_PA_RUNS + 1, 25, 24): T[d, to, from] is the
+        probability of moving from state `from` to `to` while scoring d runs;
+        state = outs * 8 + bases, row INNING_OVER absorbs the third out
+    """
+    probs = np.asarray(batter_probs, dtype=np.float64)
+    probs = probs / probs.sum()
+    first_draw = {SINGLE: params['prob_score_from_2nd_on_single'],
+                  DOUBLE: params['prob_score_from_1st_on_double']}
+    second_draw = {SINGLE: params['prob_1st_to_3rd']}
+    advance = params['prob_advance_runner_on_out']
+    double_play = params['prob_double_play']
+
+    matrix = np.zeros((MAX_PA_RUNS + 1, INNING_OVER + 1, INNING_OVER))
+
+    def add(outs, bases, runs, prob, source):
+        target = INNING_OVER if outs >= 3 else outs * 8 + bases
+        matrix[runs, target, source] += prob
+
+    for outs in range(3):
+        for start in range(8):
+            source = outs * 8 + start
+            for bases, steal_runs, p_steal in _steal_branches(start, params):
+                for outcome, p_outcome in enumerate(probs):
+                    if p_outcome == 0:
+                        continue
+                    p_first = first_draw.get(outcome, 0.0)
+                    p_second = second_draw.get(outcome, 0.0)
+                    for a, p_a in ((0, 1 - p_first), (1, p_first)):
+                        for b, p_b in ((0, 1 - p_second), (1, p_second)):
+                            p = p_steal * p_outcome * p_a * p_b
+                            if p == 0:
+                                continue
+                            new_bases = int(NEXT_BASES[outcome, bases, a, b])
+                            runs = steal_runs + int(RUNS[outcome, bases, a, b])
+                            new_outs = outs + (1 if outcome <= IN_PLAY_OUT else 0)
+                            if outcome == IN_PLAY_OUT and bases > 0 and new_outs < 3:
+                                add(new_outs, int(SAC_NEXT[bases]),
+                                    runs + int(SAC_RUNS[bases]), p * advance, source)
+                                dp_outs = new_outs + 1
+                                dp_runs = int(DP_RUNS[bases]) if dp_outs < 3 else 0
+                                add(dp_outs, int(DP_NEXT[bases]), runs + dp_runs,
+                                    p * double_play, source)
+                                p *= 1 - advance - double_play
+                            add(new_outs, new_bases, runs, p, source)
+    return matrix
+
+
+def inning_distribution(matrices, leadoff):
+    """
+    Runs scored in a half-inning and who leads off the next one.
+
+    Args:
+        matrices: plate_appearance_matrix of each batting-order slot
+        leadoff: Slot (0-8) leading off this inning
+
+    Returns:
+        Array of shape (9, MAX_INNING_RUNS + 1): [next leadoff, runs]
+    """
+    size = MAX_INNING_RUNS + 1
+    state = np.zeros((INNING_OVER, size))
+    state[0, 0] = 1.0
+    over = np.zeros((9, size))
+    for step in range(MAX_PLATE_APPEARANCES):
+        slot = (leadoff + step) % 9
+        moved = np.zeros((INNING_OVER + 1, size))
+        for runs, matrix in enumerate(matrices[slot]):
+            if runs == 0:
+                moved += matrix @ state
+            else:
+                moved[:, runs:] += matrix @ state[:, :-runs]
+                # runs past the cap stay at the cap
+                moved[:, -1] += matrix @ state[:, -runs:].sum(axis=1)
+        over[(slot + 1) % 9] += moved[INNING_OVER]
+        state = moved[:INNING_OVER]
+        if state.sum() < TOLERANCE:
+            return over
+    raise ValueError("Lineup never makes three outs; check the outcome probabilities.")
+
+
+@lru_cache(maxsize=128)
+def _score_distribution(lineup_probs, params_items):
+    params = dict(params_items)
+    matrices = [plate_appearance_matrix(probs, params) for probs in lineup_probs]
+    innings = [inning_distribution(matrices, leadoff) for leadoff in range(9)]
+    length = params['nr_innings'] * MAX_INNING_RUNS + 1
+    game = np.zeros((9, length))
+    game[0, 0] = 1.0
+    for _ in range(params['nr_innings']):
+        after = np.zeros((9, length))
+        for leadoff in range(9):
+            if not game[leadoff].any():
+                continue
+            for next_leadoff in range(9):
+                inning = innings[leadoff][next_leadoff]
+                if inning.any():
+                    after[next_leadoff] += np.convolve(game[leadoff], inning)[:length]
+        game = after
+    distribution = game.sum(axis=0)
+    distribution.setflags(write=False)
+    return distribution
+
+
+def score_distribution(lineup_probs, **game_params):
+    """
+    Exact probability of every final score.
+
+    Args:
+        lineup_probs: 9 rows of outcome probabilities (Batter.probs order)
+        **game_params: nr_innings / prob_* as for baseball.Game
+
+    Returns:
+        Read-only array p where p[s] is the probability of scoring s runs
+    """
+    params = dict(DEFAULT_GAME_PARAMS, **game_params)
+    key = tuple(tuple(float(p) for p in probs) for probs in lineup_probs)
+    return _score_distribution(key, tuple(sorted(params.items())))
+
+
+def expected_score(lineup_probs, **game_params):
+    """Exact expected runs per game."""
+    distribution = score_distribution(lineup_probs, **game_params)
+    return float(np.arange(len(distribution)) @ distribution)
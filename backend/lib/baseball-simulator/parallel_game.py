@@ -1,12 +1,22 @@
 """
 Parallel game simulator using multiprocessing for performance.
 Splits game simulations across multiple CPU cores for ~4x speedup on 4-core machines.
+
+Games are cut into several chunks per process and collected as they finish
+(imap_unordered), so one slow worker does not hold the others' results back;
+ParallelGame.iter_play streams the merged ScoreAggregate after every chunk.
 """
 
+import math
 import multiprocessing as mp
+import queue
+import time
+from collections import Counter
+from multiprocessing import shared_memory
 
 import numpy as np
 from baseball import Game
+from batter import Batter
 
 
 def play_single_game(lineup, game_params):
@@ -44,6 +54,170 @@ def play_games_chunk(args):
     return scores
 
 
+def play_games_chunk_shared(args):
+    """
+    Play a chunk of games from a probability table in shared memory.
+
+    Workers attach to the published block by name and build the lineup from
+    row indices, so nothing but a few integers is pickled per chunk.
+
+    Args:
+        args: Tuple of (shared_table, lineup_rows, num_games, game_params)
+              where shared_table is (block name, number of rows, byte offset
+              of the (rows, 7) float64 probability table)
+
+    Returns:
+        list: Scores from all games in this chunk
+    """
+    (name, num_rows, offset), lineup_rows, num_games, game_params = args
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        table = np.ndarray((num_rows, 7), dtype=np.float64, buffer=shm.buf,
+                           offset=offset)
+        lineup = [Batter(probabilities=table[row], name=str(row))
+                  for row in lineup_rows]
+        return play_games_chunk((lineup, num_games, game_params))
+    finally:
+        # Views into the buffer must be gone before it can be closed
+        table = lineup = None
+        shm.close()
+
+
+class ScoreAggregate:
+    """
+    Mergeable summary of game scores: count, moment sums and a histogram.
+
+    Aggregates of disjoint runs merge exactly, so chunks (or whole runs) can
+    be combined in any order without keeping every score.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.histogram = Counter()
+
+    def add(self, scores):
+        """Fold a list of game scores in; returns self."""
+        self.count += len(scores)
+        self.total += sum(scores)
+        self.total_sq += sum(score * score for score in scores)
+        self.histogram.update(scores)
+        return self
+
+    @classmethod
+    def from_histogram(cls, histogram):
+        """Aggregate of the games a {score: games} histogram counts (keys
+        may be strings, e.g. a histogram stored as JSON)."""
+        aggregate = cls()
+        for score, games in histogram.items():
+            score, games = int(score), int(games)
+            aggregate.count += games
+            aggregate.total += score * games
+            aggregate.total_sq += score * score * games
+            aggregate.histogram[score] += games
+        return aggregate
+
+    def merge(self, other):
+        """Fold another aggregate in; returns self."""
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.histogram.update(other.histogram)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std_dev(self):
+        """Sample standard deviation (n - 1), like statistics.stdev."""
+        if self.count < 2:
+            return 0.0
+        variance = ((self.total_sq - self.total * self.total / self.count)
+                    / (self.count - 1))
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def standard_error(self):
+        """Standard error of the mean; callers can stop once it is small enough."""
+        return self.std_dev / math.sqrt(self.count) if self.count else math.inf
+
+    @property
+    def median(self):
+        """Median from the histogram (mean of the two middle scores when even)."""
+        if not self.count:
+            return 0.0
+        middle = ((self.count - 1) // 2, self.count // 2)
+        values = []
+        seen = 0
+        for score in sorted(self.histogram):
+            seen += self.histogram[score]
+            while len(values) < 2 and middle[len(values)] < seen:
+                values.append(score)
+            if len(values) == 2:
+                break
+        return (values[0] + values[1]) / 2
+
+    @property
+    def min_score(self):
+        return min(self.histogram) if self.histogram else None
+
+    @property
+    def max_score(self):
+        return max(self.histogram) if self.histogram else None
+
+
+class ChunkSizer:
+    """
+    Sizes chunks for a run that plays as many games as fit before a deadline.
+
+    Each worker first plays a small probe chunk; after that every chunk is
+    sized from the measured games per second to take about target_seconds,
+    shrinking as the deadline nears so the last chunks end before it.
+    """
+
+    def __init__(self, deadline, max_games=None, probe_games=20,
+                 target_seconds=0.1, margin_seconds=0.02):
+        """
+        Args:
+            deadline: time.monotonic() value by which every chunk should end
+            max_games: Optional cap on the games handed out in total
+            probe_games: Size of the chunks played before any measurement
+            target_seconds: Intended duration of one chunk
+            margin_seconds: Time kept free before the deadline
+        """
+        self.deadline = deadline
+        self.max_games = max_games
+        self.probe_games = probe_games
+        self.target_seconds = target_seconds
+        self.margin_seconds = margin_seconds
+        self.rate = None  # games per second on one worker
+        self.submitted = 0
+
+    def next_chunk(self):
+        """Games for the next chunk; 0 means stop submitting."""
+        remaining = self.deadline - time.monotonic() - self.margin_seconds
+        if remaining <= 0:
+            return 0
+        if self.rate is None:
+            games = self.probe_games
+        else:
+            games = int(self.rate * min(self.target_seconds, remaining))
+        if self.max_games is not None:
+            games = min(games, self.max_games - self.submitted)
+        games = max(0, games)
+        self.submitted += games
+        return games
+
+    def record(self, games, seconds):
+        """Feed back one finished chunk (smoothed, so one slow chunk does not
+        dominate)."""
+        rate = games / max(seconds, 1e-6)
+        self.rate = rate if self.rate is None else (self.rate + rate) / 2
+
+
 class ParallelGame:
     """
     Runs baseball game simulations in parallel across multiple CPU cores.
@@ -63,18 +237,27 @@ class ParallelGame:
         prob_score_from_2nd_on_single=0.5,
         prob_score_from_1st_on_double=0.3,
         num_processes=None,
+        shared_table=None,
+        lineup_rows=None,
     ):
         """
         Initialize parallel game simulator.
 
         Args:
-            lineup: List of 9 Batter objects
+            lineup: List of 9 Batter objects (None when using shared_table)
             num_games: Total number of games to simulate
             nr_innings: Number of innings per game (default 9)
             prob_*: Various probability parameters for game events
             num_processes: Number of CPU cores to use (None = use all available)
+            shared_table: Optional (name, rows, offset) of a probability table
+                          in shared memory; workers attach to it by name
+            lineup_rows: Table rows of the 9 batters when using shared_table
         """
+        if shared_table is not None and lineup_rows is None:
+            raise ValueError("lineup_rows is required with shared_table")
         self.lineup = lineup
+        self.shared_table = shared_table
+        self.lineup_rows = lineup_rows
         self.num_games = num_games
 
         # Store game parameters
@@ -99,30 +282,169 @@ class ParallelGame:
         # Store scores after playing
         self.scores = None
 
-    def play(self):
+    # Chunks per process for load balancing, and the smallest chunk worth
+    # the per-task overhead
+    CHUNKS_PER_PROCESS = 4
+    MIN_CHUNK_GAMES = 100
+
+    def play(self, deadline=None, chunk_games=None):
         """
         Run all game simulations in parallel across multiple CPU cores.
+
+        Args:
+            deadline: Optional time.monotonic() value, checked between chunks;
+                      when it passes, the pool is terminated and only the
+                      finished chunks are kept (see games_played / partial)
+            chunk_games: Optional largest chunk (see auto_chunk_count)
+        """
+        for _ in self.iter_play(deadline=deadline, chunk_games=chunk_games):
+            pass
+
+    def iter_play(self, deadline=None, chunk_games=None):
+        """
+        Play the games chunk by chunk, yielding the running ScoreAggregate
+        after every finished chunk (for progress reporting or early stopping).
+
+        Chunks are collected in completion order, so one slow worker never
+        holds back the others. Closing the generator early (break) or
+        passing the deadline terminates the pool; get_scores() then holds the
+        games played so far.
+
+        Args:
+            deadline: Optional time.monotonic() value to stop by
+            chunk_games: Optional largest chunk (see auto_chunk_count)
+
+        Yields:
+            ScoreAggregate over every game finished so far (the same object,
+            updated in place)
+        """
+        chunks = self.plan_chunks(self.auto_chunk_count(chunk_games))
+        self.scores = []
+        aggregate = ScoreAggregate()
+        # Leaving the with-block terminates the pool, so chunks still running
+        # at the deadline (or when the caller stops) release their cores
+        with mp.Pool(processes=min(self.num_processes, len(chunks))) as pool:
+            pending = pool.imap_unordered(self.worker, chunks)
+            for _ in chunks:
+                if deadline is None:
+                    chunk_scores = pending.next()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    try:
+                        chunk_scores = pending.next(timeout=remaining)
+                    except mp.TimeoutError:
+                        return
+                self.scores.extend(chunk_scores)
+                yield aggregate.add(chunk_scores)
+
+    def auto_chunk_count(self, chunk_games=None):
         """
-        # Split games into chunks for each process
-        games_per_process = self.num_games // self.num_processes
-        remainder = self.num_games % self.num_processes
+        Number of chunks: CHUNKS_PER_PROCESS per process, but none smaller
+        than MIN_CHUNK_GAMES and, when given, none larger than chunk_games.
+        """
+        count = min(self.num_processes * self.CHUNKS_PER_PROCESS,
+                    self.num_games // self.MIN_CHUNK_GAMES)
+        if chunk_games:
+            count = max(count, math.ceil(self.num_games / chunk_games))
+        return max(1, min(count, self.num_games))
+
+    def play_for(self, deadline, **sizer_options):
+        """
+        Play as many games as fit before deadline (a time.monotonic() value),
+        at most num_games.
+
+        Every process keeps one chunk in flight; chunk sizes come from a
+        ChunkSizer fed with the measured throughput, so the run ends close to
+        the deadline. Chunks still running at the deadline are dropped with
+        the pool; games_played tells how many games were played.
+
+        Args:
+            deadline: time.monotonic() value to stop by
+            **sizer_options: ChunkSizer options (probe_games, target_seconds,
+                             margin_seconds)
+        """
+        sizer = ChunkSizer(deadline, max_games=self.num_games, **sizer_options)
+        finished = queue.Queue()
+        results = []
+        with mp.Pool(processes=self.num_processes) as pool:
+
+            def submit():
+                games = sizer.next_chunk()
+                if games <= 0:
+                    return False
+                started = time.monotonic()
+                pool.apply_async(
+                    self.worker, (self.chunk_args(games),),
+                    callback=lambda scores: finished.put(
+                        (games, time.monotonic() - started, scores)),
+                    error_callback=lambda exc: finished.put((0, 0, exc)))
+                return True
+
+            in_flight = sum(1 for _ in range(self.num_processes) if submit())
+            while in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    games, seconds, scores = finished.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                in_flight -= 1
+                if isinstance(scores, BaseException):
+                    raise scores
+                sizer.record(games, seconds)
+                results.append(scores)
+                if submit():
+                    in_flight += 1
+        self.collect(results)
+
+    @property
+    def worker(self):
+        """Module-level (picklable) function that plays one chunk."""
+        return (play_games_chunk if self.shared_table is None
+                else play_games_chunk_shared)
+
+    def plan_chunks(self, num_chunks):
+        """
+        Split the games into num_chunks worker arguments, sizes as even as
+        possible. Callers with their own executor submit self.worker on each
+        and hand the results to collect().
+        """
+        games_per_chunk = self.num_games // num_chunks
+        remainder = self.num_games % num_chunks
 
-        # Create chunks with sizes as even as possible
         chunks = []
-        for i in range(self.num_processes):
-            chunk_size = games_per_process + (1 if i < remainder else 0)
+        for i in range(num_chunks):
+            chunk_size = games_per_chunk + (1 if i < remainder else 0)
             if chunk_size > 0:
-                chunks.append((self.lineup, chunk_size, self.game_params))
+                chunks.append(self.chunk_args(chunk_size))
+        return chunks
 
-        # Run simulations in parallel
-        with mp.Pool(processes=len(chunks)) as pool:
-            results = pool.map(play_games_chunk, chunks)
-
-        # Flatten results into single list
+    def collect(self, results):
+        """Flatten per-chunk score lists into self.scores."""
         self.scores = []
         for chunk_scores in results:
             self.scores.extend(chunk_scores)
 
+    def chunk_args(self, chunk_size):
+        """Arguments for one worker call; only indices when sharing memory."""
+        if self.shared_table is None:
+            return (self.lineup, chunk_size, self.game_params)
+        return (tuple(self.shared_table), tuple(self.lineup_rows), chunk_size,
+                self.game_params)
+
+    @property
+    def games_played(self):
+        """Number of games actually played (fewer than num_games when cut off)."""
+        return len(self.get_scores())
+
+    @property
+    def partial(self):
+        """True when a deadline stopped the run before every game was played."""
+        return self.games_played < self.num_games
+
     def get_scores(self):
         """
         Get list of all game scores.
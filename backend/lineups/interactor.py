@@ -3,12 +3,21 @@
 -Imported by:
   -backend/lineups/views.py
 """
+from asgiref.sync import sync_to_async
+
+from simulator.services import worker_pool
+from simulator.services.scheduler import get_scheduler
 from .services.input_data import CreateLineupInput, LineupPlayerInput
 from .services.validator import validate_batting_orders, validate_data
-from .services.databa_access import fetch_lineup_data
+from .services.databa_access import fetch_team_players
 from .services.lineup_creation_handler import handle_lineup_save
 from .services.exceptions import DomainError
-from .services.algorithm_logic import algorithm_create_lineup
+from .services.substitution import evaluate_substitutions
+from .services.algorithm_logic import (algorithm_create_lineup,
+                                       best_batting_order_block,
+                                       calculate_player_baserun_values,
+                                       player_rate_matrix,
+                                       slot_sensitivity_matrix)
 
 
 class LineupCreationInteractor:
@@ -36,11 +45,10 @@ class LineupCreationInteractor:
             name=name,
         )
 
-        # Domain validation (raises exceptions if invalid)
+        # Domain validation (raises exceptions if invalid); the team and
+        # players it loads are reused for the save
         validate_batting_orders(payload.players)
-        validate_data(payload, require_creator=True)
-        # Fetch data from database
-        lineup_data = fetch_lineup_data(payload)
+        lineup_data = validate_data(payload, require_creator=True)
         original_batting_orders = [p.batting_order for p in payload.players]
         # Persist to database
         lineup, lineup_players = handle_lineup_save(lineup_data,
@@ -48,11 +56,13 @@ class LineupCreationInteractor:
 
         return lineup, lineup_players
 
-    def generate_suggested_lineup(self, team_id, selected_player_ids=None):
+    def generate_suggested_lineup(self, team_id, selected_player_ids=None,
+                                  owner="system"):
         """
         Use Case: Generate algorithm-based lineup (no save)
-        Input: Primitive types
+        Input: Primitive types; owner is the simulation scheduler's queue key
         Output: List of suggested players with batting orders
+        Raises SchedulerBusy when the search is not admitted
         """
 
         if team_id is None:
@@ -68,10 +78,10 @@ class LineupCreationInteractor:
         payload = CreateLineupInput(team_id=team_id, players=players_inputs,
                                     requested_user_id=None)
         # Validate and fetch data from database
-        validate_data(payload, require_creator=False)
-        validated_data = fetch_lineup_data(payload)
-        # Call algorithm with fetched players
-        lineup_tuple = algorithm_create_lineup(validated_data["players"])
+        validated_data = validate_data(payload, require_creator=False)
+        # Call algorithm with fetched players (one scheduler core)
+        with get_scheduler().reserve(owner):
+            lineup_tuple = algorithm_create_lineup(validated_data["players"])
         if not lineup_tuple:
             return []
         # Format result
@@ -84,3 +94,102 @@ class LineupCreationInteractor:
             for idx, p in enumerate(lineup_tuple)
         ]
         return suggested_players
+
+    async def optimize_lineup_async(self, team_id, player_ids,
+                                    owner="system", time_budget_ms=None):
+        """
+        Use Case: Best batting order for a given nine (no save), async
+        Input: Team id, 9 player ids, simulation scheduler queue key,
+        optional time budget
+        Output: Dict with the nine in optimal order and its expected runs
+        The lookup runs in a thread; the 9! BaseRuns search runs in the
+        shared simulation worker pool, one leadoff block per chunk, so the
+        event loop stays free. When the budget runs out the best order of
+        the finished blocks is returned, marked partial.
+        Raises SchedulerBusy when the search is not admitted and
+        DeadlineExceeded when no block finished in time
+        """
+        players_inputs = [LineupPlayerInput(player_id=pid)
+                          for pid in player_ids]
+        payload = CreateLineupInput(team_id=team_id, players=players_inputs,
+                                    requested_user_id=None)
+        context = await sync_to_async(validate_data)(payload,
+                                                     require_creator=False)
+        players = context["players"]
+        rates = player_rate_matrix(players)
+        deadline = worker_pool.deadline_after(
+            None if time_budget_ms is None else time_budget_ms / 1000)
+        async with get_scheduler().reserve_async(
+                owner, cores=len(players)) as cores:
+            blocks = await worker_pool.run_chunks(
+                best_batting_order_block,
+                [(rates, leadoff) for leadoff in range(len(players))],
+                star=True, max_in_flight=cores, deadline=deadline)
+        if not blocks:
+            raise worker_pool.DeadlineExceeded(
+                "The optimization time budget ran out before any orders "
+                "were scored; allow more time.")
+        # First maximum in block order, like best_batting_order
+        order, runs = max(blocks, key=lambda block: block[1])
+        return {
+            "team_id": team_id,
+            "players": [
+                {
+                    "player_id": players[row].id,
+                    "player_name": getattr(players[row], "name", ""),
+                    "batting_order": idx + 1,
+                }
+                for idx, row in enumerate(order)
+            ],
+            "expected_runs": runs,
+            "partial": len(blocks) < len(players),
+        }
+
+    def compute_slot_sensitivity(self, team_id, player_ids):
+        """
+        Use Case: Score every player-to-slot move for a given nine (no save)
+        Input: Team id and 9 player ids in current batting order
+        Output: Dict with the lineup, its expected runs and the 9x9 matrix
+        """
+        players_inputs = [LineupPlayerInput(player_id=pid)
+                          for pid in player_ids]
+        payload = CreateLineupInput(team_id=team_id, players=players_inputs,
+                                    requested_user_id=None)
+        lineup = validate_data(payload, require_creator=False)["players"]
+
+        matrix = slot_sensitivity_matrix(lineup)
+        return {
+            "team_id": team_id,
+            "players": [
+                {
+                    "player_id": p.id,
+                    "player_name": getattr(p, "name", ""),
+                    "batting_order": idx + 1,
+                }
+                for idx, p in enumerate(lineup)
+            ],
+            "expected_runs": calculate_player_baserun_values(tuple(lineup)),
+            "matrix": matrix.tolist(),
+        }
+
+    def evaluate_substitutions(self, team_id, player_ids, slot=None,
+                               reoptimize=False, owner="system"):
+        """
+        Use Case: Rank bench replacements for a given nine (no save)
+        Input: Team id, 9 player ids in batting order, optional slot (1-9),
+        simulation scheduler queue key
+        Output: Ranked list of (bench player, slot) substitutions
+        Raises SchedulerBusy when the evaluation is not admitted
+        """
+        players_inputs = [LineupPlayerInput(player_id=pid)
+                          for pid in player_ids]
+        payload = CreateLineupInput(team_id=team_id, players=players_inputs,
+                                    requested_user_id=None)
+        lineup = validate_data(payload, require_creator=False)["players"]
+        bench = fetch_team_players(team_id, exclude_ids=player_ids)
+        try:
+            with get_scheduler().reserve(owner):
+                return evaluate_substitutions(lineup, bench, slot=slot,
+                                              reoptimize=reoptimize)
+        except ValueError as exc:
+            raise DomainError(str(exc))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lineups', '0011_remove_lineupplayer_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lineup',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='lineups_creator_created_idx'),
+        ),
+    ]
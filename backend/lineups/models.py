@@ -28,6 +28,11 @@ class Lineup(models.Model):
     class Meta:
         db_table = "lineups"
         ordering = ["-created_at", "name"]  # newest first, then name
+        indexes = [
+            # per-user saved lineups, newest first (cursor pagination)
+            models.Index(fields=["created_by", "-created_at", "-id"],
+                         name="lineups_creator_created_idx"),
+        ]
 
     def __str__(self):
         when = self.created_at.date().isoformat()
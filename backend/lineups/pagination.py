@@ -0,0 +1,17 @@
+"""
+- This file defines pagination for the saved-lineup endpoints.
+- Imported by:
+  - backend/lineups/views.py
+"""
+
+from roster.pagination import OptInCursorPagination
+
+
+class LineupCursorPagination(OptInCursorPagination):
+    """Opt-in cursor pagination for saved lineups, newest first.
+
+    The ordering matches lineups_creator_created_idx, so every page is an
+    index range scan no matter how deep the client pages.
+    """
+
+    ordering = ("-created_at", "-id")
@@ -4,8 +4,11 @@
   - backend/lineups/views.py
 """
 
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Lineup
+
+from roster.fast_serializers import ValuesRowMapper, to_datetime_repr
+from .models import Lineup, LineupPlayer
 
 
 # ---- Request schema (client -> server) ----
@@ -29,6 +32,41 @@ class LineupCreate(serializers.Serializer):
                                  allow_blank=False)
 
 
+class LineupSensitivityIn(serializers.Serializer):
+    """Request body for the player-by-slot sensitivity matrix."""
+
+    team_id = serializers.IntegerField()
+    # current batting order, leadoff first
+    player_ids = serializers.ListField(child=serializers.IntegerField(),
+                                       min_length=9, max_length=9)
+
+
+class LineupOptimizeIn(LineupSensitivityIn):
+    """Request body for the async batting order optimizer."""
+
+    # wall-clock budget; past it the best order found so far is returned
+    time_budget_ms = serializers.IntegerField(min_value=100, max_value=60000,
+                                              required=False)
+
+
+class LineupSubstitutionIn(LineupSensitivityIn):
+    """Request body for ranking bench substitutions."""
+
+    # slot being replaced; every slot is scored when omitted
+    slot = serializers.IntegerField(min_value=1, max_value=9, required=False,
+                                    allow_null=True)
+    # re-optimizing searches all 9! orders per substitute, so it is only
+    # offered for a single slot
+    reoptimize = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs.get("reoptimize") and attrs.get("slot") is None:
+            raise serializers.ValidationError(
+                {"slot": "A slot is required to re-optimize around a "
+                         "substitute."})
+        return attrs
+
+
 # ---- Response schema (server -> client) ----
 class LineupPlayerOut(serializers.Serializer):
     """This is a saved batting slot returned to the client."""
@@ -73,9 +111,13 @@ class LineupModelSerializer(serializers.ModelSerializer):
         """Return the lineup players in batting order.
 
         Filters out players with None batting_order to handle incomplete
-          lineups.
+          lineups. Uses the ordered_players prefetch (see
+          with_ordered_players) when present instead of querying per lineup.
         """
-        lineup_players = obj.players.order_by("batting_order")
+        lineup_players = getattr(obj, "ordered_players", None)
+        if lineup_players is None:
+            lineup_players = obj.players.select_related("player")\
+                .order_by("batting_order")
         return [
             {
                 "player_id": lp.player_id,
@@ -85,3 +127,92 @@ class LineupModelSerializer(serializers.ModelSerializer):
             for lp in lineup_players
             if lp.batting_order is not None  # Filter out None batting orders
         ]
+
+
+def with_ordered_players(queryset):
+    """Prefetch each lineup's slots (with their players) in batting order.
+
+    Two queries in total regardless of how many lineups the queryset holds;
+    LineupModelSerializer.get_players reads the result from ordered_players.
+    """
+    return queryset.prefetch_related(Prefetch(
+        "players",
+        queryset=LineupPlayer.objects.filter(batting_order__isnull=False)
+        .select_related("player").only(
+            "lineup_id", "player_id", "batting_order", "player__name")
+        .order_by("batting_order"),
+        to_attr="ordered_players",
+    ))
+
+
+# ---- Read fast path (list endpoints) ----
+# Same JSON as LineupPlayerOut / LineupModelSerializer, built from
+# values_list() rows (see roster.fast_serializers).
+LINEUP_PLAYER_MAPPER = ValuesRowMapper([
+    ("player_id", "player_id"),
+    ("player_name", "player__name"),
+    ("batting_order", "batting_order"),
+])
+
+LINEUP_LIST_MAPPER = ValuesRowMapper(
+    [
+        ("id", "id"),
+        ("team_id", "team_id"),
+        ("name", "name"),
+        ("created_by", "created_by_id"),
+        ("created_at", "created_at"),
+    ],
+    {"created_at": to_datetime_repr},
+)
+
+
+def serialize_lineup_rows(rows):
+    """Render lineup rows (from LINEUP_LIST_MAPPER.rows) with their players.
+
+    All players of the page come from one extra query, in batting order,
+    skipping slots without a batting order like get_players does.
+    """
+    lineups = LINEUP_LIST_MAPPER.serialize(rows)
+    by_id = {}
+    for lineup in lineups:
+        lineup["players"] = []
+        by_id[lineup["id"]] = lineup["players"]
+    if not by_id:
+        return lineups
+
+    player_rows = (
+        LineupPlayer.objects
+        .filter(lineup_id__in=list(by_id), batting_order__isnull=False)
+        .order_by("lineup_id", "batting_order")
+        .values_list("lineup_id", *LINEUP_PLAYER_MAPPER.columns)
+    )
+    keys = LINEUP_PLAYER_MAPPER.keys
+    for lineup_id, *values in player_rows:
+        by_id[lineup_id].append(dict(zip(keys, values)))
+    return lineups
+
+
+class LineupSensitivityOut(serializers.Serializer):
+    """Sensitivity matrix response: matrix[i][j] is the lineup's expected
+    runs with the player batting (i + 1)-th moved to slot (j + 1)."""
+
+    team_id = serializers.IntegerField()
+    players = serializers.ListField(child=serializers.DictField())
+    expected_runs = serializers.FloatField()
+    matrix = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField()))
+
+
+class SubstitutionOut(serializers.Serializer):
+    """One ranked (bench player, slot) replacement."""
+
+    player_id = serializers.IntegerField()
+    player_name = serializers.CharField()
+    slot = serializers.IntegerField()
+    replaced_player_id = serializers.IntegerField()
+    replaced_player_name = serializers.CharField()
+    expected_runs = serializers.FloatField()
+    delta_runs = serializers.FloatField()
+    optimized_order = serializers.ListField(
+        child=serializers.IntegerField(), required=False)
+    optimized_runs = serializers.FloatField(required=False)
@@ -6,11 +6,15 @@ with the highest expected runs.
 - Imported by backend/lineups/lineup_creation_handler.py.
 """
 
+from functools import lru_cache
 from itertools import permutations
-from typing import Dict, Tuple
+from typing import Dict, Sequence, Tuple
 
+import numpy as np
 
 from roster.models import Player
+from roster.services.player_vectors import (BASERUN_RATE_FIELDS,
+                                            stored_baserun_rates)
 
 # -------- Batting Spot PA% Multipliers --------
 # Source https://www.bluebirdbanter.com/2012/10/12/3490578/
@@ -28,6 +32,26 @@ PA_MULTIPLIERS = {
     9: 0.90,
 }
 
+# -------- Vectorized BaseRuns inputs --------
+# Columns follow roster.services.player_vectors.BASERUN_RATE_FIELDS
+# (PA, H, HR, BB, IBB, HBP, SB, CS, GIDP, SF, SH, TB).
+SLOT_MULTIPLIERS = np.array([PA_MULTIPLIERS[spot] for spot in range(1, 10)])
+# adjustments keys in the same column order
+ADJUSTMENT_KEYS = (
+    "pa_team",
+    "h_adjust",
+    "hr_adjust",
+    "bb_adjust",
+    "ibb_adjust",
+    "hbp_adjust",
+    "sb_adjust",
+    "cs_adjust",
+    "gidp_adjust",
+    "sf_adjust",
+    "sh_adjust",
+    "tb_adjust",
+)
+
 
 # Calculate adjusted player metrics to use for BaseRuns formula
 def calculate_player_adjustments(p: Player, position: int, adjustments:
@@ -52,6 +76,13 @@ def calculate_player_adjustments(p: Player, position: int, adjustments:
         adjust, 5 - SB adjust, 6 - CS adjust, 7 - GIDP adjust, 8 - SF adjust,
         9 - SH adjust, 10 - TB adjust
     """
+    rates = stored_baserun_rates(p)
+    if rates is not None:
+        # Per-game rates were precomputed on import; only scale by slot
+        for key, rate in zip(ADJUSTMENT_KEYS, rates):
+            adjustments[key] += rate * PA_MULTIPLIERS[position]
+        return adjustments
+
     if p.b_game is None or p.b_game == 0:
         return adjustments
     pa_scale = (
@@ -191,3 +222,157 @@ def algorithm_create_lineup(players_list: list) -> Tuple[Player, ...]:
         return tuple()
 
     return best_lineup
+
+
+def player_rate_matrix(players: Sequence[Player]) -> np.ndarray:
+    """Build the per-game BaseRuns stat rates for a list of players.
+
+    Args:
+        players: Player objects (any number, any order)
+
+    Returns:
+        Array of shape (len(players), 12) with columns in
+        BASERUN_RATE_FIELDS order. Stored rates are used when current.
+        Players without games played get a zero row, the same way
+        calculate_player_adjustments skips them.
+    """
+    rates = np.zeros((len(players), len(BASERUN_RATE_FIELDS)))
+    for row, p in enumerate(players):
+        stored = stored_baserun_rates(p)
+        if stored is not None:
+            rates[row] = stored
+        elif p.b_game:
+            rates[row] = [getattr(p, field) or 0
+                          for field in BASERUN_RATE_FIELDS]
+            rates[row] /= p.b_game
+    return rates
+
+
+def baserun_values_from_totals(totals: np.ndarray) -> np.ndarray:
+    """Vectorized BaseRun formula over slot-weighted team totals.
+
+    Args:
+        totals: Array of shape (..., 12) holding the team's adjusted
+        per-game totals in BASERUN_RATE_FIELDS order
+
+    Returns:
+        Array of shape (...) with the expected runs for each lineup, 0 where
+        B + C is not positive (same rule as calculate_player_baserun_values)
+    """
+    pa, h, hr, bb, ibb, hbp, sb, cs, gidp, sf, sh, tb = np.moveaxis(
+        totals, -1, 0)
+    a = h + bb + hbp - (0.5 * ibb) - hr
+    b = 1.1 * (
+        1.4 * tb - 0.6 * h - 3 * hr
+        + 0.1 * (bb + hbp - ibb)
+        + 0.9 * (sb - cs - gidp)
+    )
+    c = pa - bb - sf - sh - hbp - h + cs + gidp
+    denominator = b + c
+    valid = denominator > 0
+    safe_denominator = np.where(valid, denominator, 1.0)
+    return np.where(valid, (a * b) / safe_denominator + hr, 0.0)
+
+
+def batch_lineup_runs(rates: np.ndarray, orders: np.ndarray) -> np.ndarray:
+    """Expected runs for many batting orders in one pass.
+
+    Args:
+        rates: Player rate matrix from player_rate_matrix, shape (n, 12)
+        orders: Integer array of shape (k, 9); row r lists the rate-matrix
+        rows batting 1st through 9th in lineup r
+
+    Returns:
+        Array of shape (k,) with the BaseRuns expected runs of each order
+    """
+    return baserun_values_from_totals(_slot_weights(orders, len(rates))
+                                      @ rates)
+
+
+def _slot_weights(orders: np.ndarray, num_players: int) -> np.ndarray:
+    """Turn (k, 9) batting orders into a (k, num_players) matrix holding
+    each player's PA multiplier, so team totals are one matrix product."""
+    weights = np.zeros((len(orders), num_players))
+    weights[np.arange(len(orders))[:, None], orders] = SLOT_MULTIPLIERS
+    return weights
+
+
+@lru_cache(maxsize=1)
+def _all_batting_orders() -> Tuple[np.ndarray, np.ndarray]:
+    """Every 9! batting order (itertools order) with its slot weights.
+    Cached read-only; about 30 MB, built once per process."""
+    orders = np.array(list(permutations(range(9))), dtype=np.int8)
+    weights = _slot_weights(orders, 9)
+    orders.setflags(write=False)
+    weights.setflags(write=False)
+    return orders, weights
+
+
+def best_batting_order(rates: np.ndarray) -> Tuple[Tuple[int, ...], float]:
+    """Vectorized brute-force search over all 9! orders of nine players.
+
+    Args:
+        rates: Rate matrix of exactly 9 players, shape (9, 12)
+
+    Returns:
+        (order, runs): row indices of rates from leadoff to ninth and the
+        expected runs of that order. Ties resolve to the first order in
+        permutation order, like algorithm_create_lineup.
+    """
+    orders, weights = _all_batting_orders()
+    runs = baserun_values_from_totals(weights @ rates)
+    best = int(np.argmax(runs))
+    return tuple(int(k) for k in orders[best]), float(runs[best])
+
+
+def best_batting_order_block(rates: np.ndarray, leadoff: int
+                             ) -> Tuple[Tuple[int, ...], float]:
+    """best_batting_order restricted to the 8! orders led off by row leadoff.
+
+    The nine blocks together cover the full search in the same permutation
+    order, so keeping the first maximum over blocks 0..8 reproduces
+    best_batting_order; callers run them as separate chunks to check a
+    deadline or cancellation in between.
+    """
+    orders, weights = _all_batting_orders()
+    size = len(orders) // 9
+    block = slice(leadoff * size, (leadoff + 1) * size)
+    runs = baserun_values_from_totals(weights[block] @ rates)
+    best = int(np.argmax(runs))
+    return (tuple(int(k) for k in orders[block][best]), float(runs[best]))
+
+
+@lru_cache(maxsize=None)
+def _slot_shift_orders(size: int = 9) -> np.ndarray:
+    """Orders where the player batting i-th moves to slot j and the rest
+    shift to fill the gap. Shape (size, size, size), cached read-only."""
+    orders = np.empty((size, size, size), dtype=np.intp)
+    for i in range(size):
+        others = [k for k in range(size) if k != i]
+        for j in range(size):
+            orders[i, j] = others[:j] + [i] + others[j:]
+    orders.setflags(write=False)
+    return orders
+
+
+def slot_sensitivity_matrix(lineup: Sequence[Player]) -> np.ndarray:
+    """Expected runs when each player is moved to each batting slot.
+
+    Entry [i, j] is the lineup's BaseRuns expected runs when the player
+    currently batting (i + 1)-th is moved to slot (j + 1) and everyone in
+    between shifts by one spot. The diagonal is the lineup as given. All 81
+    lineups are scored in a single vectorized pass.
+
+    Args:
+        lineup: 9 Player objects in their current batting order
+
+    Returns:
+        Array of shape (9, 9) of expected runs
+    """
+    if len(lineup) != 9:
+        raise ValueError(f"Lineup must have exactly 9 players, got "
+                         f"{len(lineup)}")
+    orders = _slot_shift_orders(9)
+    runs = batch_lineup_runs(player_rate_matrix(lineup),
+                             orders.reshape(-1, 9))
+    return runs.reshape(9, 9)
@@ -11,6 +11,9 @@ from django.utils import timezone
 from lineups.models import Lineup, LineupPlayer
 from roster.models import Player
 from roster.models import Team
+from roster.services.projections import apply_projections
+from roster.services.roster_version import LINEUPS_KEY, bump_roster_versions
+from roster.services.season_stats import players_for_season
 from .utils import get
 from django.contrib.auth import get_user_model
 
@@ -34,27 +37,31 @@ def saving_lineup_to_db(team_obj, players_payload, lineup_name, created_by_id):
             name=lineup_name or f"Lineup {timezone.now().isoformat()}",
         )
 
-        # Create LineupPlayer entries from the provided payload
-        lineup_players = []
-        for entry in players_payload:
-            player = entry.get("player")
-            batting_order = entry.get("batting_order")
-
-            lineup_player = LineupPlayer.objects.create(
+        # Create LineupPlayer entries from the provided payload in one
+        # INSERT (the returned objects carry their ids and cached players)
+        lineup_players = LineupPlayer.objects.bulk_create([
+            LineupPlayer(
                 lineup=lineup,
-                player=player,
-                batting_order=batting_order,
+                player=entry.get("player"),
+                batting_order=entry.get("batting_order"),
             )
-            lineup_players.append(lineup_player)
+            for entry in players_payload
+        ])
+
+        bump_roster_versions([LINEUPS_KEY])
 
     return lineup, lineup_players
 
 
-def fetch_players_by_ids(player_ids: list):
+def fetch_players_by_ids(player_ids: list, season=None, projected=False):
     """Fetch players from database by IDs in the specified order.
 
     Args:
         player_ids: List of player IDs in desired order
+        season: Optional year; players carry that season's stats from the
+            history table (one indexed query) instead of the snapshot
+        projected: Carry the stored multi-season projections instead of the
+            snapshot's rates (ignored with season)
 
     Returns:
         List of Player objects in the same order as player_ids,
@@ -64,8 +71,15 @@ def fetch_players_by_ids(player_ids: list):
         ValueError: If any player IDs are not found in database
     """
 
-    players_qs = list(Player.objects.filter(id__in=player_ids)
-                      .select_related("team"))
+    if season is None and projected:
+        players_qs = apply_projections(
+            Player.objects.filter(id__in=player_ids)
+            .select_related("team", "projection"))
+    elif season is None:
+        players_qs = list(Player.objects.filter(id__in=player_ids)
+                          .select_related("team"))
+    else:
+        players_qs = players_for_season(player_ids, season)
 
     # Check that we got all requested players
     if len(players_qs) != len(player_ids):
@@ -95,6 +109,35 @@ def fetch_team_by_id(team_id: int):
     return Team.objects.filter(pk=team_id).first()
 
 
+def fetch_team_for_players(team_id: int, players):
+    """Resolve a team, reusing the Team already joined onto its players.
+    Args:
+        team_id: The team ID to fetch
+        players: Player objects loaded with select_related("team")
+    Returns:
+        Team object or None if not found; only queries when none of the
+        players belongs to the team
+    """
+    for player in players or ():
+        if player.team_id == team_id:
+            return player.team
+    return fetch_team_by_id(team_id)
+
+
+def fetch_team_players(team_id: int, exclude_ids=None):
+    """Fetch a team's players, optionally leaving some out.
+    Args:
+        team_id: The team whose players to fetch
+        exclude_ids: Optional player IDs to skip (e.g. the current lineup)
+    Returns:
+        List of Player objects ordered by id
+    """
+    qs = Player.objects.filter(team_id=team_id).order_by("id")
+    if exclude_ids:
+        qs = qs.exclude(id__in=exclude_ids)
+    return list(qs)
+
+
 def fetch_lineup_data(payload):
     """Fetch all data needed for lineup creation from database.
     This is a helper function for interactors that need to fetch team,
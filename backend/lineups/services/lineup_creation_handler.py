@@ -41,7 +41,7 @@ def handle_lineup_save(val_data: dict, original_batting_orders: list)\
     This function only handles persistence and model validation.
 
     Args:
-        validated: dict from validate_data() containing:
+        val_data: lineup context from validate_data() containing:
                    - team: Team object
                    - players: list of Player objects
                    - created_by_id: user ID
@@ -55,24 +55,20 @@ def handle_lineup_save(val_data: dict, original_batting_orders: list)\
     created_by_id = val_data.get("created_by_id")
     lineup_name = val_data.get("name") or timezone.now().isoformat()
 
-    # Build players payload with batting orders (1-indexed position in
-    # validated list)
-    players_payload = []
-    for player in players_list:
-        players_payload.append(
-            {
-                "player": player,
-                "batting_order": original_batting_orders[players_list
-                                                         .index(player)],
-            }
-        )
+    # Build players payload with batting orders (players are in payload
+    # order, so they line up with the original batting orders)
+    players_payload = [
+        {"player": player, "batting_order": batting_order}
+        for player, batting_order in zip(players_list,
+                                         original_batting_orders)
+    ]
 
     lineup, lineup_players = saving_lineup_to_db(team_obj, players_payload,
                                                  lineup_name, created_by_id)
 
-    # Validate created lineup model
+    # Validate created lineup model against the rows just written
     try:
-        result = validate_lineup_model(lineup)
+        result = validate_lineup_model(lineup, lineup_players)
     except Exception as exc:
         raise DomainError(str(exc))
     if result is False:
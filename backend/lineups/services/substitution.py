@@ -0,0 +1,85 @@
+"""
+- This file scores bench substitutions for a batting lineup.
+- Builds one BaseRuns rate matrix for the whole team and evaluates every
+  (bench player, slot) replacement in a single batched pass, optionally
+  re-optimizing the batting order around each substitute.
+- Imported by backend/lineups/interactor.py.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from roster.models import Player
+from .algorithm_logic import (batch_lineup_runs, best_batting_order,
+                              player_rate_matrix)
+
+
+def evaluate_substitutions(
+    lineup: Sequence[Player],
+    bench: Sequence[Player],
+    slot: Optional[int] = None,
+    reoptimize: bool = False,
+) -> List[Dict]:
+    """Rank every bench player at every replaceable slot.
+
+    Args:
+        lineup: 9 Player objects in current batting order
+        bench: Remaining team players eligible to come in
+        slot: Optional batting slot (1-9) being replaced; every slot is
+        scored when omitted
+        reoptimize: Also search all 9! orders of the new nine for each
+        substitute (requires slot)
+
+    Returns:
+        List of dicts sorted best first, one per (bench player, slot), with
+        the expected runs of the straight swap, the change versus the
+        current lineup and, when reoptimize is set, the best order found.
+    """
+    if len(lineup) != 9:
+        raise ValueError(f"Lineup must have exactly 9 players, got "
+                         f"{len(lineup)}")
+    if reoptimize and slot is None:
+        raise ValueError("A slot is required to re-optimize around a "
+                         "substitute.")
+    if not bench:
+        return []
+
+    # One matrix for the team: rows 0-8 are the starters, 9+ the bench
+    team = list(lineup) + list(bench)
+    rates = player_rate_matrix(team)
+    base_order = np.arange(9)
+    current_runs = float(batch_lineup_runs(rates, base_order[None, :])[0])
+
+    slots = [slot - 1] if slot is not None else list(range(9))
+    bench_rows = np.arange(9, len(team))
+    # orders[b * len(slots) + s] swaps bench player b into slots[s]
+    orders = np.tile(base_order, (len(bench_rows) * len(slots), 1))
+    orders[np.arange(len(orders)), np.tile(slots, len(bench_rows))] = \
+        np.repeat(bench_rows, len(slots))
+    swap_runs = batch_lineup_runs(rates, orders)
+
+    results = []
+    for row, order in enumerate(orders):
+        spot = slots[row % len(slots)]
+        sub = team[order[spot]]
+        replaced = team[spot]
+        entry = {
+            "player_id": sub.id,
+            "player_name": sub.name,
+            "slot": spot + 1,
+            "replaced_player_id": replaced.id,
+            "replaced_player_name": replaced.name,
+            "expected_runs": float(swap_runs[row]),
+            "delta_runs": float(swap_runs[row]) - current_runs,
+        }
+        if reoptimize:
+            best_order, best_runs = best_batting_order(rates[order])
+            entry["optimized_order"] = [team[order[k]].id
+                                        for k in best_order]
+            entry["optimized_runs"] = best_runs
+        results.append(entry)
+
+    sort_key = "optimized_runs" if reoptimize else "expected_runs"
+    results.sort(key=lambda e: e[sort_key], reverse=True)
+    return results
@@ -8,7 +8,7 @@
 """
 from django.contrib.auth import get_user_model
 from roster.models import Team
-from .databa_access import fetch_players_by_ids, fetch_team_by_id
+from .databa_access import fetch_players_by_ids, fetch_team_for_players
 from .exceptions import (BadBattingOrder, NoCreator,
                          PlayersNotFound, PlayersWrongTeam, TeamNotFound)
 from .utils import get
@@ -62,10 +62,33 @@ def validate_data(payload, require_creator: bool = True):
 
     Performs validation with necessary database lookups (e.g., team and player
       existence).
-    Raises domain exceptions if validation fails; returns nothing if valid.
+    Raises domain exceptions if validation fails. When valid, returns the
+      request-scoped lineup context the lookups produced, shaped like
+      fetch_lineup_data (team, players in payload order, created_by_id,
+      name), so callers never fetch the same rows twice.
     """
     team_id = get(payload, "team_id")
-    team_obj = fetch_team_by_id(team_id)
+
+    # Extract player ids from input
+    ids = []
+    missing_id = False
+    for p in get(payload, "players", []):
+        pid = get(p, "player_id") if not isinstance(p, (int,)) else p
+        if pid is None:
+            missing_id = True
+            break
+        ids.append(pid)
+
+    # Fetch players (with their team) to validate they exist and belong to
+    # correct team; the team usually comes from this same query
+    players_qs = None
+    if not missing_id and len(ids) == 9:
+        try:
+            players_qs = fetch_players_by_ids(ids)
+        except ValueError:
+            players_qs = None
+
+    team_obj = fetch_team_for_players(team_id, players_qs)
     if not team_obj:
         # Auto-create only the default team (id=1) for production deployment
         # Other team IDs should raise TeamNotFound to prevent accidental creation
@@ -74,22 +97,14 @@ def validate_data(payload, require_creator: bool = True):
         else:  # pragma: no cover
             raise TeamNotFound()  # pragma: no cover
 
-    # Extract player ids from input
-    ids = []
-    for p in get(payload, "players", []):
-        pid = get(p, "player_id") if not isinstance(p, (int,)) else p
-        if pid is None:
-            raise PlayersNotFound()
-        ids.append(pid)
+    if missing_id:
+        raise PlayersNotFound()
 
     # We expect exactly 9 players
     if len(ids) != 9:
         raise BadBattingOrder("Exactly 9 players are required")
 
-    # Fetch players to validate they exist and belong to correct team
-    try:
-        players_qs = fetch_players_by_ids(ids)
-    except ValueError:
+    if players_qs is None:
         raise PlayersNotFound()
 
     # Ensure all players belong to the stated team
@@ -106,13 +121,21 @@ def validate_data(payload, require_creator: bool = True):
         if created_by_id is None:
             raise NoCreator()
 
+    return {
+        "team": team_obj,
+        "players": players_qs,
+        "created_by_id": created_by_id or None,
+        "name": get(payload, "name"),
+    }
+
 
-def validate_lineup_model(lineup):
+def validate_lineup_model(lineup, lineup_players=None):
     """Validate a Lineup model instance produced by the algorithm.
 
     Raises the same domain exceptions as the input validator when the
     produced model is invalid. This protects the API from buggy
-    algorithm implementations.
+    algorithm implementations. Pass the LineupPlayer objects just written
+    as lineup_players to validate in memory instead of re-reading them.
     """
 
     if lineup is None:
@@ -122,8 +145,11 @@ def validate_lineup_model(lineup):
     if getattr(lineup, "team_id", None) is None:
         raise PlayersWrongTeam()
 
-    # select_related player to access team_id efficiently
-    players = list(lineup.players.select_related("player").all())
+    if lineup_players is not None:
+        players = list(lineup_players)
+    else:
+        # select_related player to access team_id efficiently
+        players = list(lineup.players.select_related("player").all())
     if len(players) == 0:
         raise PlayersNotFound()
 
@@ -77,6 +77,32 @@ class LineupAPITests(TestCase):
             self.assertEqual(lp.batting_order, idx + 1)
             self.assertEqual(lp.player.team_id, self.team.id)
 
+    def test_manual_save_query_budget(self):
+        """Saving loads team and players once, inserts the slots in one
+        statement and validates the result without re-reading it."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        payload = {
+            "team_id": self.team.id,
+            "players": [
+                {"player_id": p.id, "batting_order": idx + 1}
+                for idx, p in enumerate(self.players)
+            ],
+        }
+        self.client.force_authenticate(user=self.creator)
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(self.base_url, payload, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(len(resp.json()["players"]), 9)
+
+        statements = [q["sql"] for q in queries.captured_queries
+                      if "SAVEPOINT" not in q["sql"]]
+        # players (+ team join), lineup insert, slot insert, version bump
+        self.assertEqual(len(statements), 4)
+        self.assertEqual(
+            len([sql for sql in statements
+                 if sql.startswith('INSERT INTO "lineup_players"')]), 1)
+
     def test_rejects_missing_batting_orders(self):
         """Payload without batting_order is treated as team_id-only and
           generates a suggestion."""
@@ -132,6 +158,34 @@ class LineupAPITests(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.data["id"], lineup.id)
 
+    def test_saved_lineups_conditional_get(self):
+        """Saved lineups answer If-None-Match with 304 until a lineup
+        is saved, and ETags are per user."""
+        url = f"{self.base_url}saved/"
+        self.client.force_authenticate(user=self.creator)
+        etag = self.client.get(url)["ETag"]
+
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        self.client.force_authenticate(user=self.other)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+        self.client.force_authenticate(user=self.creator)
+        payload = {
+            "team_id": self.team.id,
+            "players": [
+                {"player_id": p.id, "batting_order": idx + 1}
+                for idx, p in enumerate(self.players)
+            ],
+        }
+        self.client.post(self.base_url, payload, format="json")
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(len(resp.json()), 1)
+
     def test_delete_permissions_creator_other_superuser(self):
         """Only creator or superuser may delete a lineup."""
         lineup = Lineup.objects.create(team=self.team, created_by=self.creator)
@@ -159,6 +213,76 @@ class LineupAPITests(TestCase):
         self.assertEqual(resp.status_code, 204)
 
 
+class LineupOptimizeAsyncTests(TestCase):
+    """Tests for the async batting order optimizer endpoint."""
+
+    @classmethod
+    def tearDownClass(cls):
+        from simulator.services import worker_pool
+        worker_pool.shutdown_executor()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.team = Team.objects.create()
+        self.players = [
+            Player.objects.create(
+                name=f"Player {i+1}", team=self.team, b_game=10.0,
+                pa=40 + 3 * i, hit=10 + 2 * i, home_run=1 + (i % 4),
+                walk=2 + (i % 3), double=i % 2,
+            )
+            for i in range(9)
+        ]
+
+    def test_optimize_returns_best_order(self):
+        """The async endpoint returns the vectorized 9! search's order."""
+        from lineups.services.algorithm_logic import (best_batting_order,
+                                                      player_rate_matrix)
+        payload = {"team_id": self.team.id,
+                   "player_ids": [p.id for p in self.players]}
+        resp = APIClient().post("/api/v1/lineups/optimize/", payload,
+                                format="json")
+        self.assertEqual(resp.status_code, 200)
+
+        order, runs = best_batting_order(player_rate_matrix(self.players))
+        body = resp.json()
+        self.assertEqual([p["player_id"] for p in body["players"]],
+                         [self.players[row].id for row in order])
+        self.assertEqual([p["batting_order"] for p in body["players"]],
+                         list(range(1, 10)))
+        self.assertAlmostEqual(body["expected_runs"], runs)
+        self.assertFalse(body["partial"])
+
+    def test_optimize_rejects_bad_input(self):
+        """Domain and validation errors come back as 400."""
+        other = Team.objects.create()
+        stranger = Player.objects.create(name="Stranger", team=other)
+        ids = [p.id for p in self.players[:8]] + [stranger.id]
+        resp = APIClient().post("/api/v1/lineups/optimize/",
+                                {"team_id": self.team.id, "player_ids": ids},
+                                format="json")
+        self.assertEqual(resp.status_code, 400)
+
+        resp = APIClient().post("/api/v1/lineups/optimize/",
+                                {"team_id": self.team.id}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("player_ids", resp.json())
+
+    def test_optimize_not_admitted_returns_429(self):
+        """A refused scheduler admission surfaces as 429 + Retry-After."""
+        from django.test import override_settings
+        from simulator.services.scheduler import reset_scheduler
+        payload = {"team_id": self.team.id,
+                   "player_ids": [p.id for p in self.players]}
+        reset_scheduler()
+        self.addCleanup(reset_scheduler)
+        with override_settings(SIMULATION_MAX_PER_USER=0):
+            for url in ("/api/v1/lineups/optimize/",
+                        "/api/v1/lineups/substitutions/"):
+                resp = APIClient().post(url, payload, format="json")
+                self.assertEqual(resp.status_code, 429)
+                self.assertEqual(resp["Retry-After"], "2")
+
+
 class LineupModelTests(TestCase):
     """Tests for Lineup and LineupPlayer models.
     Covers basic creation and __str__ methods."""
@@ -448,6 +572,111 @@ class LineupViewSetTests(TestCase):
         self.assertEqual(len(resp.data), 1)
         self.assertEqual(resp.data[0]["name"], "My Lineup")
 
+    def test_list_fast_path_matches_model_serializer(self):
+        """values_list() rendering matches the ModelSerializer schema
+        exactly, in two queries regardless of lineup count."""
+        from lineups.serializers import LineupModelSerializer, LineupPlayerOut
+        bench = Player.objects.create(name="Player 2", team=self.team)
+        for n in range(3):
+            lineup = Lineup.objects.create(team=self.team,
+                                           created_by=self.creator,
+                                           name=f"Lineup {n}")
+            LineupPlayer.objects.create(lineup=lineup, player=bench,
+                                        batting_order=2)
+            LineupPlayer.objects.create(lineup=lineup, player=self.player,
+                                        batting_order=1 if n else None)
+
+        client = APIClient()
+        client.force_authenticate(user=self.creator)
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            resp = client.get("/api/v1/lineups/saved/")
+        expected = LineupModelSerializer(Lineup.objects.all(), many=True).data
+        self.assertEqual(resp.json(), [dict(row) for row in expected])
+        self.assertEqual(
+            len([q for q in queries.captured_queries
+                 if "lineup" in q["sql"]
+                 and "roster_versions" not in q["sql"]]), 2)
+
+        resp = client.get("/api/v1/lineups/lineup-players/")
+        expected = LineupPlayerOut(LineupPlayer.objects.all(), many=True).data
+        self.assertEqual(resp.json(), [dict(row) for row in expected])
+
+
+    def _make_lineups(self, count, user):
+        players = [
+            Player.objects.get_or_create(name=f"Slot {n}", team=self.team)[0]
+            for n in range(9)
+        ]
+        for n in range(count):
+            lineup = Lineup.objects.create(team=self.team, created_by=user,
+                                           name=f"Saved {n}")
+            LineupPlayer.objects.bulk_create([
+                LineupPlayer(lineup=lineup, player=p, batting_order=i + 1)
+                for i, p in enumerate(players)
+            ])
+
+    def test_saved_lineups_query_budget(self):
+        """Listing, retrieving and serializing saved lineups costs the
+        same number of queries for 2 lineups as for 20."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from lineups.serializers import (LineupModelSerializer,
+                                         with_ordered_players)
+        client = APIClient()
+        client.force_authenticate(user=self.superuser)
+
+        counts = []
+        for added, total in ((2, 2), (18, 20)):
+            self._make_lineups(added, self.creator)
+            with CaptureQueriesContext(connection) as queries:
+                resp = client.get("/api/v1/lineups/saved/")
+            self.assertEqual(len(resp.json()), total)
+            self.assertTrue(all(len(row["players"]) == 9
+                                for row in resp.json()))
+            counts.append(len(queries.captured_queries))
+        # version stamp, lineups, lineup players
+        self.assertEqual(counts, [3, 3])
+
+        with self.assertNumQueries(2):
+            data = LineupModelSerializer(
+                with_ordered_players(Lineup.objects.all()), many=True).data
+        self.assertEqual(len(data), 20)
+        self.assertEqual([p["batting_order"] for p in data[0]["players"]],
+                         list(range(1, 10)))
+
+        lineup_id = data[0]["id"]
+        with CaptureQueriesContext(connection) as queries:
+            resp = client.get(f"/api/v1/lineups/saved/{lineup_id}/")
+        self.assertEqual(resp.json(), data[0])
+        self.assertEqual(
+            len([q for q in queries.captured_queries
+                 if "lineup_players" in q["sql"]]), 1)
+
+    def test_saved_lineups_cursor_pagination(self):
+        """?page_size= walks saved lineups newest first with a cursor."""
+        self._make_lineups(5, self.creator)
+        client = APIClient()
+        client.force_authenticate(user=self.creator)
+
+        seen = []
+        url = "/api/v1/lineups/saved/?page_size=2"
+        while url:
+            resp = client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            body = resp.json()
+            self.assertLessEqual(len(body["results"]), 2)
+            seen.extend(row["id"] for row in body["results"])
+            url = body["next"]
+        expected = list(Lineup.objects.order_by("-created_at", "-id")
+                        .values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+        # plain requests keep the unpaginated array
+        self.assertIsInstance(client.get("/api/v1/lineups/saved/").json(),
+                              list)
+
 
 class LineupServiceTests(TestCase):
     """Unit tests for lineup services to achieve 100% coverage.
@@ -975,3 +1204,159 @@ class LineupDatabaseTests(TestCase):
         result = fetch_lineup_data(payload_minimal)
         self.assertIsNone(result["name"])
         self.assertIsNone(result["created_by_id"])
+
+
+class LineupSensitivityTests(TestCase):
+    """Tests for the vectorized player-by-slot sensitivity matrix."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/v1/lineups/sensitivity/"
+        self.team = Team.objects.create()
+        self.players = []
+        for i in range(9):
+            p = Player.objects.create(
+                name=f"Player {i+1}",
+                team=self.team,
+                b_game=100.0 + i,
+                pa=400 + 10 * i,
+                hit=90 + 3 * i,
+                home_run=5 + 2 * i,
+                walk=30 + i,
+                b_total_bases=140 + 7 * i,
+                r_total_stolen_base=i,
+                b_gnd_into_dp=4,
+            )
+            self.players.append(p)
+
+    def test_matrix_matches_scalar_baserun(self):
+        """Every matrix entry equals the scalar BaseRun of the shifted
+        lineup."""
+        from lineups.services.algorithm_logic import (
+            calculate_player_baserun_values, slot_sensitivity_matrix
+        )
+        matrix = slot_sensitivity_matrix(self.players)
+        self.assertEqual(matrix.shape, (9, 9))
+        for i in range(9):
+            for j in range(9):
+                shifted = [p for k, p in enumerate(self.players) if k != i]
+                shifted.insert(j, self.players[i])
+                expected = calculate_player_baserun_values(tuple(shifted))
+                self.assertAlmostEqual(matrix[i, j], expected, places=9)
+
+    def test_matrix_requires_nine_players(self):
+        from lineups.services.algorithm_logic import slot_sensitivity_matrix
+        with self.assertRaises(ValueError):
+            slot_sensitivity_matrix(self.players[:8])
+
+    def test_sensitivity_endpoint(self):
+        """POST returns the lineup, its expected runs and a 9x9 matrix."""
+        payload = {
+            "team_id": self.team.id,
+            "player_ids": [p.id for p in self.players],
+        }
+        resp = self.client.post(self.url, payload, format="json")
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual([p["player_id"] for p in data["players"]],
+                         payload["player_ids"])
+        self.assertEqual(len(data["matrix"]), 9)
+        self.assertTrue(all(len(row) == 9 for row in data["matrix"]))
+        for i in range(9):
+            self.assertAlmostEqual(data["matrix"][i][i],
+                                   data["expected_runs"], places=9)
+
+    def test_sensitivity_endpoint_rejects_other_team(self):
+        other_team = Team.objects.create()
+        payload = {
+            "team_id": other_team.id,
+            "player_ids": [p.id for p in self.players],
+        }
+        resp = self.client.post(self.url, payload, format="json")
+        self.assertEqual(resp.status_code, 400)
+
+
+class LineupSubstitutionTests(TestCase):
+    """Tests for batched bench substitution scoring."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/v1/lineups/substitutions/"
+        self.team = Team.objects.create()
+        self.players = []
+        for i in range(12):
+            p = Player.objects.create(
+                name=f"Player {i+1}",
+                team=self.team,
+                b_game=100.0 + i,
+                pa=400 + 10 * i,
+                hit=90 + 5 * (i % 4),
+                home_run=5 + 3 * (i % 5),
+                walk=30 + i,
+                b_total_bases=140 + 9 * (i % 6),
+                b_gnd_into_dp=4,
+            )
+            self.players.append(p)
+        self.lineup = self.players[:9]
+        self.bench = self.players[9:]
+
+    def test_swaps_match_scalar_baserun(self):
+        from lineups.services.algorithm_logic import (
+            calculate_player_baserun_values
+        )
+        from lineups.services.substitution import evaluate_substitutions
+        results = evaluate_substitutions(self.lineup, self.bench)
+        self.assertEqual(len(results), 3 * 9)
+        runs = [r["expected_runs"] for r in results]
+        self.assertEqual(runs, sorted(runs, reverse=True))
+        current = calculate_player_baserun_values(tuple(self.lineup))
+        for r in results:
+            swapped = list(self.lineup)
+            swapped[r["slot"] - 1] = Player.objects.get(pk=r["player_id"])
+            expected = calculate_player_baserun_values(tuple(swapped))
+            self.assertAlmostEqual(r["expected_runs"], expected, places=9)
+            self.assertAlmostEqual(r["delta_runs"], expected - current,
+                                   places=9)
+
+    def test_reoptimize_matches_brute_force(self):
+        from lineups.services.algorithm_logic import algorithm_create_lineup
+        from lineups.services.substitution import evaluate_substitutions
+        results = evaluate_substitutions(self.lineup, self.bench[:1],
+                                         slot=4, reoptimize=True)
+        self.assertEqual(len(results), 1)
+        new_nine = list(self.lineup)
+        new_nine[3] = self.bench[0]
+        expected = algorithm_create_lineup(new_nine)
+        self.assertEqual(results[0]["optimized_order"],
+                         [p.id for p in expected])
+
+    def test_reoptimize_requires_slot(self):
+        from lineups.services.substitution import evaluate_substitutions
+        with self.assertRaises(ValueError):
+            evaluate_substitutions(self.lineup, self.bench, reoptimize=True)
+
+    def test_substitution_endpoint_single_slot(self):
+        payload = {
+            "team_id": self.team.id,
+            "player_ids": [p.id for p in self.lineup],
+            "slot": 4,
+        }
+        resp = self.client.post(self.url, payload, format="json")
+        self.assertEqual(resp.status_code, 200)
+        subs = resp.json()["substitutions"]
+        self.assertEqual({s["player_id"] for s in subs},
+                         {p.id for p in self.bench})
+        self.assertTrue(all(s["slot"] == 4 for s in subs))
+        self.assertTrue(all(s["replaced_player_id"] == self.lineup[3].id
+                            for s in subs))
+
+    def test_substitution_endpoint_reoptimize_without_slot(self):
+        payload = {
+            "team_id": self.team.id,
+            "player_ids": [p.id for p in self.lineup],
+            "reoptimize": True,
+        }
+        resp = self.client.post(self.url, payload, format="json")
+        self.assertEqual(resp.status_code, 400)
+        # Rejected by the serializer, before any player is fetched
+        self.assertIn("slot", resp.json())
@@ -9,7 +9,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from . import views
-from .views import LineupCreateView, LineupDeleteView
+from .views import (LineupCreateView, LineupDeleteView,
+                    LineupSensitivityView, LineupSubstitutionView)
 
 app_name = "lineups"
 
@@ -23,6 +24,14 @@ router.register(r"lineup-players", views.LineupPlayerViewSet,
 urlpatterns = [
     # POST /api/v1/lineups/ -> create a lineup via algorithm
     path("", LineupCreateView.as_view(), name="lineup-create"),
+    # POST /api/v1/lineups/sensitivity/ -> player-by-slot runs matrix
+    path("sensitivity/", LineupSensitivityView.as_view(),
+         name="lineup-sensitivity"),
+    # POST /api/v1/lineups/optimize/ -> best order for a nine (async)
+    path("optimize/", views.lineup_optimize_async, name="lineup-optimize"),
+    # POST /api/v1/lineups/substitutions/ -> ranked bench replacements
+    path("substitutions/", LineupSubstitutionView.as_view(),
+         name="lineup-substitutions"),
     # DELETE /api/v1/lineups/<id>/ -> delete a saved lineup
     path("<int:pk>/", LineupDeleteView.as_view(), name="lineup-delete"),
     # Include router-managed viewset routes (saved lineups, lineup players)
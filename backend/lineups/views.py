@@ -5,16 +5,29 @@
   - backend/lineups/urls.py
 """
 
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import permissions, status, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from roster.conditional import ConditionalGetMixin
+from roster.services.roster_version import LINEUPS_KEY, bump_roster_versions
+from simulator.async_api import validated_request_data
+from simulator.services.scheduler import SchedulerBusy, request_owner
+from simulator.services.worker_pool import DeadlineExceeded
 from .interactor import LineupCreationInteractor
 from .models import Lineup, LineupPlayer
+from .pagination import LineupCursorPagination
 from .serializers import (
     LineupModelSerializer, LineupOut,
-    LineupPlayerOut, LineupCreate
+    LineupPlayerOut, LineupCreate,
+    LineupSensitivityIn, LineupSensitivityOut, LineupOptimizeIn,
+    LineupSubstitutionIn, SubstitutionOut,
+    LINEUP_LIST_MAPPER, LINEUP_PLAYER_MAPPER, serialize_lineup_rows,
+    with_ordered_players
 )
 from .services.auth_user import authorize_lineup_deletion
 from .services.exceptions import DomainError
@@ -26,6 +39,12 @@ from .services.lineup_creation_handler import (
 #############################################################################
 
 
+def _busy_response(exc):
+    """429/503 with Retry-After for a search the scheduler did not admit."""
+    return Response(exc.response_data(), status=exc.status_code,
+                    headers=exc.response_headers())
+
+
 class LineupCreateView(APIView):
     """Create or generate a lineup.
     URL:
@@ -74,13 +93,16 @@ class LineupCreateView(APIView):
                     )
                 suggested_players = self.interactor.generate_suggested_lineup(
                     team_id=data.get("team_id"),
-                    selected_player_ids=selected_ids
+                    selected_player_ids=selected_ids,
+                    owner=request_owner(request),
                 )
                 return self._build_suggested_response(data.get("team_id"),
                                                       suggested_players)
         except DomainError as e:
             return Response({"detail": str(e)},
                             status=status.HTTP_400_BAD_REQUEST)
+        except SchedulerBusy as e:
+            return _busy_response(e)
 
     # Helper methods
     def _build_saved_response(self, lineup, lineup_players):
@@ -127,6 +149,109 @@ class LineupCreateView(APIView):
         return None
 
 
+class LineupSensitivityView(APIView):
+    """Player-by-slot expected-runs matrix for a given nine.
+
+    URL:
+      POST /api/v1/lineups/sensitivity/ -> 9x9 BaseRuns matrix (no save)
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.interactor = LineupCreationInteractor()
+
+    def post(self, request):
+        serializer = LineupSensitivityIn(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            result = self.interactor.compute_slot_sensitivity(
+                team_id=data["team_id"],
+                player_ids=data["player_ids"],
+            )
+        except DomainError as e:
+            return Response({"detail": str(e)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(LineupSensitivityOut(result).data,
+                        status=status.HTTP_200_OK)
+
+
+class LineupSubstitutionView(APIView):
+    """Rank every bench player at every slot of a given nine.
+
+    URL:
+      POST /api/v1/lineups/substitutions/ -> ranked substitutions (no save)
+
+    Body: team_id, player_ids (9, batting order), optional slot (1-9) and
+    reoptimize. reoptimize also returns each substitute's best batting
+    order; it needs a slot (400 without one).
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.interactor = LineupCreationInteractor()
+
+    def post(self, request):
+        serializer = LineupSubstitutionIn(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            ranked = self.interactor.evaluate_substitutions(
+                team_id=data["team_id"],
+                player_ids=data["player_ids"],
+                slot=data.get("slot"),
+                reoptimize=data["reoptimize"],
+                owner=request_owner(request),
+            )
+        except DomainError as e:
+            return Response({"detail": str(e)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except SchedulerBusy as e:
+            return _busy_response(e)
+        out = {
+            "team_id": data["team_id"],
+            "substitutions": SubstitutionOut(ranked, many=True).data,
+        }
+        return Response(out, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@require_POST
+async def lineup_optimize_async(request):
+    """Best batting order for a given nine, computed off the event loop.
+
+    URL:
+      POST /api/v1/lineups/optimize/ -> nine in optimal order (no save)
+    Async (ASGI) view: the BaseRuns search runs in the shared simulation
+    worker pool, and a client disconnect cancels the blocks not yet
+    started. With time_budget_ms the best order so far comes back marked
+    partial once the budget runs out.
+    """
+    data, error = await validated_request_data(request, LineupOptimizeIn,
+                                               require_auth=False)
+    if error is not None:
+        return error
+    try:
+        result = await LineupCreationInteractor().optimize_lineup_async(
+            team_id=data["team_id"],
+            player_ids=data["player_ids"],
+            owner=request_owner(request),
+            time_budget_ms=data.get("time_budget_ms"),
+        )
+    except DomainError as e:
+        return JsonResponse({"detail": str(e)},
+                            status=status.HTTP_400_BAD_REQUEST)
+    except SchedulerBusy as e:
+        return JsonResponse(e.response_data(), status=e.status_code,
+                            headers=e.response_headers())
+    except DeadlineExceeded as e:
+        return JsonResponse({"detail": str(e)},
+                            status=status.HTTP_504_GATEWAY_TIMEOUT)
+    return JsonResponse(result, status=status.HTTP_200_OK)
+
+
 class LineupDeleteView(APIView):
     """Delete a saved lineup by id.
 
@@ -153,19 +278,24 @@ class LineupDeleteView(APIView):
 
         # when authorized perform delete
         lineup.delete()
+        bump_roster_versions([LINEUPS_KEY])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class LineupViewSet(viewsets.ModelViewSet):
+class LineupViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Lineup model.
     Provides read-only access to saved lineups.
     Create and delete operations are handled by dedicated views.
+    Reads carry a per-user ETag / Last-Modified (304 on a match).
     """
 
     serializer_class = LineupModelSerializer
+    pagination_class = LineupCursorPagination
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'head', 'options']
+    version_key = LINEUPS_KEY
+    per_user_representation = True
 
     def get_queryset(self):
         user = getattr(self.request, "user", None)
@@ -174,11 +304,30 @@ class LineupViewSet(viewsets.ModelViewSet):
             return Lineup.objects.none()
         # Super users can see everything ***CAN BE CHANGED***
         if getattr(user, "is_superuser", False):
-            return Lineup.objects.all()
-        return Lineup.objects.filter(created_by_id=user.id)
+            queryset = Lineup.objects.all()
+        else:
+            queryset = Lineup.objects.filter(created_by_id=user.id)
+        # list renders values_list() rows; everything else goes through
+        # LineupModelSerializer, which reads the prefetched slots
+        if self.action != "list":
+            queryset = with_ordered_players(queryset)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, self._list_rows)
 
+    def _list_rows(self, request):
+        """Fast path: same JSON as LineupModelSerializer from values_list()
+        rows, with every lineup's players fetched in one query."""
+        rows = LINEUP_LIST_MAPPER.rows(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_lineup_rows(page))
+        return Response(serialize_lineup_rows(rows))
 
-class LineupPlayerViewSet(viewsets.ModelViewSet):
+
+class LineupPlayerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Player model.
     Provides CRUD operations for players.
@@ -186,3 +335,29 @@ class LineupPlayerViewSet(viewsets.ModelViewSet):
 
     queryset = LineupPlayer.objects.all()
     serializer_class = LineupPlayerOut
+    version_key = LINEUPS_KEY
+
+    def perform_create(self, serializer):
+        serializer.save()
+        bump_roster_versions([LINEUPS_KEY])
+
+    def perform_update(self, serializer):
+        serializer.save()
+        bump_roster_versions([LINEUPS_KEY])
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_roster_versions([LINEUPS_KEY])
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, self._list_rows)
+
+    def _list_rows(self, request):
+        """Fast path: same JSON as LineupPlayerOut from values_list() rows."""
+        rows = LINEUP_PLAYER_MAPPER.rows(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                LINEUP_PLAYER_MAPPER.serialize(page))
+        return Response(LINEUP_PLAYER_MAPPER.serialize(rows))
@@ -0,0 +1,72 @@
+"""
+Conditional GET for DRF viewsets, driven by roster.services.roster_version stamps.
+
+The ETag hashes the stamp together with everything else the representation depends on (path,
+query string and, for per-user views, the user), so answering a poll with 304 needs only the
+stamp lookup - no player or lineup query runs.
+"""
+
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .services.roster_version import ROSTER_KEY, current_version
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag / Last-Modified to list and retrieve, answering matching conditional requests with 304.
+
+    Subclasses pick the stamp via version_key (or override get_version_key) and set
+    per_user_representation when the payload depends on the requesting user.
+    """
+
+    version_key = ROSTER_KEY
+    per_user_representation = False
+
+    def get_version_key(self, request) -> str:
+        return self.version_key
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        """Run handler(request, *args, **kwargs) unless the client's cached copy is still current."""
+        stamp, last_modified = current_version(self.get_version_key(request))
+        etag = self._etag(request, stamp)
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+        if self._not_modified(request, etag, last_modified_ts):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response["ETag"] = etag
+        if last_modified_ts is not None:
+            response["Last-Modified"] = http_date(last_modified_ts)
+        if self.per_user_representation:
+            patch_vary_headers(response, ("Authorization", "Cookie"))
+        return response
+
+    def _etag(self, request, stamp: int) -> str:
+        user_id = getattr(request.user, "pk", None) if self.per_user_representation else None
+        raw = f"{stamp}|{request.path}|{request.META.get('QUERY_STRING', '')}|{user_id}"
+        return quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest())
+
+    @staticmethod
+    def _not_modified(request, etag: str, last_modified_ts) -> bool:
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+            tags = parse_etags(if_none_match)
+            return "*" in tags or etag in tags
+        if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE") or "")
+        return bool(if_modified_since and last_modified_ts is not None and last_modified_ts <= if_modified_since)
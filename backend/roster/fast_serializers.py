@@ -0,0 +1,88 @@
+"""
+Read-optimized serialization for bulk list endpoints.
+
+ModelSerializer builds a field tree per instance and converts each value through a Field object.
+For list endpoints that only render columns, a ValuesRowMapper compiles the (response key, ORM
+lookup) pairs once, reads rows with values_list(named=True) and turns each tuple into a dict with a
+single zip. Converters are only attached to the few columns whose DRF representation differs from
+the database value (e.g. datetimes), so the JSON schema stays identical to the ModelSerializer's.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rest_framework import serializers
+
+from .models import Player
+from .serializer import PlayerSerializer
+
+Converter = Callable[[Any], Any]
+
+# DRF's own datetime rendering (ISO 8601, current timezone), shared so output matches ModelSerializer
+to_datetime_repr: Converter = serializers.DateTimeField().to_representation
+
+
+class ValuesRowMapper:
+    """Precompiled mapping from values_list(named=True) rows to response dicts."""
+
+    def __init__(self, fields: Sequence[Tuple[str, str]], converters: Optional[Dict[str, Converter]] = None):
+        """
+        Args:
+            fields: (response key, ORM lookup) pairs in response order
+            converters: Optional response key -> function applied to non-null values
+        """
+        self.fields = tuple(fields)
+        self.keys = tuple(key for key, _ in self.fields)
+        self.columns = tuple(column for _, column in self.fields)
+        self.converters = dict(converters or {})
+        self._converted = tuple((key, fn) for key, fn in self.converters.items() if key in self.keys)
+
+    def rows(self, queryset, extra_columns: Iterable[str] = ()):
+        """
+        Narrow a queryset to the mapped columns; rows are named tuples (cursor pagination can read them).
+
+        extra_columns (e.g. the paginator's ordering) are selected after the mapped ones, so
+        serialize() drops them.
+        """
+        extra = [column for column in dict.fromkeys(extra_columns) if column not in self.columns]
+        return queryset.values_list(*self.columns, *extra, named=True)
+
+    def to_dict(self, row: Sequence[Any]) -> Dict[str, Any]:
+        data = dict(zip(self.keys, row))
+        for key, fn in self._converted:
+            if data[key] is not None:
+                data[key] = fn(data[key])
+        return data
+
+    def serialize(self, rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+        keys = self.keys
+        if not self._converted:
+            return [dict(zip(keys, row)) for row in rows]
+        return [self.to_dict(row) for row in rows]
+
+    def subset(self, keys: Optional[Iterable[str]]) -> "ValuesRowMapper":
+        """
+        Mapper restricted to the given response keys (sparse fieldsets); None keeps every field.
+
+        Unknown keys are ignored; the result maps no field when none of the keys is known.
+        """
+        if not keys:
+            return self
+        wanted = set(keys)
+        return ValuesRowMapper([field for field in self.fields if field[0] in wanted], self.converters)
+
+
+def model_field_mapper(model, field_names: Sequence[str]) -> ValuesRowMapper:
+    """
+    Mapper rendering model fields the way ModelSerializer does for plain columns.
+
+    Foreign keys render as their primary key value (read from the <name>_id column).
+    """
+    pairs = []
+    for name in field_names:
+        field = model._meta.get_field(name)
+        pairs.append((name, field.attname))
+    return ValuesRowMapper(pairs)
+
+
+# PlayerSerializer's exact list representation
+PLAYER_LIST_MAPPER = model_field_mapper(Player, PlayerSerializer.Meta.fields)
@@ -0,0 +1,71 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+# Numeric Player columns that accept <field>_min / <field>_max range filters
+RANGE_FILTER_FIELDS = (
+    "year",
+    "ab",
+    "pa",
+    "hit",
+    "single",
+    "double",
+    "triple",
+    "home_run",
+    "strikeout",
+    "walk",
+    "k_percent",
+    "bb_percent",
+    "slg_percent",
+    "on_base_percent",
+    "isolated_power",
+    "b_total_bases",
+    "r_total_caught_stealing",
+    "r_total_stolen_base",
+    "b_game",
+    "b_gnd_into_dp",
+    "b_hit_by_pitch",
+    "b_intent_walk",
+    "b_sac_bunt",
+    "b_sac_fly",
+    "wos_score",
+)
+
+
+class PlayerFilterBackend(BaseFilterBackend):
+    """
+    Server-side player filters, all pushed into the WHERE clause.
+
+    ?team=1,2           players on any of the teams
+    ?year=2025          season year
+    ?min_pa=100         plate-appearance threshold (alias of pa_min)
+    ?<field>_min=/_max= inclusive range on any RANGE_FILTER_FIELDS column
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        if "team" in params:
+            queryset = queryset.filter(team_id__in=self._ints(params["team"], "team"))
+        if "year" in params:
+            queryset = queryset.filter(year=self._number(params["year"], "year"))
+        if "min_pa" in params:
+            queryset = queryset.filter(pa__gte=self._number(params["min_pa"], "min_pa"))
+        for field in RANGE_FILTER_FIELDS:
+            if f"{field}_min" in params:
+                queryset = queryset.filter(**{f"{field}__gte": self._number(params[f"{field}_min"], f"{field}_min")})
+            if f"{field}_max" in params:
+                queryset = queryset.filter(**{f"{field}__lte": self._number(params[f"{field}_max"], f"{field}_max")})
+        return queryset
+
+    @staticmethod
+    def _number(value, name):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: f"Expected a number, got {value!r}."})
+
+    @staticmethod
+    def _ints(value, name):
+        try:
+            return [int(part) for part in value.split(",") if part.strip()]
+        except ValueError:
+            raise ValidationError({name: f"Expected comma-separated ids, got {value!r}."})
@@ -17,6 +17,25 @@ class Command(BaseCommand):
             default=None,
             help="Team id to assign to all players unless CSV includes a team_id column",
         )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=500,
+            help="Rows per bulk insert/update batch",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            dest="stream",
+            help="Read the file lazily and commit each batch in its own transaction (large files)",
+        )
+        parser.add_argument(
+            "--no-resume",
+            action="store_false",
+            dest="resume",
+            help="With --stream, start from the top instead of the last committed batch",
+        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
@@ -28,9 +47,22 @@ class Command(BaseCommand):
         path = options.get("file")
         team_id_arg = options.get("team_id")
         dry_run = options.get("dry_run")
+        batch_size = options.get("batch_size") or 500
 
         try:
-            result = PlayerImportService.import_from_csv(path, team_id=team_id_arg, dry_run=dry_run)
+            if options.get("stream"):
+                result = PlayerImportService.import_from_csv_streaming(
+                    path,
+                    team_id=team_id_arg,
+                    dry_run=dry_run,
+                    batch_size=batch_size,
+                    resume=options.get("resume", True),
+                    progress=lambda rows: self.stdout.write(f"... {rows} rows committed"),
+                )
+            else:
+                result = PlayerImportService.import_from_csv(
+                    path, team_id=team_id_arg, dry_run=dry_run, batch_size=batch_size
+                )
         except FileNotFoundError:
             raise CommandError(f"File not found: {path}")
 
@@ -40,6 +72,7 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS(
                 f"Import summary: processed={result.get('processed')} "
-                f"created={result.get('created')} updated={result.get('updated')}"
+                f"created={result.get('created')} updated={result.get('updated')} "
+                f"unchanged={result.get('unchanged', 0)}"
             )
         )
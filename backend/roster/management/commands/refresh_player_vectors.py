@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from roster.services.player_vectors import VECTOR_VERSION, refresh_player_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored per-player simulation/BaseRuns vectors (e.g. after a formula version bump)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=500,
+            help="Rows per bulk update batch",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_player_vectors(batch_size=options.get("batch_size"))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed vectors for {refreshed} players (version {VECTOR_VERSION})"))
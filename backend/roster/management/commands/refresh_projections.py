@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from roster.services.projections import PROJECTION_VERSION, refresh_projections
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Marcel-style player projections from the season history (e.g. after a formula version bump)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--through-year",
+            dest="through_year",
+            type=int,
+            default=None,
+            help="Latest season to blend in (default: latest season on file)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=500,
+            help="Rows per bulk upsert batch",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_projections(through_year=options.get("through_year"), batch_size=options.get("batch_size"))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed projections for {refreshed} players (version {PROJECTION_VERSION})"))
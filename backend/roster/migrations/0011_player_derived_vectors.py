@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0010_load_initial_players'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='baserun_rates',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='outcome_probabilities',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='vectors_version',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
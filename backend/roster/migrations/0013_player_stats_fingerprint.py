@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0012_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='stats_fingerprint',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+STAT_FIELDS = [
+    'ab', 'pa', 'hit', 'single', 'double', 'triple', 'home_run', 'strikeout', 'walk', 'k_percent',
+    'bb_percent', 'slg_percent', 'on_base_percent', 'isolated_power', 'b_total_bases',
+    'r_total_caught_stealing', 'r_total_stolen_base', 'b_game', 'b_gnd_into_dp', 'b_hit_by_pitch',
+    'b_intent_walk', 'b_sac_bunt', 'b_sac_fly',
+]
+
+
+def backfill_seasons(apps, schema_editor):
+    """Seed the history table with every existing snapshot that has a season year."""
+    Player = apps.get_model('roster', 'Player')
+    PlayerSeasonStats = apps.get_model('roster', 'PlayerSeasonStats')
+    rows = Player.objects.filter(year__isnull=False).values('id', 'year', 'team_id', *STAT_FIELDS)
+    PlayerSeasonStats.objects.bulk_create(
+        [
+            PlayerSeasonStats(
+                player_id=row['id'],
+                year=row['year'],
+                team_id=row['team_id'],
+                **{field: row[field] for field in STAT_FIELDS},
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0013_player_stats_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerSeasonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('ab', models.PositiveIntegerField(blank=True, null=True)),
+                ('pa', models.PositiveIntegerField(blank=True, null=True)),
+                ('hit', models.PositiveIntegerField(blank=True, null=True)),
+                ('single', models.PositiveIntegerField(blank=True, null=True)),
+                ('double', models.PositiveIntegerField(blank=True, null=True)),
+                ('triple', models.PositiveIntegerField(blank=True, null=True)),
+                ('home_run', models.PositiveIntegerField(blank=True, null=True)),
+                ('strikeout', models.PositiveIntegerField(blank=True, null=True)),
+                ('walk', models.PositiveIntegerField(blank=True, null=True)),
+                ('k_percent', models.FloatField(blank=True, null=True)),
+                ('bb_percent', models.FloatField(blank=True, null=True)),
+                ('slg_percent', models.FloatField(blank=True, null=True)),
+                ('on_base_percent', models.FloatField(blank=True, null=True)),
+                ('isolated_power', models.FloatField(blank=True, null=True)),
+                ('b_total_bases', models.FloatField(blank=True, null=True)),
+                ('r_total_caught_stealing', models.FloatField(blank=True, null=True)),
+                ('r_total_stolen_base', models.FloatField(blank=True, null=True)),
+                ('b_game', models.FloatField(blank=True, null=True)),
+                ('b_gnd_into_dp', models.FloatField(blank=True, null=True)),
+                ('b_hit_by_pitch', models.FloatField(blank=True, null=True)),
+                ('b_intent_walk', models.FloatField(blank=True, null=True)),
+                ('b_sac_bunt', models.FloatField(blank=True, null=True)),
+                ('b_sac_fly', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seasons', to='roster.player')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='player_seasons', to='roster.team')),
+            ],
+            options={
+                'db_table': 'player_season_stats',
+                'ordering': ['player_id', 'year'],
+                'indexes': [models.Index(fields=['year', 'player'], name='season_stats_year_player_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'year'), name='uniq_player_season')],
+            },
+        ),
+        migrations.RunPython(backfill_seasons, migrations.RunPython.noop),
+    ]
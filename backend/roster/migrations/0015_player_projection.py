@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0014_player_season_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerProjection',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='projection', serialize=False, to='roster.player')),
+                ('version', models.PositiveSmallIntegerField()),
+                ('through_year', models.PositiveIntegerField()),
+                ('seasons_used', models.PositiveSmallIntegerField()),
+                ('projected_pa', models.FloatField()),
+                ('outcome_probabilities', models.JSONField(blank=True, null=True)),
+                ('baserun_rates', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'player_projections',
+            },
+        ),
+    ]
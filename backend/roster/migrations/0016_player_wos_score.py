@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:13
+
+from django.db import migrations, models
+
+WEIGHTS = {'ubb': 0.696, 'hbp': 0.726, 'single': 0.883, 'double': 1.244, 'triple': 1.569, 'home_run': 2.004}
+
+
+def backfill_wos_scores(apps, schema_editor):
+    """Score existing players with the formula frozen at this migration (player_vectors.compute_wos_scores)."""
+    Player = apps.get_model('roster', 'Player')
+    fields = ('pa', 'hit', 'double', 'triple', 'home_run', 'walk', 'b_intent_walk', 'b_hit_by_pitch', 'b_sac_bunt')
+    updates = []
+    for row in Player.objects.values('id', *fields).iterator():
+        pa, hit, double, triple, home_run, walk, ibb, hbp, sh = (row[f] or 0 for f in fields)
+        denominator = pa - sh - ibb
+        if denominator <= 0:
+            continue
+        events = (
+            WEIGHTS['ubb'] * (walk - ibb)
+            + WEIGHTS['hbp'] * hbp
+            + WEIGHTS['single'] * max(hit - double - triple - home_run, 0)
+            + WEIGHTS['double'] * double
+            + WEIGHTS['triple'] * triple
+            + WEIGHTS['home_run'] * home_run
+        )
+        updates.append(Player(id=row['id'], wos_score=events / denominator))
+    Player.objects.bulk_update(updates, ['wos_score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0015_player_projection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='wos_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['wos_score', 'id'], name='players_wos_score_idx'),
+        ),
+        migrations.RunPython(backfill_wos_scores, migrations.RunPython.noop),
+    ]
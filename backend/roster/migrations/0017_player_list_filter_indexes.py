@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0016_player_wos_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['team', 'year'], name='players_team_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['pa'], name='players_pa_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0018_roster_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='player',
+            name='wos_score',
+            field=models.FloatField(db_default=0.0, default=0.0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0019_player_wos_score_db_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerseasonstats',
+            name='stats_fingerprint',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roster', '0020_player_season_stats_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectionBaseline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveSmallIntegerField()),
+                ('through_year', models.PositiveIntegerField()),
+                ('league_rates', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'projection_baseline',
+            },
+        ),
+    ]
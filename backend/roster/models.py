@@ -12,8 +12,36 @@ class Team(models.Model):
         return f"Team {self.id}"
 
 
+# Player columns the import fingerprint and the derived vectors are computed from; changing any of
+# them outside the importer / player_vectors invalidates both (see Player.save and PlayerQuerySet.update)
+PLAYER_STAT_FIELDS = frozenset(
+    {
+        "team", "team_id", "savant_player_id", "year", "ab", "pa", "hit", "single", "double", "triple", "home_run",
+        "strikeout", "walk", "k_percent", "bb_percent", "slg_percent", "on_base_percent", "isolated_power",
+        "b_total_bases", "r_total_caught_stealing", "r_total_stolen_base", "b_game", "b_gnd_into_dp",
+        "b_hit_by_pitch", "b_intent_walk", "b_sac_bunt", "b_sac_fly",
+    }
+)
+# Fields cleared when stats change, unless the same write sets them
+DERIVED_STATE_FIELDS = ("vectors_version", "stats_fingerprint")
+
+
+class PlayerQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """Bulk stat writes (including bulk_update) also invalidate the stored vectors and import fingerprint."""
+        if PLAYER_STAT_FIELDS.intersection(kwargs):
+            for field in DERIVED_STATE_FIELDS:
+                kwargs.setdefault(field, None)
+        return super().update(**kwargs)
+
+
 class Player(models.Model):
-    """Basic player model storing player information."""
+    """
+    Basic player model storing player information.
+
+    Saving changed stats clears vectors_version and stats_fingerprint (unless the same save sets
+    them), so readers fall back to the raw stats until player_vectors refreshes the row.
+    """
 
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -71,9 +99,225 @@ class Player(models.Model):
         null=True, blank=True
     )  # SF: Sacrifice Fly - Occurs when a batter hits a deep fly ball that is caught by an outfielder (or an infielder playing in the outfield), but a baserunner on third base tags up and scores before the play is over.
 
+    # SHA-256 of the last imported CSV row (team + stats); unchanged rows are skipped on re-import
+    stats_fingerprint = models.CharField(max_length=64, null=True, blank=True)
+
+    # Derived per-player vectors, refreshed in bulk by roster.services.player_vectors on import/update.
+    # Hot paths only trust them when vectors_version matches player_vectors.VECTOR_VERSION.
+    vectors_version = models.PositiveSmallIntegerField(null=True, blank=True)
+    outcome_probabilities = models.JSONField(
+        null=True, blank=True
+    )  # [K, in-play out, BB, 1B, 2B, 3B, HR] per PA; null when the counting stats are inconsistent
+    baserun_rates = models.JSONField(
+        null=True, blank=True
+    )  # Per-game PA, H, HR, BB, IBB, HBP, SB, CS, GIDP, SF, SH, TB used by the BaseRuns optimizer
+    # wOBA-style ranking score, refreshed with the vectors. db_default too: the COPY import's
+    # INSERT ... SELECT does not list it, and Postgres keeps no column default for default=
+    wos_score = models.FloatField(default=0.0, db_default=0.0)
+
+    objects = PlayerQuerySet.as_manager()
+
     class Meta:
         db_table = "players"
         ordering = ["name"]  # alphabetical order
+        indexes = [
+            # ORDER BY wos_score, id LIMIT n and keyset pages for the ranked endpoint (scanned backwards for DESC)
+            models.Index(fields=["wos_score", "id"], name="players_wos_score_idx"),
+            # List filters: team pages (optionally one season) and PA thresholds
+            models.Index(fields=["team", "year"], name="players_team_year_idx"),
+            models.Index(fields=["pa"], name="players_pa_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_state()
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        cleared = self._invalidate_derived_state()
+        if update_fields is not None and cleared:
+            kwargs["update_fields"] = {*update_fields, *cleared}
+        super().save(*args, **kwargs)
+        self._remember_loaded_state()
+
+    def _remember_loaded_state(self):
+        """Snapshot the stat and derived-state values as stored (deferred fields are skipped)."""
+        deferred = self.get_deferred_fields()
+        self._loaded_state = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+            and (field.attname in PLAYER_STAT_FIELDS or field.attname in DERIVED_STATE_FIELDS)
+        }
+
+    def _invalidate_derived_state(self):
+        """Clear derived fields left untouched by a save that changes stats; returns the cleared names."""
+        loaded = getattr(self, "_loaded_state", None)
+        if loaded is None:
+            return []
+        stats_changed = any(
+            getattr(self, attname) != value for attname, value in loaded.items() if attname in PLAYER_STAT_FIELDS
+        )
+        if not stats_changed:
+            return []
+        cleared = [field for field in DERIVED_STATE_FIELDS if field in loaded and getattr(self, field) == loaded[field]]
+        for field in cleared:
+            setattr(self, field, None)
+        return cleared
+
+
+class PlayerSeasonQuerySet(models.QuerySet):
+    """Season lookups that hit the (year, player) index."""
+
+    def for_season(self, year: int):
+        return self.filter(year=year)
+
+    def current(self):
+        """Rows of the latest season on file (the max-year subquery runs inside the same query)."""
+        latest = PlayerSeasonStats.objects.order_by("-year").values("year")[:1]
+        return self.filter(year=models.Subquery(latest))
+
+
+class PlayerSeasonStats(models.Model):
+    """
+    One season of batting stats for one player.
+
+    Player keeps the latest snapshot for the hot paths; this table keeps every season that has been
+    loaded, so importing an older year never overwrites a newer one. Columns mirror Player's stat block.
+    """
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="seasons")
+    year = models.PositiveIntegerField()
+    team = models.ForeignKey(Team, on_delete=models.SET_NULL, related_name="player_seasons", null=True, blank=True)
+
+    ab = models.PositiveIntegerField(null=True, blank=True)
+    pa = models.PositiveIntegerField(null=True, blank=True)
+    hit = models.PositiveIntegerField(null=True, blank=True)
+    single = models.PositiveIntegerField(null=True, blank=True)
+    double = models.PositiveIntegerField(null=True, blank=True)
+    triple = models.PositiveIntegerField(null=True, blank=True)
+    home_run = models.PositiveIntegerField(null=True, blank=True)
+    strikeout = models.PositiveIntegerField(null=True, blank=True)
+    walk = models.PositiveIntegerField(null=True, blank=True)
+    k_percent = models.FloatField(null=True, blank=True)
+    bb_percent = models.FloatField(null=True, blank=True)
+    slg_percent = models.FloatField(null=True, blank=True)
+    on_base_percent = models.FloatField(null=True, blank=True)
+    isolated_power = models.FloatField(null=True, blank=True)
+    b_total_bases = models.FloatField(null=True, blank=True)
+    r_total_caught_stealing = models.FloatField(null=True, blank=True)
+    r_total_stolen_base = models.FloatField(null=True, blank=True)
+    b_game = models.FloatField(null=True, blank=True)
+    b_gnd_into_dp = models.FloatField(null=True, blank=True)
+    b_hit_by_pitch = models.FloatField(null=True, blank=True)
+    b_intent_walk = models.FloatField(null=True, blank=True)
+    b_sac_bunt = models.FloatField(null=True, blank=True)
+    b_sac_fly = models.FloatField(null=True, blank=True)
+
+    # Fingerprint of the CSV row this season came from (see PlayerImportService._fingerprint);
+    # None when written by anything else, so the next import rewrites it
+    stats_fingerprint = models.CharField(max_length=64, null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PlayerSeasonQuerySet.as_manager()
+
+    class Meta:
+        db_table = "player_season_stats"
+        ordering = ["player_id", "year"]
+        constraints = [
+            models.UniqueConstraint(fields=["player", "year"], name="uniq_player_season"),
+        ]
+        indexes = [
+            # Whole-season reads (optimizer/simulator lookups, season appends) filter on year first
+            models.Index(fields=["year", "player"], name="season_stats_year_player_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} ({self.year})"
+
+
+class PlayerProjection(models.Model):
+    """
+    Regressed, multi-season-weighted simulation inputs for one player.
+
+    Rebuilt in bulk by roster.services.projections whenever the player's season history changes;
+    readers only trust rows whose version matches projections.PROJECTION_VERSION.
+    """
+
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, related_name="projection", primary_key=True)
+    version = models.PositiveSmallIntegerField()
+    through_year = models.PositiveIntegerField()  # Latest season blended in
+    seasons_used = models.PositiveSmallIntegerField()  # Seasons in the weighting window with plate appearances
+    projected_pa = models.FloatField()
+    outcome_probabilities = models.JSONField(
+        null=True, blank=True
+    )  # [K, in-play out, BB, 1B, 2B, 3B, HR] per PA; null when the blended stats are inconsistent
+    baserun_rates = models.JSONField()  # Per-game rates in player_vectors.BASERUN_RATE_FIELDS order
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "player_projections"
+
+    def __str__(self):
+        return f"{self.player_id} through {self.through_year}"
+
+
+class ProjectionBaseline(models.Model):
+    """
+    League baseline the stored projections were regressed toward (a single row).
+
+    A partial projection refresh reuses it while the league totals and latest season are
+    unchanged; any difference makes it refresh every player so no projection keeps an old baseline.
+    """
+
+    version = models.PositiveSmallIntegerField()
+    through_year = models.PositiveIntegerField()
+    league_rates = models.JSONField()  # Per-PA rates in projections.PROJECTION_STAT_FIELDS order
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "projection_baseline"
+
+    def __str__(self):
+        return f"baseline through {self.through_year}"
+
+
+class RosterVersion(models.Model):
+    """
+    Change stamp for a cacheable slice of the API ("roster", "team:<id>", "lineups").
+
+    Bumped by every write path (API, services, imports) so conditional GETs can answer
+    If-None-Match / If-Modified-Since from this one small table.
+    """
+
+    key = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField()  # Nanosecond stamp of the last change; only ever compared for equality
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "roster_versions"
+
+    def __str__(self):
+        return f"{self.key}@{self.version}"
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of a streaming CSV import; committed in the same transaction as each batch."""
+
+    source = models.CharField(max_length=500, unique=True)  # Absolute path of the imported file
+    file_signature = models.CharField(max_length=64)  # "size:mtime_ns" - a changed file restarts from the top
+    rows_committed = models.PositiveIntegerField(default=0)  # CSV data rows fully written so far
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "import_checkpoints"
+
+    def __str__(self):
+        return f"{self.source} ({self.rows_committed} rows)"
@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Cursor pagination applied only when the client sends ?page_size= or ?cursor=.
+
+    Plain requests still get the unpaginated array the existing frontend expects.
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class PlayerCursorPagination(OptInCursorPagination):
+    """Opt-in cursor pagination for the player list, ordered by the unique player name."""
+
+    ordering = ("name",)
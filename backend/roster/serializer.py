@@ -13,7 +13,29 @@ class PlayerNameValidationMixin:
         return value.strip()
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Mixin to honour a ?fields=a,b,c sparse fieldset from the request; unknown names are ignored."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        requested = requested_fields(request)
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """Field names from ?fields= on a GET request, or None when the full representation is wanted."""
+    if request is None or request.method != "GET":
+        return None
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+class TeamSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Team model."""
 
     class Meta:
@@ -21,7 +43,7 @@ class TeamSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class PlayerSerializer(PlayerNameValidationMixin, serializers.ModelSerializer):
+class PlayerSerializer(SparseFieldsMixin, PlayerNameValidationMixin, serializers.ModelSerializer):
     """Serializer for Player model with nested team information."""
 
     class Meta:
@@ -167,4 +189,14 @@ class PlayerRankQuerySerializer(serializers.Serializer):
     """Serializer for validating query parameters for ranked endpoint."""
 
     ascending = serializers.BooleanField(default=False, required=False)
-    top = serializers.IntegerField(min_value=1, required=False)
+    top = serializers.IntegerField(min_value=1, max_value=1000, default=100, required=False)
+    after = serializers.CharField(required=False, help_text="Cursor from a previous page's 'next'")
+
+    def validate_after(self, value: str) -> str:
+        from .services.player_ranking import decode_rank_cursor
+
+        try:
+            decode_rank_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
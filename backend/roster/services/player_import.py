@@ -1,30 +1,90 @@
 import csv
+import hashlib
+import json
 from decimal import Decimal
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 
-from django.db import transaction
+from django.db import connection, transaction
+from django.utils import timezone
 
-from roster.models import Player, Team
+from roster.models import ImportCheckpoint, Player, PlayerSeasonStats, Team
+from roster.services.player_vectors import refresh_player_vectors
+from roster.services.projections import refresh_projections
+from roster.services.roster_version import bump_roster_versions, player_write_keys
+from roster.services.season_stats import SEASON_STAT_FIELDS, season_from_values, upsert_seasons
+
+
+# Player columns written by the importer besides name/team (see _prepare_player_data)
+IMPORT_FIELDS = [
+    "savant_player_id",
+    "year",
+    "pa",
+    "hit",
+    "single",
+    "double",
+    "triple",
+    "home_run",
+    "strikeout",
+    "walk",
+    "k_percent",
+    "bb_percent",
+    "slg_percent",
+    "on_base_percent",
+    "isolated_power",
+    "b_total_bases",
+    "r_total_caught_stealing",
+    "r_total_stolen_base",
+    "b_game",
+    "b_gnd_into_dp",
+    "b_hit_by_pitch",
+    "b_intent_walk",
+    "b_sac_fly",
+    "b_sac_bunt",
+]
+
+# Columns the PostgreSQL COPY path stages and inserts. Every other NOT NULL players column
+# needs a database default (db_default): the merge's INSERT never supplies it.
+COPY_COLUMNS = ["name", "team_id", *IMPORT_FIELDS, "stats_fingerprint"]
+
+# (name, team_id, field values) for one parsed CSV row
+ParsedRow = Tuple[str, Optional[int], Dict[str, Any]]
+
+
+class BatchResult(NamedTuple):
+    """Outcome of writing one batch of parsed rows."""
+
+    created: int
+    updated: int
+    unchanged: int
+    ids: List[int]
 
 
 class PlayerImportService:
     """Service for importing players from CSV files."""
 
+    # Use COPY + staging-table merge when running on PostgreSQL (ORM bulk path elsewhere)
+    use_postgres_copy = True
+
     @staticmethod  # pragma: no cover
     def import_from_csv(
-        path: str | Path, team_id: Optional[int] = None, dry_run: bool = False
+        path: str | Path, team_id: Optional[int] = None, dry_run: bool = False, batch_size: int = 500
     ) -> Dict[str, Any]:
         """
         Import players from a CSV file into the roster Player model.
 
+        Existing players and referenced teams are prefetched in one query each, then rows are
+        written with bulk_create/bulk_update in batches of batch_size.
+
         Args:
             path: Path to the CSV file
             team_id: Optional team ID to assign to all players
             dry_run: If True, simulate import without saving
+            batch_size: Rows per bulk_create/bulk_update statement
 
         Returns:
-            Dict containing import summary (processed, created, updated, messages)
+            Dict containing import summary (processed, created, updated, unchanged, messages)
         """
         messages: List[str] = []
         file_path = Path(path)
@@ -47,69 +107,408 @@ class PlayerImportService:
                 "messages": ["No rows found in CSV."],
             }
 
-        # Pre-fetch or create team if provided globally
-        global_team = None
-        if team_id is not None:
-            global_team, _ = Team.objects.get_or_create(pk=team_id)
-
-        processed = 0
+        # 1-3. Extract name, team and field values for every row (no queries)
+        parsed = PlayerImportService._parse_rows(rows, team_id, messages)
+        processed = len(parsed)
         created_count = 0
         updated_count = 0
+        unchanged_count = 0
 
-        # Use transaction for data integrity (unless dry_run)
-        try:
-            with transaction.atomic():
-                for r in rows:
-                    # 1. Extract Name
-                    name = PlayerImportService._extract_name(r)
-                    if not name:
-                        messages.append(f"Skipping row without name: {r}")
-                        continue
-
-                    # 2. Determine Team
-                    team_obj = PlayerImportService._determine_team(r, global_team)
-
-                    # 3. Prepare Data
-                    defaults = PlayerImportService._prepare_player_data(r)
-
-                    if dry_run:
-                        messages.append(
-                            f"Would import player: {name} team={team_obj.id if team_obj else 'None'} fields={defaults}"
-                        )
-                        processed += 1
-                        continue
-
-                    # 4. Update or Create
-                    player, created = Player.objects.update_or_create(
-                        name=name,
-                        defaults={**defaults, "team": team_obj},
-                    )
+        if dry_run:
+            for name, row_team_id, defaults in parsed:
+                messages.append(
+                    f"Would import player: {name} team={row_team_id if row_team_id else 'None'} fields={defaults}"
+                )
+        else:
+            # 4. Bulk write inside one transaction for data integrity
+            try:
+                with transaction.atomic():
+                    if team_id is not None:
+                        PlayerImportService._ensure_teams({team_id})
+                    result = PlayerImportService._write_batch(parsed, batch_size)
+                    created_count, updated_count, unchanged_count = result.created, result.updated, result.unchanged
+            except Exception as e:
+                messages.append(f"Import failed: {e}")
+                raise e
 
-                    processed += 1
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
+        messages.append(
+            f"Processed {processed} rows: created={created_count} updated={updated_count} unchanged={unchanged_count}"
+        )
+        return {
+            "processed": processed,
+            "created": created_count,
+            "updated": updated_count,
+            "unchanged": unchanged_count,
+            "messages": messages,
+        }
+
+    @staticmethod  # pragma: no cover
+    def import_from_csv_streaming(
+        path: str | Path,
+        team_id: Optional[int] = None,
+        dry_run: bool = False,
+        batch_size: int = 1000,
+        resume: bool = True,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Import a (possibly very large) CSV in fixed-size batches, each committed in its own transaction.
 
-                if dry_run:
-                    # Rollback is implicit since we didn't write, but good to be explicit mentally
-                    pass
+        Rows are read lazily, so memory stays flat regardless of file size. An ImportCheckpoint row is
+        committed together with every batch; if a batch fails, earlier batches stay written and a rerun
+        with resume=True skips straight past them. A file that changed since the checkpoint restarts.
 
+        Args:
+            path: Path to the CSV file
+            team_id: Optional team ID to assign to all players
+            dry_run: If True, parse and count rows without saving (no checkpoint either)
+            batch_size: Rows parsed, validated and committed per transaction
+            resume: Continue from the last committed batch of an unfinished import of this file
+            progress: Optional callback receiving the number of rows committed after each batch
+
+        Returns:
+            Dict containing import summary (processed, created, updated, unchanged, resumed_from, batches, messages)
+        """
+        file_path = Path(path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+
+        source = str(file_path.resolve())
+        stat = file_path.stat()
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        start_row = 0
+        checkpoint = None
+        if not dry_run:
+            checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=source, defaults={"file_signature": signature})
+            if resume and not checkpoint.completed and checkpoint.file_signature == signature:
+                start_row = checkpoint.rows_committed
+            checkpoint.file_signature = signature
+            checkpoint.rows_committed = start_row
+            checkpoint.completed = False
+            checkpoint.save()
+            if team_id is not None:
+                PlayerImportService._ensure_teams({team_id})
+
+        messages: List[str] = []
+        if start_row:
+            messages.append(f"Resuming {file_path.name} after {start_row} committed rows")
+        rows_done = start_row
+        processed = created_count = updated_count = unchanged_count = batches = 0
+
+        try:
+            with file_path.open(newline="", encoding="utf-8-sig") as f:
+                reader = islice(csv.DictReader(f), start_row, None)
+                while True:
+                    raw_batch = list(islice(reader, batch_size))
+                    if not raw_batch:
+                        break
+                    # Skipped-row messages are kept per batch only, to keep memory flat
+                    batch_messages: List[str] = []
+                    parsed = PlayerImportService._parse_rows(raw_batch, team_id, batch_messages)
+                    if not dry_run:
+                        with transaction.atomic():
+                            result = PlayerImportService._write_batch(parsed, batch_size)
+                            checkpoint.rows_committed = rows_done + len(raw_batch)
+                            checkpoint.save(update_fields=["rows_committed", "updated_at"])
+                        created_count += result.created
+                        updated_count += result.updated
+                        unchanged_count += result.unchanged
+                    rows_done += len(raw_batch)
+                    processed += len(parsed)
+                    batches += 1
+                    if batch_messages:
+                        messages.append(f"Batch {batches}: skipped {len(batch_messages)} rows without name")
+                    if progress is not None:
+                        progress(rows_done)
         except Exception as e:
-            if not dry_run:
-                messages.append(f"Import failed: {e}")
-                raise e
+            messages.append(f"Import stopped after {rows_done} committed rows: {e}")
+            raise
+
+        if checkpoint is not None:
+            checkpoint.completed = True
+            checkpoint.save(update_fields=["completed", "updated_at"])
 
         messages.append(
-            f"Processed {processed} rows: created={created_count} updated={updated_count}"
+            f"Processed {processed} rows in {batches} batches: "
+            f"created={created_count} updated={updated_count} unchanged={unchanged_count}"
         )
         return {
             "processed": processed,
             "created": created_count,
             "updated": updated_count,
+            "unchanged": unchanged_count,
+            "resumed_from": start_row,
+            "batches": batches,
             "messages": messages,
         }
 
+    @staticmethod  # pragma: no cover
+    def _parse_rows(rows: Iterable[Dict[str, Any]], team_id: Optional[int], messages: List[str]) -> List[ParsedRow]:
+        """Turn raw CSV rows into (name, team_id, defaults); rows without a name are skipped."""
+        parsed: List[ParsedRow] = []
+        for r in rows:
+            name = PlayerImportService._extract_name(r)
+            if not name:
+                messages.append(f"Skipping row without name: {r}")
+                continue
+            parsed.append(
+                (name, PlayerImportService._determine_team_id(r, team_id), PlayerImportService._prepare_player_data(r))
+            )
+        return parsed
+
+    @staticmethod  # pragma: no cover
+    def _write_batch(parsed: List[ParsedRow], batch_size: int = 500) -> BatchResult:
+        """
+        Upsert parsed rows by name with a constant number of queries.
+
+        Later rows for the same name win, and count as updates, matching per-row update_or_create.
+        Existing players whose stored stats_fingerprint matches the row are left untouched (no write,
+        no updated_at bump, no vector refresh). Rows with a year are also upserted into the
+        per-season history; a row older than the player's snapshot season only writes history, and
+        is unchanged when that season's stored stats_fingerprint matches it.
+
+        Returns:
+            BatchResult with created/updated/unchanged counts and the ids of every written player
+        """
+        if connection.vendor == "postgresql" and PlayerImportService.use_postgres_copy:
+            return PlayerImportService._write_batch_copy(parsed, batch_size)
+
+        names = {name for name, _, _ in parsed}
+        existing = {p.name: p for p in Player.objects.filter(name__in=names)}
+        PlayerImportService._ensure_teams({tid for _, tid, _ in parsed if tid is not None})
+        # Fingerprints of the stored seasons that rows older than the snapshot would overwrite
+        older = {
+            (existing[name].pk, defaults["year"])
+            for name, _, defaults in parsed
+            if name in existing and PlayerImportService._is_older_season(existing[name], defaults)
+        }
+        season_fingerprints: Dict[Tuple[int, int], Optional[str]] = {}
+        if older:
+            stored = PlayerSeasonStats.objects.filter(
+                player_id__in={player_id for player_id, _ in older}, year__in={year for _, year in older}
+            ).values_list("player_id", "year", "stats_fingerprint")
+            season_fingerprints = {(player_id, year): fingerprint for player_id, year, fingerprint in stored}
+
+        to_create: Dict[str, Player] = {}
+        changed: Dict[str, Player] = {}
+        # (name, year) -> (team_id, stats, fingerprint); the last row for a season wins
+        season_rows: Dict[Tuple[str, int], Tuple[Optional[int], Dict[str, Any], str]] = {}
+        moved_from: Set[Optional[int]] = set()  # previous teams of updated players
+        created_count = 0
+        updated_count = 0
+        unchanged_count = 0
+        now = timezone.now()
+        for name, row_team_id, defaults in parsed:
+            fingerprint = PlayerImportService._fingerprint(row_team_id, defaults)
+            player = existing.get(name) or to_create.get(name)
+            if player is None:
+                to_create[name] = Player(name=name, team_id=row_team_id, stats_fingerprint=fingerprint, **defaults)
+                created_count += 1
+                if defaults["year"] is not None:
+                    season_rows[(name, defaults["year"])] = (row_team_id, defaults, fingerprint)
+                continue
+            if PlayerImportService._is_older_season(player, defaults):
+                # Backfilling an older season: keep the newer snapshot, compare with the stored season
+                if season_fingerprints.get((player.pk, defaults["year"])) == fingerprint:
+                    unchanged_count += 1
+                else:
+                    season_rows[(name, defaults["year"])] = (row_team_id, defaults, fingerprint)
+                    updated_count += 1
+                continue
+            if player.stats_fingerprint == fingerprint:
+                unchanged_count += 1
+                continue
+            if defaults["year"] is not None:
+                season_rows[(name, defaults["year"])] = (row_team_id, defaults, fingerprint)
+            for field, value in defaults.items():
+                setattr(player, field, value)
+            moved_from.add(player.team_id)
+            player.team_id = row_team_id
+            player.stats_fingerprint = fingerprint
+            player.updated_at = now
+            if name in existing:
+                changed[name] = player
+            updated_count += 1
+
+        created = Player.objects.bulk_create(list(to_create.values()), batch_size=batch_size)
+        if changed:
+            Player.objects.bulk_update(
+                list(changed.values()), IMPORT_FIELDS + ["team", "stats_fingerprint", "updated_at"], batch_size=batch_size
+            )
+
+        ids = [p.id for p in changed.values()]
+        if all(p.pk is not None for p in created):
+            created_ids = {p.name: p.pk for p in created}
+        else:
+            # Backends that cannot return primary keys from bulk inserts
+            created_ids = dict(Player.objects.filter(name__in=list(to_create)).values_list("name", "id"))
+        ids.extend(created_ids.values())
+
+        if season_rows:
+            player_ids = {name: player.pk for name, player in existing.items()} | created_ids
+            upsert_seasons(
+                [
+                    season_from_values(player_ids[name], year, row_team_id, stats, fingerprint)
+                    for (name, year), (row_team_id, stats, fingerprint) in season_rows.items()
+                ],
+                batch_size=batch_size,
+            )
+
+        # Recompute derived vectors for everything we touched in one pass
+        if ids:
+            refresh_player_vectors(ids, batch_size=batch_size)
+            written_teams = {p.team_id for p in [*changed.values(), *to_create.values()]}
+            bump_roster_versions(player_write_keys(written_teams | moved_from))
+        return BatchResult(created_count, updated_count, unchanged_count, ids)
+
+    @staticmethod  # pragma: no cover
+    def _write_batch_copy(parsed: List[ParsedRow], batch_size: int = 500) -> BatchResult:
+        """
+        PostgreSQL fast path: COPY rows into a temporary staging table, then merge set-based.
+
+        Teams are created with one INSERT ... ON CONFLICT DO NOTHING and players with one
+        INSERT ... ON CONFLICT (name) DO UPDATE that skips rows whose fingerprint is unchanged
+        or whose season is older than the snapshot; a third statement upserts the season history,
+        skipping seasons whose stored fingerprint matches the row.
+        Must run inside a transaction (the staging table is dropped on commit).
+        """
+        if not parsed:
+            return BatchResult(0, 0, 0, [])
+        # ON CONFLICT cannot touch the same row twice, so each statement merges one staged row per key:
+        # per name the newest season (later rows win ties), per (name, year) the last row
+        snapshot_rows: Dict[str, int] = {}
+        season_rows: Dict[Tuple[str, int], int] = {}
+        for index, (name, _, defaults) in enumerate(parsed):
+            current = snapshot_rows.get(name)
+            season_key = PlayerImportService._season_key
+            if current is None or season_key(defaults) >= season_key(parsed[current][2]):
+                snapshot_rows[name] = index
+            if defaults["year"] is not None:
+                season_rows[(name, defaults["year"])] = index
+
+        columns = COPY_COLUMNS
+        column_types = [
+            "bigint" if column == "team_id" else Player._meta.get_field(column).db_type(connection) for column in columns
+        ]
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        staging_columns = ", ".join(f'"{column}" {db_type}' for column, db_type in zip(columns, column_types))
+        assignments = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in columns[1:] + ["updated_at"])
+        now = timezone.now()
+
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS roster_import_staging")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE roster_import_staging (row_order integer, {staging_columns}) ON COMMIT DROP"
+            )
+            # Django's CursorWrapper exposes the underlying psycopg3 cursor as .cursor
+            with cursor.cursor.copy(f"COPY roster_import_staging (row_order, {column_list}) FROM STDIN") as copy:
+                for index, (name, team_id, defaults) in enumerate(parsed):
+                    copy.write_row(
+                        [index, name, team_id, *(defaults.get(f) for f in IMPORT_FIELDS),
+                         PlayerImportService._fingerprint(team_id, defaults)]
+                    )
+
+            cursor.execute(
+                "INSERT INTO teams (id) SELECT DISTINCT team_id FROM roster_import_staging "
+                "WHERE team_id IS NOT NULL ON CONFLICT (id) DO NOTHING"
+            )
+            # Teams players are about to leave, so their cached rosters get invalidated too
+            cursor.execute(
+                "SELECT DISTINCT p.team_id FROM players p JOIN roster_import_staging s ON p.name = s.name "
+                "WHERE s.row_order = ANY(%s) AND p.team_id IS DISTINCT FROM s.team_id",
+                [list(snapshot_rows.values())],
+            )
+            moved_from = {team_id for (team_id,) in cursor.fetchall()}
+            cursor.execute(
+                f"INSERT INTO players ({column_list}, created_at, updated_at) "
+                f"SELECT {column_list}, %s, %s FROM roster_import_staging WHERE row_order = ANY(%s) "
+                f"ON CONFLICT (name) DO UPDATE SET {assignments} "
+                f"WHERE players.stats_fingerprint IS DISTINCT FROM EXCLUDED.stats_fingerprint "
+                f"AND (players.year IS NULL OR EXCLUDED.year IS NULL OR EXCLUDED.year >= players.year) "
+                # xmax = 0 only for freshly inserted tuples
+                f"RETURNING id, name, (xmax = 0) AS inserted",
+                [now, now, list(snapshot_rows.values())],
+            )
+            written = {name: (player_id, inserted) for player_id, name, inserted in cursor.fetchall()}
+            ids = [player_id for player_id, _ in written.values()]
+
+            # Season history: every written snapshot, plus older-season rows that left the snapshot
+            # alone and differ from the stored season
+            season_fields = ["team_id", *(f for f in SEASON_STAT_FIELDS if f in IMPORT_FIELDS), "stats_fingerprint"]
+            season_columns = ", ".join(f'"{f}"' for f in season_fields)
+            staged_columns = ", ".join(f's."{f}"' for f in season_fields)
+            season_assignments = ", ".join(f'"{f}" = EXCLUDED."{f}"' for f in season_fields + ["updated_at"])
+            cursor.execute(
+                f"INSERT INTO player_season_stats (player_id, year, {season_columns}, updated_at) "
+                f"SELECT p.id, s.year, {staged_columns}, %s "
+                f"FROM roster_import_staging s JOIN players p ON p.name = s.name "
+                f"WHERE s.row_order = ANY(%s) "
+                f"AND (p.id = ANY(%s) OR p.stats_fingerprint IS DISTINCT FROM s.stats_fingerprint) "
+                f"ON CONFLICT (player_id, year) DO UPDATE SET {season_assignments} "
+                f"WHERE player_season_stats.stats_fingerprint IS DISTINCT FROM EXCLUDED.stats_fingerprint "
+                f"RETURNING player_id, year",
+                [now, list(season_rows.values()), ids],
+            )
+            seasons_written = set(cursor.fetchall())
+            cursor.execute(
+                "SELECT DISTINCT p.name, p.id FROM players p JOIN roster_import_staging s ON p.name = s.name"
+            )
+            player_ids = dict(cursor.fetchall())
+
+        created_count = updated_count = unchanged_count = 0
+        for index, (name, _, defaults) in enumerate(parsed):
+            season = (player_ids.get(name), defaults["year"])
+            if snapshot_rows[name] == index and name in written:
+                if written[name][1]:
+                    created_count += 1
+                else:
+                    updated_count += 1
+            elif defaults["year"] is not None and season_rows[(name, defaults["year"])] == index:
+                if season in seasons_written:
+                    updated_count += 1
+                else:
+                    unchanged_count += 1
+            elif snapshot_rows[name] == index:
+                unchanged_count += 1
+            else:
+                # Superseded by a later row in this batch, like successive update_or_create calls
+                updated_count += 1
+
+        if ids:
+            # New rows start from the column defaults (wos_score 0, no vectors); compute them now
+            refresh_player_vectors(ids, batch_size=batch_size)
+            bump_roster_versions(player_write_keys({team_id for _, team_id, _ in parsed} | moved_from))
+        seasoned = {player_id for player_id, _ in seasons_written}
+        if seasoned:
+            refresh_projections(seasoned, batch_size=batch_size)
+        return BatchResult(created_count, updated_count, unchanged_count, ids)
+
+    @staticmethod  # pragma: no cover
+    def _season_key(defaults: Dict[str, Any]) -> int:
+        """Sort key of a row's season for picking the snapshot row (rows without a year sort first)."""
+        return -1 if defaults["year"] is None else defaults["year"]
+
+    @staticmethod  # pragma: no cover
+    def _is_older_season(player: Player, defaults: Dict[str, Any]) -> bool:
+        """The row belongs to a season before the player's snapshot season."""
+        return defaults["year"] is not None and player.year is not None and defaults["year"] < player.year
+
+    @staticmethod  # pragma: no cover
+    def _fingerprint(team_id: Optional[int], defaults: Dict[str, Any]) -> str:
+        """Content fingerprint of one parsed row (team plus every imported field)."""
+        payload = json.dumps({"team_id": team_id, **defaults}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod  # pragma: no cover
+    def _ensure_teams(team_ids: Set[int]) -> None:
+        """Create any referenced teams that do not exist yet (one lookup, one bulk insert)."""
+        if not team_ids:
+            return
+        existing = set(Team.objects.filter(pk__in=team_ids).values_list("pk", flat=True))
+        missing = team_ids - existing
+        if missing:
+            Team.objects.bulk_create([Team(pk=tid) for tid in sorted(missing)])
+
     @staticmethod # pragma: no cover
     def _extract_name(row: Dict[str, Any]) -> Optional[str]:
         """Extract and normalize player name from row."""
@@ -129,8 +528,8 @@ class PlayerImportService:
         return name.strip() if name else None
 
     @staticmethod # pragma: no cover
-    def _determine_team(row: Dict[str, Any], global_team: Optional[Team]) -> Optional[Team]: 
-        """Determine team for the player."""
+    def _determine_team_id(row: Dict[str, Any], global_team_id: Optional[int]) -> Optional[int]:
+        """Determine the team id for the player (CSV column first, then the global team)."""
         team_id_csv = None
         if "team_id" in row:
             team_id_csv = row.get("team_id")
@@ -139,13 +538,11 @@ class PlayerImportService:
 
         if team_id_csv:
             try:
-                tid = int(team_id_csv)
-                team, _ = Team.objects.get_or_create(pk=tid)
-                return team
+                return int(team_id_csv)
             except Exception:
                 pass
-        
-        return global_team
+
+        return global_team_id
 
     @staticmethod # pragma: no cover
     def _prepare_player_data(r: Dict[str, Any]) -> Dict[str, Any]:
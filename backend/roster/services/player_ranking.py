@@ -2,16 +2,28 @@
 Service module for player ranking and WOS calculations.
 Separates business logic from views.
 
-NOTE: This is a PLACEHOLDER algorithm.
+Scores are stored on Player.wos_score (see roster.services.player_vectors) and ranked in SQL.
+NOTE: The score itself is a PLACEHOLDER metric (wOBA-style linear weights).
 The ranking logic will be replaced by the algorithm in lineups/services/algorithm_logic.py
 """
 
-from typing import Any, Dict, List, Optional
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Q
 
 from roster.models import Player, Team
+from roster.services.player_vectors import refresh_player_vectors
+from roster.services.roster_version import LINEUPS_KEY, bump_roster_versions, player_write_keys
+from roster.services.season_stats import record_player_seasons
+
+
 
 
 
+# Columns returned by the ranking endpoint
+RANKED_PLAYER_FIELDS = ("id", "name", "team_id", "bb_percent", "k_percent", "pa", "year", "wos_score")
 
 
 def get_all_players_with_stats() -> List[Dict[str, Any]]:
@@ -20,40 +32,60 @@ def get_all_players_with_stats() -> List[Dict[str, Any]]:
 
     Returns a list of dicts with fields used by downstream placeholder logic.
     """
-    return list(
-        Player.objects.all().values(
-            "id",
-            "name",
-            "team_id",
-            "bb_percent",
-            "k_percent",
-            "pa",
-            "year",
-        )
-    )
-
-
-def get_ranked_players(ascending: bool = False, top_n: Optional[int] = None) -> List[Dict[str, Any]]:
+    return list(Player.objects.all().values(*RANKED_PLAYER_FIELDS))
+
+
+def encode_rank_cursor(player: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just past the given ranked row."""
+    payload = json.dumps([player["wos_score"], player["id"]])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decode a cursor from encode_rank_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
     """
-    Placeholder ranking: returns all players with a synthetic `wos_score` field.
+    try:
+        score, player_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(score), int(player_id)
+    except Exception as e:
+        raise ValueError(f"Invalid ranking cursor: {cursor}") from e
+
+
+def get_ranked_players(
+    ascending: bool = False, top_n: Optional[int] = None, after: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
-    players = get_all_players_with_stats()
+    Rank players by their stored wos_score in the database.
 
-    if not players:
-        return []
+    Ordering, limiting and paging all happen in SQL on the (wos_score, id) index, so a page costs
+    the same regardless of roster size. Ties are broken by id, in the same direction as the score.
 
-    result: List[Dict[str, Any]] = []
-    for player in players:
-        player_data = dict(player)
-        player_data["wos_score"] = 0.0
-        result.append(player_data)
+    Args:
+        ascending: Lowest scores first
+        top_n: Maximum number of rows (None = all remaining)
+        after: Cursor from encode_rank_cursor; returns the rows ranked after it
 
-    if top_n:
-        result = result[:top_n]
+    Returns:
+        List of dicts with RANKED_PLAYER_FIELDS
 
-    # sort by wos_score
-    result.sort(key=lambda p: p["wos_score"], reverse=not ascending)
-    return result
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    qs = Player.objects.values(*RANKED_PLAYER_FIELDS)
+    if after:
+        score, player_id = decode_rank_cursor(after)
+        if ascending:
+            qs = qs.filter(Q(wos_score__gt=score) | Q(wos_score=score, id__gt=player_id))
+        else:
+            qs = qs.filter(Q(wos_score__lt=score) | Q(wos_score=score, id__lt=player_id))
+    qs = qs.order_by("wos_score", "id") if ascending else qs.order_by("-wos_score", "-id")
+    if top_n:
+        qs = qs[:top_n]
+    return list(qs)
 
 
 def create_player_with_stats(name: str, **stats) -> Player:
@@ -67,7 +99,12 @@ def create_player_with_stats(name: str, **stats) -> Player:
     Returns:
         Created Player instance
     """
-    return Player.objects.create(name=name, **stats)
+    player = Player.objects.create(name=name, **stats)
+    refresh_player_vectors([player.id])
+    record_player_seasons([player.id])
+    bump_roster_versions(player_write_keys([player.team_id]))
+    player.refresh_from_db()
+    return player
 
 
 def update_player_stats(player_id: int, **stats) -> Player:
@@ -85,11 +122,18 @@ def update_player_stats(player_id: int, **stats) -> Player:
         Player.DoesNotExist: If player not found
     """
     player = Player.objects.get(id=player_id)
+    old_team_id = player.team_id
 
     for field, value in stats.items():
         setattr(player, field, value)
+    # Manual edits must not be mistaken for an unchanged CSV row on the next import
+    player.stats_fingerprint = None
 
     player.save()
+    refresh_player_vectors([player.id])
+    record_player_seasons([player.id])
+    bump_roster_versions(player_write_keys([old_team_id, player.team_id]) + [LINEUPS_KEY])
+    player.refresh_from_db()
     return player
 
 
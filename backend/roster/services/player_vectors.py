@@ -0,0 +1,189 @@
+"""
+Derived per-player vectors used by the simulator and the lineup optimizer.
+
+Both hot paths used to rebuild their inputs from raw counting stats on every
+request. This module computes them for many players at once with NumPy and
+stores them on the Player row, tagged with VECTOR_VERSION so a formula change
+simply invalidates old rows. The indexed wos_score ranking column is refreshed
+in the same pass.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from roster.models import Player
+
+# Bump when the formulas below change; stale rows are ignored until refreshed.
+VECTOR_VERSION = 1
+
+# Raw stats behind the 7 simulator outcome probabilities
+# (same inputs as simulator.services.dto.BatterStats).
+PROBABILITY_STAT_FIELDS = ("pa", "hit", "double", "triple", "home_run", "strikeout", "walk")
+
+# Season counting stats behind the BaseRuns per-game rates, in column order.
+BASERUN_RATE_FIELDS = (
+    "pa",
+    "hit",
+    "home_run",
+    "walk",
+    "b_intent_walk",
+    "b_hit_by_pitch",
+    "r_total_stolen_base",
+    "r_total_caught_stealing",
+    "b_gnd_into_dp",
+    "b_sac_fly",
+    "b_sac_bunt",
+    "b_total_bases",
+)
+
+# Raw stats behind the wOBA-style ranking score, in column order.
+WOS_STAT_FIELDS = (
+    "pa",
+    "hit",
+    "double",
+    "triple",
+    "home_run",
+    "walk",
+    "b_intent_walk",
+    "b_hit_by_pitch",
+    "b_sac_bunt",
+)
+
+# Linear weights per event: unintentional BB, HBP, 1B, 2B, 3B, HR
+WOS_WEIGHTS = (0.696, 0.726, 0.883, 1.244, 1.569, 2.004)
+
+VECTOR_FIELDS = ["vectors_version", "outcome_probabilities", "baserun_rates", "wos_score"]
+
+_STAT_FIELDS = tuple(dict.fromkeys(PROBABILITY_STAT_FIELDS + BASERUN_RATE_FIELDS + WOS_STAT_FIELDS + ("b_game",)))
+
+
+def compute_outcome_probabilities(stats: np.ndarray) -> np.ndarray:
+    """
+    Vectorized BatterStats.to_probabilities.
+
+    Args:
+        stats: Array of shape (n, 7) in PROBABILITY_STAT_FIELDS order (missing values as 0)
+
+    Returns:
+        Array of shape (n, 7): [K, out, walk, 1B, 2B, 3B, HR]. Players without plate appearances
+        get all outs; rows whose outcomes exceed plate appearances are NaN.
+    """
+    pa, hits, doubles, triples, home_runs, strikeouts, walks = stats.T
+    singles = hits - doubles - triples - home_runs
+    safe_pa = np.where(pa > 0, pa, 1.0)
+
+    probs = np.column_stack(
+        [strikeouts / safe_pa, np.zeros(len(pa)), walks / safe_pa, singles / safe_pa,
+         doubles / safe_pa, triples / safe_pa, home_runs / safe_pa]
+    )
+    prob_sum = probs[:, 0] + probs[:, 2] + probs[:, 3] + probs[:, 4] + probs[:, 5] + probs[:, 6]
+    probs[:, 1] = np.maximum(0.0, 1.0 - prob_sum)
+
+    probs[pa <= 0] = [0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    probs[(pa > 0) & (prob_sum > 1.0 + 1e-8)] = np.nan
+    return probs
+
+
+def compute_baserun_rates(stats: np.ndarray, games: np.ndarray) -> np.ndarray:
+    """
+    Per-game BaseRuns rates.
+
+    Args:
+        stats: Array of shape (n, 12) in BASERUN_RATE_FIELDS order (missing values as 0)
+        games: Array of shape (n,) with games played
+
+    Returns:
+        Array of shape (n, 12); players without games played get a zero row.
+    """
+    safe_games = np.where(games > 0, games, 1.0)
+    rates = stats / safe_games[:, None]
+    rates[~(games > 0)] = 0.0
+    return rates
+
+
+def compute_wos_scores(stats: np.ndarray) -> np.ndarray:
+    """
+    wOBA-style ranking score: linear-weighted on-base events per (PA - SH - IBB).
+
+    Args:
+        stats: Array of shape (n, 9) in WOS_STAT_FIELDS order (missing values as 0)
+
+    Returns:
+        Array of shape (n,); players without a positive denominator score 0.
+    """
+    pa, hits, doubles, triples, home_runs, walks, intent_walks, hit_by_pitch, sac_bunts = stats.T
+    singles = np.maximum(hits - doubles - triples - home_runs, 0.0)
+    events = np.column_stack([walks - intent_walks, hit_by_pitch, singles, doubles, triples, home_runs])
+    denominator = pa - sac_bunts - intent_walks
+    safe = np.where(denominator > 0, denominator, 1.0)
+    return np.where(denominator > 0, events @ np.asarray(WOS_WEIGHTS) / safe, 0.0)
+
+
+def compute_player_vectors(players: Iterable[dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute every derived vector for a batch of players in one NumPy pass.
+
+    Args:
+        players: Dicts (e.g. from .values()) holding the raw stat fields
+
+    Returns:
+        (outcome_probabilities (n, 7), baserun_rates (n, 12), wos_scores (n,))
+    """
+    rows = list(players)
+    stats = np.array([[row.get(field) or 0 for field in _STAT_FIELDS] for row in rows], dtype=float)
+    stats = stats.reshape(len(rows), len(_STAT_FIELDS))
+    column = {field: idx for idx, field in enumerate(_STAT_FIELDS)}
+
+    probs = compute_outcome_probabilities(stats[:, [column[f] for f in PROBABILITY_STAT_FIELDS]])
+    rates = compute_baserun_rates(stats[:, [column[f] for f in BASERUN_RATE_FIELDS]], stats[:, column["b_game"]])
+    scores = compute_wos_scores(stats[:, [column[f] for f in WOS_STAT_FIELDS]])
+    return probs, rates, scores
+
+
+def refresh_player_vectors(player_ids: Optional[Iterable[int]] = None, batch_size: int = 500) -> int:
+    """
+    Recompute and store derived vectors.
+
+    Args:
+        player_ids: Players to refresh (None = every player)
+        batch_size: Rows per bulk_update batch
+
+    Returns:
+        Number of players refreshed
+    """
+    qs = Player.objects.all()
+    if player_ids is not None:
+        qs = qs.filter(id__in=list(player_ids))
+    rows = list(qs.values("id", *_STAT_FIELDS))
+    if not rows:
+        return 0
+
+    probs, rates, scores = compute_player_vectors(rows)
+    updates = []
+    for row, prob_row, rate_row, score in zip(rows, probs, rates, scores):
+        updates.append(
+            Player(
+                id=row["id"],
+                vectors_version=VECTOR_VERSION,
+                outcome_probabilities=None if np.isnan(prob_row).any() else prob_row.tolist(),
+                baserun_rates=rate_row.tolist(),
+                wos_score=float(score),
+            )
+        )
+    Player.objects.bulk_update(updates, VECTOR_FIELDS, batch_size=batch_size)
+    return len(updates)
+
+
+def stored_outcome_probabilities(player) -> Optional[List[float]]:
+    """Return the player's stored outcome probabilities if current, else None."""
+    if getattr(player, "vectors_version", None) != VECTOR_VERSION:
+        return None
+    return player.outcome_probabilities
+
+
+def stored_baserun_rates(player) -> Optional[List[float]]:
+    """Return the player's stored BaseRuns per-game rates if current, else None."""
+    if getattr(player, "vectors_version", None) != VECTOR_VERSION:
+        return None
+    return player.baserun_rates
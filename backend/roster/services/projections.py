@@ -0,0 +1,220 @@
+"""
+Marcel-style projections: regressed, multi-season-weighted simulation inputs.
+
+A 21-PA callup fed straight into BatterStats.to_probabilities produces extreme outcome rates. This
+module blends each player's last seasons (weights 5/4/3, newest first), regresses every per-PA rate
+toward the league rate with REGRESSION_PA plate appearances of league-average performance, and
+stores the resulting outcome probabilities and BaseRuns rates in PlayerProjection. The whole league
+is computed in one NumPy pass; imports refresh only the players whose seasons changed, unless the
+league baseline (ProjectionBaseline) moved with them, in which case every player is refreshed.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max, Sum
+
+from roster.models import PlayerProjection, PlayerSeasonStats, ProjectionBaseline
+from roster.services.player_vectors import (
+    BASERUN_RATE_FIELDS,
+    PROBABILITY_STAT_FIELDS,
+    VECTOR_VERSION,
+    compute_baserun_rates,
+    compute_outcome_probabilities,
+)
+
+# Bump when the weights or formulas below change; stale rows are ignored until refreshed.
+PROJECTION_VERSION = 1
+
+# Season weights, most recent season first
+SEASON_WEIGHTS = (5.0, 4.0, 3.0)
+
+# Plate appearances of league-average performance blended into every player
+REGRESSION_PA = 1200.0
+
+# Projected PA = 0.5 * last season PA + 0.1 * previous season PA + 200
+PA_WEIGHTS = (0.5, 0.1)
+PA_BASELINE = 200.0
+
+# Season columns the projection reads, in array column order
+PROJECTION_STAT_FIELDS = tuple(dict.fromkeys(PROBABILITY_STAT_FIELDS + BASERUN_RATE_FIELDS + ("b_game",)))
+
+PROJECTION_FIELDS = ["version", "through_year", "seasons_used", "projected_pa", "outcome_probabilities", "baserun_rates"]
+
+_COLUMN = {field: idx for idx, field in enumerate(PROJECTION_STAT_FIELDS)}
+_PA = _COLUMN["pa"]
+
+# The single ProjectionBaseline row
+BASELINE_ID = 1
+
+
+def league_rates(season_totals: np.ndarray) -> np.ndarray:
+    """
+    League per-PA rate of every stat, weighted across seasons like a player line.
+
+    Args:
+        season_totals: Array of shape (seasons, fields) with league sums, most recent season first
+
+    Returns:
+        Array of shape (fields,); zeros when the league has no plate appearances
+    """
+    weighted = np.asarray(SEASON_WEIGHTS)[: len(season_totals)] @ season_totals
+    if weighted[_PA] <= 0:
+        return np.zeros(len(PROJECTION_STAT_FIELDS))
+    return weighted / weighted[_PA]
+
+
+def blend_seasons(history: np.ndarray, league: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weight and regress season lines for many players at once.
+
+    Args:
+        history: Array of shape (players, seasons, fields), most recent season first, missing seasons as 0
+        league: League per-PA rates from league_rates
+
+    Returns:
+        (per-PA rates of shape (players, fields), projected plate appearances of shape (players,))
+    """
+    weights = np.asarray(SEASON_WEIGHTS)[: history.shape[1]]
+    weighted = np.einsum("s,nsf->nf", weights, history)
+    rates = (weighted + league * REGRESSION_PA) / (weighted[:, _PA] + REGRESSION_PA)[:, None]
+
+    recent_pa = history[:, : len(PA_WEIGHTS), _PA]
+    projected_pa = recent_pa @ np.asarray(PA_WEIGHTS)[: recent_pa.shape[1]] + PA_BASELINE
+    return rates, projected_pa
+
+
+def compute_projection_vectors(history: np.ndarray, league: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Turn season history into simulator and BaseRuns inputs with the same formulas as player_vectors.
+
+    Returns:
+        (outcome_probabilities (n, 7), baserun_rates (n, 12), projected_pa (n,))
+    """
+    rates, projected_pa = blend_seasons(history, league)
+    line = rates * projected_pa[:, None]  # projected season line
+    probs = compute_outcome_probabilities(line[:, [_COLUMN[f] for f in PROBABILITY_STAT_FIELDS]])
+    baserun = compute_baserun_rates(line[:, [_COLUMN[f] for f in BASERUN_RATE_FIELDS]], line[:, _COLUMN["b_game"]])
+    return probs, baserun, projected_pa
+
+
+def refresh_projections(
+    player_ids: Optional[Iterable[int]] = None, through_year: Optional[int] = None, batch_size: int = 500
+) -> int:
+    """
+    Recompute and store projections from the season history.
+
+    League rates always come from a single aggregate over the whole league. A refresh of a few
+    players keeps the stored baseline only while that aggregate and through_year match it; when
+    either moved (e.g. the upserted seasons shifted the league totals), every player in the window
+    is refreshed, so all stored projections share one baseline.
+
+    Args:
+        player_ids: Players to refresh (None = every player with a season in the window)
+        through_year: Latest season to blend in (default: latest season on file)
+        batch_size: Rows per upsert batch
+
+    Returns:
+        Number of projections written
+    """
+    if through_year is None:
+        through_year = PlayerSeasonStats.objects.aggregate(latest=Max("year"))["latest"]
+        if through_year is None:
+            return 0
+    years = [through_year - offset for offset in range(len(SEASON_WEIGHTS))]
+
+    totals = {
+        row["year"]: row
+        for row in PlayerSeasonStats.objects.filter(year__in=years)
+        .values("year")
+        .annotate(**{f"total_{field}": Sum(field) for field in PROJECTION_STAT_FIELDS})
+    }
+    season_totals = np.array(
+        [[totals.get(year, {}).get(f"total_{field}") or 0 for field in PROJECTION_STAT_FIELDS] for year in years],
+        dtype=float,
+    )
+    league = league_rates(season_totals)
+
+    if player_ids is not None:
+        baseline = ProjectionBaseline.objects.filter(pk=BASELINE_ID).first()
+        if _same_baseline(baseline, through_year, league):
+            league = np.asarray(baseline.league_rates, dtype=float)
+        else:
+            player_ids = None
+
+    qs = PlayerSeasonStats.objects.filter(year__in=years)
+    if player_ids is not None:
+        qs = qs.filter(player_id__in=list(player_ids))
+    rows = list(qs.values("player_id", "year", *PROJECTION_STAT_FIELDS))
+    if not rows:
+        return 0
+
+    index: Dict[int, int] = {}
+    for row in rows:
+        index.setdefault(row["player_id"], len(index))
+    history = np.zeros((len(index), len(years), len(PROJECTION_STAT_FIELDS)))
+    for row in rows:
+        history[index[row["player_id"]], through_year - row["year"]] = [row[f] or 0 for f in PROJECTION_STAT_FIELDS]
+
+    probs, baserun, projected_pa = compute_projection_vectors(history, league)
+    seasons_used = (history[:, :, _PA] > 0).sum(axis=1)
+
+    projections = [
+        PlayerProjection(
+            player_id=player_id,
+            version=PROJECTION_VERSION,
+            through_year=through_year,
+            seasons_used=int(seasons_used[idx]),
+            projected_pa=float(projected_pa[idx]),
+            outcome_probabilities=None if np.isnan(probs[idx]).any() else probs[idx].tolist(),
+            baserun_rates=baserun[idx].tolist(),
+        )
+        for player_id, idx in index.items()
+    ]
+    with transaction.atomic():
+        PlayerProjection.objects.bulk_create(
+            projections,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["player"],
+            update_fields=[*PROJECTION_FIELDS, "updated_at"],
+        )
+        if player_ids is None:
+            ProjectionBaseline.objects.update_or_create(
+                pk=BASELINE_ID,
+                defaults={"version": PROJECTION_VERSION, "through_year": through_year, "league_rates": league.tolist()},
+            )
+    return len(projections)
+
+
+def _same_baseline(baseline: Optional[ProjectionBaseline], through_year: int, league: np.ndarray) -> bool:
+    """Whether the stored baseline is the one a full refresh would use now."""
+    return (
+        baseline is not None
+        and baseline.version == PROJECTION_VERSION
+        and baseline.through_year == through_year
+        and np.allclose(baseline.league_rates, league, rtol=1e-12, atol=0.0)
+    )
+
+
+def apply_projections(players: Sequence) -> List:
+    """
+    Swap current projections into Player objects in memory (nothing is saved).
+
+    The stored-vector readers (stored_outcome_probabilities / stored_baserun_rates) then serve the
+    projected inputs, so PlayerService and the BaseRuns optimizer need no other change. Fetch the
+    players with select_related("projection") to keep this free of extra queries. Players without
+    a current projection keep their snapshot vectors.
+    """
+    for player in players:
+        try:
+            projection = player.projection
+        except PlayerProjection.DoesNotExist:
+            continue
+        if projection.version != PROJECTION_VERSION:
+            continue
+        player.outcome_probabilities = projection.outcome_probabilities
+        player.baserun_rates = projection.baserun_rates
+        player.vectors_version = VECTOR_VERSION
+    return list(players)
@@ -0,0 +1,50 @@
+"""
+Change stamps behind the conditional GET support (ETag / Last-Modified).
+
+Write paths call bump_roster_versions with the keys they affect; read endpoints look the stamp up
+with current_version, a single query on the small roster_versions table.
+"""
+
+import time
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from django.utils import timezone
+
+from roster.models import RosterVersion
+
+# Player and team lists, player detail and rankings
+ROSTER_KEY = "roster"
+# Saved lineups and lineup players (they embed player names)
+LINEUPS_KEY = "lineups"
+
+
+def team_key(team_id: int) -> str:
+    """Key for one team's roster (the player list filtered to that team)."""
+    return f"team:{team_id}"
+
+
+def player_write_keys(team_ids: Iterable[Optional[int]] = ()) -> list:
+    """Keys touched by a player write: the whole roster plus each team involved."""
+    return [ROSTER_KEY, *sorted({team_key(tid) for tid in team_ids if tid is not None})]
+
+
+def bump_roster_versions(keys: Iterable[str]) -> None:
+    """Stamp the given keys as changed now, in one upsert."""
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    now = timezone.now()
+    stamp = time.time_ns()
+    RosterVersion.objects.bulk_create(
+        [RosterVersion(key=key, version=stamp, updated_at=now) for key in keys],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["version", "updated_at"],
+    )
+
+
+def current_version(key: str) -> Tuple[int, Optional[datetime]]:
+    """(stamp, last change time) for a key; (0, None) when it was never bumped."""
+    row = RosterVersion.objects.filter(key=key).values_list("version", "updated_at").first()
+    return row if row is not None else (0, None)
@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional # pragma: no cover
 
 from roster.models import Player, Team # pragma: no cover
 from roster.services.player_import import PlayerImportService  # pragma: no cover
+from roster.services.roster_version import bump_roster_versions, player_write_keys  # pragma: no cover
 
 
 def get_csv_path() -> Optional[str]:  # pragma: no cover
@@ -54,6 +55,8 @@ def load_sample_players(team_id: int = 1) -> Dict[str, Any]:  # pragma: no cover
         # Assign any players without a team to the default team
         players_without_team = Player.objects.filter(team__isnull=True)
         updated_count = players_without_team.update(team=default_team)
+        if updated_count:
+            bump_roster_versions(player_write_keys([default_team.id]))
 
         return {
             "success": True,
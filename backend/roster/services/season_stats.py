@@ -0,0 +1,129 @@
+"""
+Per-season stat history (roster.models.PlayerSeasonStats).
+
+Player holds the latest snapshot that the simulator and optimizer read by default; this module
+appends whole seasons to the history table and serves one season's rows with a single indexed query.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db.models import Max
+
+from roster.models import Player, PlayerSeasonStats
+from roster.services.projections import refresh_projections
+
+# Stat columns shared by Player and PlayerSeasonStats
+SEASON_STAT_FIELDS = [
+    "ab",
+    "pa",
+    "hit",
+    "single",
+    "double",
+    "triple",
+    "home_run",
+    "strikeout",
+    "walk",
+    "k_percent",
+    "bb_percent",
+    "slg_percent",
+    "on_base_percent",
+    "isolated_power",
+    "b_total_bases",
+    "r_total_caught_stealing",
+    "r_total_stolen_base",
+    "b_game",
+    "b_gnd_into_dp",
+    "b_hit_by_pitch",
+    "b_intent_walk",
+    "b_sac_bunt",
+    "b_sac_fly",
+]
+
+
+def season_from_values(
+    player_id: int, year: int, team_id: Optional[int], stats: Dict[str, Any], fingerprint: Optional[str] = None
+) -> PlayerSeasonStats:
+    """Build an unsaved season row; stat keys that are not season columns are ignored."""
+    return PlayerSeasonStats(
+        player_id=player_id,
+        year=year,
+        team_id=team_id,
+        stats_fingerprint=fingerprint,
+        **{field: stats.get(field) for field in SEASON_STAT_FIELDS},
+    )
+
+
+def upsert_seasons(seasons: List[PlayerSeasonStats], batch_size: int = 500) -> int:
+    """
+    Insert or overwrite season rows keyed by (player, year) in one statement per batch.
+
+    Only the (player, year) pairs passed in are touched; other seasons are left alone. The
+    affected players' projections are refreshed in the same pass.
+    """
+    if not seasons:
+        return 0
+    PlayerSeasonStats.objects.bulk_create(
+        seasons,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["player", "year"],
+        update_fields=["team", *SEASON_STAT_FIELDS, "stats_fingerprint", "updated_at"],
+    )
+    refresh_projections({season.player_id for season in seasons}, batch_size=batch_size)
+    return len(seasons)
+
+
+def append_season(year: int, rows: Iterable[Dict[str, Any]], batch_size: int = 500) -> int:
+    """
+    Load a whole season into the history table.
+
+    Args:
+        year: Season the rows belong to
+        rows: Dicts with "player_id", optional "team_id" and any SEASON_STAT_FIELDS
+        batch_size: Rows per upsert statement
+
+    Returns:
+        Number of season rows written
+    """
+    seasons = [season_from_values(row["player_id"], year, row.get("team_id"), row) for row in rows]
+    return upsert_seasons(seasons, batch_size=batch_size)
+
+
+def record_player_seasons(player_ids: List[int], batch_size: int = 500) -> int:
+    """Copy the current Player snapshots into the history table (players without a year are skipped)."""
+    rows = Player.objects.filter(id__in=player_ids, year__isnull=False).values(
+        "id", "year", "team_id", *SEASON_STAT_FIELDS
+    )
+    seasons = [season_from_values(row["id"], row["year"], row["team_id"], row) for row in rows]
+    return upsert_seasons(seasons, batch_size=batch_size)
+
+
+def current_season_year() -> Optional[int]:
+    """Latest season on file, or None when no history has been loaded."""
+    return PlayerSeasonStats.objects.aggregate(latest=Max("year"))["latest"]
+
+
+def season_queryset(year: int):
+    """One season's rows with player and team joined in; filter/order further before evaluating."""
+    return PlayerSeasonStats.objects.for_season(year).select_related("player", "team")
+
+
+def as_season_player(season: PlayerSeasonStats) -> Player:
+    """
+    Return the season's Player with that season's stats in place of the snapshot (not saved back).
+
+    Stored vectors belong to the snapshot season, so vectors_version is cleared and callers
+    derive rates from the season's counting stats.
+    """
+    player = season.player
+    for field in SEASON_STAT_FIELDS:
+        setattr(player, field, getattr(season, field))
+    player.year = season.year
+    player.team = season.team
+    player.vectors_version = None
+    return player
+
+
+def players_for_season(player_ids: List[int], year: int) -> List[Player]:
+    """Fetch players as of one season in a single indexed query; players without that season are left out."""
+    return [as_season_player(season) for season in season_queryset(year).filter(player_id__in=player_ids)]
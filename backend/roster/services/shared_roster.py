@@ -0,0 +1,222 @@
+"""
+Shared-memory store for a team's numeric roster matrix.
+
+The parent process publishes player ids, outcome probabilities and BaseRuns
+per-game rates once into a single shared-memory block. Worker processes attach
+to it by name without copying, so work items only need small integer row
+indices instead of pickled Player/Batter objects.
+
+roster_publisher keeps the whole roster published for the simulator's process
+pools: once per roster version (roster_version.ROSTER_KEY), each run holding a
+lease so a superseded block is only unlinked after its last run.
+"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from roster.models import Player
+from roster.services.player_vectors import (
+    BASERUN_RATE_FIELDS,
+    PROBABILITY_STAT_FIELDS,
+    VECTOR_VERSION,
+    compute_player_vectors,
+)
+from roster.services.roster_version import ROSTER_KEY, current_version
+
+NUM_OUTCOMES = len(PROBABILITY_STAT_FIELDS)
+NUM_RATES = len(BASERUN_RATE_FIELDS)
+
+
+class SharedRosterHandle(NamedTuple):
+    """Picklable description of a published roster block (what workers receive)."""
+
+    name: str
+    num_players: int
+
+    @property
+    def probabilities_offset(self) -> int:
+        """Byte offset of the (n, 7) probability table inside the block."""
+        return self.num_players * np.dtype(np.int64).itemsize
+
+    @property
+    def rates_offset(self) -> int:
+        """Byte offset of the (n, 12) BaseRuns rate table inside the block."""
+        return self.probabilities_offset + self.num_players * NUM_OUTCOMES * np.dtype(np.float64).itemsize
+
+    @property
+    def size(self) -> int:
+        """Total block size in bytes."""
+        return self.rates_offset + self.num_players * NUM_RATES * np.dtype(np.float64).itemsize
+
+
+    def probability_table(self):
+        """(name, rows, offset) triple ParallelGame workers use to map the probability table."""
+        return (self.name, self.num_players, self.probabilities_offset)
+
+
+class SharedRosterMatrix:
+    """
+    A team's roster matrix living in shared memory.
+
+    Layout of the block (all 8-byte aligned):
+        player_ids     int64   (n,)
+        probabilities  float64 (n, 7)   [K, out, BB, 1B, 2B, 3B, HR]; NaN rows for invalid stats
+        baserun_rates  float64 (n, 12)  BASERUN_RATE_FIELDS order
+
+    Use publish() in the parent and attach() in workers; both work as context managers.
+    Only the publishing side unlinks the block.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: SharedRosterHandle, owner: bool):
+        self._shm = shm
+        self.handle = handle
+        self.owner = owner
+        n = handle.num_players
+        self.player_ids = np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self.probabilities = np.ndarray(
+            (n, NUM_OUTCOMES), dtype=np.float64, buffer=shm.buf, offset=handle.probabilities_offset
+        )
+        self.baserun_rates = np.ndarray((n, NUM_RATES), dtype=np.float64, buffer=shm.buf, offset=handle.rates_offset)
+        if not owner:
+            for array in (self.player_ids, self.probabilities, self.baserun_rates):
+                array.setflags(write=False)
+
+    @classmethod
+    def publish(cls, team_id: Optional[int] = None, players: Optional[Iterable[Player]] = None) -> "SharedRosterMatrix":
+        """
+        Build the matrix for a team (one query) or an explicit player list and copy it into a new block.
+
+        Stored vectors are used when current; stale or missing rows are computed in one NumPy pass.
+        """
+        if players is None:
+            if team_id is None:
+                raise ValueError("Either team_id or players is required")
+            players = Player.objects.filter(team_id=team_id).order_by("id")
+        players = list(players)
+        if not players:
+            raise ValueError(f"No players found for team {team_id}")
+
+        handle_size = SharedRosterHandle("", len(players)).size
+        shm = shared_memory.SharedMemory(create=True, size=handle_size)
+        matrix = cls(shm, SharedRosterHandle(shm.name, len(players)), owner=True)
+        matrix.player_ids[:] = [p.id for p in players]
+
+        stale = [row for row, p in enumerate(players) if getattr(p, "vectors_version", None) != VECTOR_VERSION]
+        if stale:
+            probs, rates, _ = compute_player_vectors(vars(players[row]) for row in stale)
+            matrix.probabilities[stale] = probs
+            matrix.baserun_rates[stale] = rates
+        stale_rows = set(stale)
+        for row, p in enumerate(players):
+            if row in stale_rows:
+                continue
+            matrix.probabilities[row] = p.outcome_probabilities if p.outcome_probabilities is not None else np.nan
+            matrix.baserun_rates[row] = p.baserun_rates
+        return matrix
+
+    @classmethod
+    def attach(cls, handle: SharedRosterHandle) -> "SharedRosterMatrix":
+        """Map an already published block by name (read-only views, no copy)."""
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=False)
+
+    def rows_for(self, player_ids: Iterable[int]) -> List[int]:
+        """Translate player ids to row indices into the matrix."""
+        index = {int(pid): row for row, pid in enumerate(self.player_ids)}
+        player_ids = list(player_ids)
+        missing = [pid for pid in player_ids if pid not in index]
+        if missing:
+            raise ValueError(f"Players not in shared roster: {missing}")
+        return [index[pid] for pid in player_ids]
+
+    def close(self) -> None:
+        """Drop this process's mapping; the publisher also frees the block."""
+        # Views must be released before the buffer can be closed
+        self.player_ids = self.probabilities = self.baserun_rates = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedRosterMatrix":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _Published:
+    __slots__ = ("version", "matrix", "leases")
+
+    def __init__(self, version: int, matrix: SharedRosterMatrix):
+        self.version = version
+        self.matrix = matrix
+        self.leases = 0
+
+
+class RosterPublisher:
+    """Every player's matrix, published once per roster version and shared by concurrent runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[_Published] = None
+        self._published: Dict[str, _Published] = {}
+
+    def acquire(self, stale: Optional[SharedRosterMatrix] = None) -> SharedRosterMatrix:
+        """
+        Matrix of the current roster version, publishing it on first use; pair with release().
+
+        Args:
+            stale: A matrix the caller found out of date (players written without a version bump,
+                e.g. through the admin or the ORM); it is republished unless that already happened
+
+        Raises:
+            ValueError: The roster has no players
+        """
+        version, _ = current_version(ROSTER_KEY)
+        with self._lock:
+            current = self._current
+            if current is None or current.version != version or (stale is not None and current.matrix is stale):
+                current = _Published(version, SharedRosterMatrix.publish(players=Player.objects.order_by("id")))
+                self._published[current.matrix.handle.name] = current
+                previous, self._current = self._current, current
+                if previous is not None and not previous.leases:
+                    self._unpublish(previous)
+            current.leases += 1
+            return current.matrix
+
+    def release(self, matrix: SharedRosterMatrix) -> None:
+        with self._lock:
+            entry = self._published[matrix.handle.name]
+            entry.leases -= 1
+            if entry is not self._current and not entry.leases:
+                self._unpublish(entry)
+
+    @contextmanager
+    def lease(self):
+        """acquire() / release() as a context manager."""
+        matrix = self.acquire()
+        try:
+            yield matrix
+        finally:
+            self.release(matrix)
+
+    def close(self) -> None:
+        """Unlink every block no run is using (process exit, tests); the next acquire() republishes."""
+        with self._lock:
+            self._current = None
+            for entry in list(self._published.values()):
+                if not entry.leases:
+                    self._unpublish(entry)
+
+    def _unpublish(self, entry: _Published) -> None:
+        """Caller holds the lock."""
+        del self._published[entry.matrix.handle.name]
+        entry.matrix.close()
+
+
+roster_publisher = RosterPublisher()
+atexit.register(roster_publisher.close)
@@ -1,7 +1,11 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from roster.models import Player, Team
+from roster.serializer import PlayerSerializer
+from roster.services.player_vectors import refresh_player_vectors
 
 class PlayerAPITests(APITestCase):
     """Test Player API endpoints."""
@@ -61,6 +65,105 @@ class PlayerAPITests(APITestCase):
         self.assertIn("players", response.data)
         self.assertEqual(len(response.data["players"]), 1)
         self.assertIn("wos_score", response.data["players"][0])
+        self.assertIsNone(response.data["next"])
+
+    def test_ranked_players_pagination(self):
+        """Test GET /players/ranked/?top=&after= keyset paging"""
+        for i in range(3):
+            Player.objects.create(name=f"Slugger {i}", team=self.team, pa=500, hit=130, home_run=10 * (i + 1), walk=50)
+        refresh_player_vectors()
+        url = reverse("roster:player-ranked")
+
+        first = self.client.get(url, {"top": 2})
+        self.assertEqual([p["name"] for p in first.data["players"]], ["Slugger 2", "Slugger 1"])
+        self.assertIsNotNone(first.data["next"])
+
+        second = self.client.get(url, {"top": 2, "after": first.data["next"]})
+        self.assertEqual([p["name"] for p in second.data["players"]], ["Slugger 0", "Aaron Judge"])
+        self.assertIsNone(second.data["next"])
+
+        bad = self.client.get(url, {"after": "garbage"})
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PlayerListQueryTests(APITestCase):
+    """Test filters, sparse fieldsets and opt-in pagination on GET /players/"""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.other_team = Team.objects.create(id=2)
+        for i in range(6):
+            Player.objects.create(
+                name=f"Player {i}",
+                team=self.team if i % 2 else self.other_team,
+                year=2025 if i < 4 else 2024,
+                pa=100 * i,
+                home_run=i * 5,
+            )
+        self.url = reverse("roster:player-list")
+
+    def test_list_fast_path_matches_serializer(self):
+        """values_list() rendering keeps PlayerSerializer's exact schema."""
+        Player.objects.filter(name="Player 1").update(k_percent=21.5, b_total_bases=180.0)
+        response = self.client.get(self.url)
+        expected = PlayerSerializer(Player.objects.all(), many=True).data
+        self.assertEqual(response.json(), [dict(row) for row in expected])
+
+    def test_unpaginated_by_default(self):
+        """Plain requests keep returning a bare list."""
+        response = self.client.get(self.url)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 6)
+
+    def test_filters(self):
+        """team, year, min_pa and <field>_min/_max filter in the database."""
+        response = self.client.get(self.url, {"team": "1", "year": "2025", "min_pa": "200"})
+        self.assertEqual([p["name"] for p in response.data], ["Player 3"])
+
+        response = self.client.get(self.url, {"home_run_min": "10", "home_run_max": "20"})
+        self.assertEqual([p["name"] for p in response.data], ["Player 2", "Player 3", "Player 4"])
+
+        response = self.client.get(self.url, {"team": "1,2", "pa_max": "0"})
+        self.assertEqual([p["name"] for p in response.data], ["Player 0"])
+
+        response = self.client.get(self.url, {"pa_min": "lots"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sparse_fields(self):
+        """fields= limits both the payload and the selected columns."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"fields": "id,name,bogus"})
+        self.assertEqual(set(response.data[0]), {"id", "name"})
+        self.assertNotIn("home_run", queries.captured_queries[-1]["sql"])
+
+        detail = self.client.get(reverse("roster:player-detail", kwargs={"pk": response.data[0]["id"]}), {"fields": "pa"})
+        self.assertEqual(detail.data, {"pa": 0})
+
+    def test_cursor_pagination(self):
+        """page_size / cursor switch on cursor pagination ordered by name."""
+        first = self.client.get(self.url, {"page_size": 4, "fields": "name"})
+        self.assertEqual([p["name"] for p in first.data["results"]], [f"Player {i}" for i in range(4)])
+        self.assertIsNotNone(first.data["next"])
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual([p["name"] for p in second.data["results"]], ["Player 4", "Player 5"])
+        self.assertIsNone(second.data["next"])
+
+    def test_cursor_pagination_without_ordering_field(self):
+        """The ordering column is read for the cursor but left out of a fieldset that omits it."""
+        first = self.client.get(self.url, {"page_size": 2, "fields": "id,pa"})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([set(p) for p in first.data["results"]], [{"id", "pa"}] * 2)
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual(len(second.data["results"]), 2)
+        self.assertFalse({p["id"] for p in first.data["results"]} & {p["id"] for p in second.data["results"]})
+
+    def test_sparse_fields_unknown_only(self):
+        """A fieldset naming no known field is rejected instead of selecting every column."""
+        response = self.client.get(self.url, {"fields": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
 
 
 class TeamAPITests(APITestCase):
@@ -81,3 +184,65 @@ class TeamAPITests(APITestCase):
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Team.objects.count(), 1)
+
+
+class ConditionalGetTests(APITestCase):
+    """Test ETag / Last-Modified handling on roster reads."""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.other_team = Team.objects.create(id=2)
+        self.player = Player.objects.create(name="Aaron Judge", team=self.team, pa=500)
+        Player.objects.create(name="Juan Soto", team=self.other_team, pa=600)
+
+    def test_not_modified_skips_player_queries(self):
+        """A matching If-None-Match is answered with 304 after the stamp lookup alone."""
+        url = reverse("roster:player-list")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second["ETag"], etag)
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn("roster_versions", queries.captured_queries[0]["sql"])
+
+    def test_write_changes_etag(self):
+        """Creating, updating or deleting a player invalidates cached lists."""
+        url = reverse("roster:player-list")
+        etag = self.client.get(url)["ETag"]
+
+        self.client.patch(reverse("roster:player-detail", args=[self.player.id]), {"pa": 510}, format="json")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Last-Modified", response)
+
+    def test_team_scoped_etag(self):
+        """A player list filtered to one team only changes when that team's roster does."""
+        url = reverse("roster:player-list")
+        etag = self.client.get(url, {"team": 1})["ETag"]
+
+        self.client.post(url, {"name": "New Guy", "team": 2}, format="json")
+        self.assertEqual(self.client.get(url, {"team": 1}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.post(url, {"name": "Other Guy", "team": 1}, format="json")
+        self.assertEqual(self.client.get(url, {"team": 1}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        """Last-Modified round-trips through If-Modified-Since."""
+        url = reverse("roster:player-ranked")
+        self.client.post(reverse("roster:player-list"), {"name": "New Guy", "team": 1}, format="json")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2001 00:00:00 GMT").status_code, 200)
+
+    def test_query_string_is_part_of_etag(self):
+        """Different filters never share an ETag."""
+        url = reverse("roster:player-list")
+        self.assertNotEqual(self.client.get(url, {"min_pa": 1})["ETag"], self.client.get(url)["ETag"])
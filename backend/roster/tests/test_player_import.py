@@ -1,11 +1,13 @@
 import csv
 import tempfile
 from pathlib import Path
+from unittest import skipUnless
 from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase
 
-from roster.models import Player, Team
+from roster.models import ImportCheckpoint, Player, Team
 from roster.services.player_import import PlayerImportService
 
 
@@ -16,6 +18,10 @@ class PlayerImportServiceTestCase(TestCase):
         self.team = Team.objects.create(id=1)
         self.temp_dir = tempfile.TemporaryDirectory()
         self.csv_path = Path(self.temp_dir.name) / "test_players.csv"
+        # These tests cover the ORM bulk path; the COPY path has its own test case below
+        copy_patch = patch.object(PlayerImportService, "use_postgres_copy", False)
+        copy_patch.start()
+        self.addCleanup(copy_patch.stop)
 
     def tearDown(self):
         self.temp_dir.cleanup()
@@ -206,8 +212,221 @@ class PlayerImportServiceTestCase(TestCase):
         ]
         self.create_csv(rows)
 
-        # Mock Player.objects.update_or_create to raise an exception
-        with patch("roster.models.Player.objects.update_or_create", side_effect=Exception("DB Error")):
+        # Mock Player.objects.bulk_create to raise an exception
+        with patch("roster.models.Player.objects.bulk_create", side_effect=Exception("DB Error")):
             with self.assertRaises(Exception) as cm:
                 PlayerImportService.import_from_csv(self.csv_path)
             self.assertIn("DB Error", str(cm.exception))
+
+    def test_bulk_import_query_count_is_constant(self):
+        """Query count does not grow with the number of rows."""
+        Player.objects.create(name="Existing 0", team=self.team, home_run=1)
+        rows = [
+            {"name": f"Existing {i}" if i < 1 else f"New {i}", "player_id": str(i), "pa": "100", "team_id": str(i % 3 + 1)}
+            for i in range(25)
+        ]
+        self.create_csv(rows)
+
+        # players prefetch, teams lookup + insert, bulk insert, bulk update, vector refresh read + write,
+        # roster version bump, savepoints
+        with self.assertNumQueries(10):
+            result = PlayerImportService.import_from_csv(self.csv_path, batch_size=100)
+
+        self.assertEqual(result["created"], 24)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(Team.objects.count(), 3)
+        self.assertEqual(Player.objects.get(name="New 23").team_id, 3)
+        self.assertEqual(Player.objects.filter(vectors_version__isnull=False).count(), 25)
+
+    def test_duplicate_names_last_row_wins(self):
+        """Repeated names behave like successive update_or_create calls."""
+        rows = [
+            {"name": "Twice", "player_id": "1", "home_run": "5"},
+            {"name": "Twice", "player_id": "1", "home_run": "9"},
+        ]
+        self.create_csv(rows)
+
+        result = PlayerImportService.import_from_csv(self.csv_path)
+
+        self.assertEqual(result["processed"], 2)
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(Player.objects.get(name="Twice").home_run, 9)
+
+    def test_streaming_import_batches(self):
+        """Streaming import commits fixed-size batches and reports progress."""
+        rows = [{"name": f"Stream {i}", "player_id": str(i), "pa": "100"} for i in range(25)]
+        self.create_csv(rows)
+        progress = []
+
+        result = PlayerImportService.import_from_csv_streaming(
+            self.csv_path, team_id=self.team.id, batch_size=10, progress=progress.append
+        )
+
+        self.assertEqual(result["processed"], 25)
+        self.assertEqual(result["created"], 25)
+        self.assertEqual(result["batches"], 3)
+        self.assertEqual(progress, [10, 20, 25])
+        self.assertEqual(Player.objects.filter(team=self.team).count(), 25)
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertTrue(checkpoint.completed)
+        self.assertEqual(checkpoint.rows_committed, 25)
+
+    def test_streaming_import_resumes_after_failed_batch(self):
+        """A failing batch keeps earlier batches and a rerun resumes after them."""
+        rows = [{"name": f"Stream {i}", "player_id": str(i), "pa": "100"} for i in range(25)]
+        self.create_csv(rows)
+        real_write = PlayerImportService._write_batch
+        calls = []
+
+        def flaky_write(parsed, batch_size=500):
+            calls.append(len(parsed))
+            if len(calls) == 2:
+                raise Exception("DB Error")
+            return real_write(parsed, batch_size)
+
+        with patch.object(PlayerImportService, "_write_batch", side_effect=flaky_write):
+            with self.assertRaises(Exception):
+                PlayerImportService.import_from_csv_streaming(self.csv_path, batch_size=10)
+
+        self.assertEqual(Player.objects.count(), 10)
+        self.assertEqual(ImportCheckpoint.objects.get().rows_committed, 10)
+
+        result = PlayerImportService.import_from_csv_streaming(self.csv_path, batch_size=10)
+
+        self.assertEqual(result["resumed_from"], 10)
+        self.assertEqual(result["processed"], 15)
+        self.assertEqual(Player.objects.count(), 25)
+
+    def test_streaming_dry_run(self):
+        rows = [{"name": f"Stream {i}", "player_id": str(i)} for i in range(5)]
+        self.create_csv(rows)
+
+        result = PlayerImportService.import_from_csv_streaming(self.csv_path, dry_run=True, batch_size=2)
+
+        self.assertEqual(result["processed"], 5)
+        self.assertEqual(Player.objects.count(), 0)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_reimport_skips_unchanged_players(self):
+        """Only rows whose content changed are written on re-import."""
+        rows = [{"name": f"Daily {i}", "player_id": str(i), "pa": "100", "home_run": "5"} for i in range(5)]
+        self.create_csv(rows)
+        PlayerImportService.import_from_csv(self.csv_path, team_id=self.team.id)
+        stamps = dict(Player.objects.values_list("name", "updated_at"))
+
+        rows[2]["home_run"] = "6"
+        self.create_csv(rows)
+        result = PlayerImportService.import_from_csv(self.csv_path, team_id=self.team.id)
+
+        self.assertEqual(result["created"], 0)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(result["unchanged"], 4)
+        after = dict(Player.objects.values_list("name", "updated_at"))
+        self.assertEqual([name for name in stamps if stamps[name] != after[name]], ["Daily 2"])
+        self.assertEqual(Player.objects.get(name="Daily 2").home_run, 6)
+
+    def test_manual_edit_clears_fingerprint(self):
+        """A player edited outside the importer is rewritten by the next import."""
+        from roster.services.player_ranking import update_player_stats
+
+        rows = [{"name": "Edited", "player_id": "1", "home_run": "5"}]
+        self.create_csv(rows)
+        PlayerImportService.import_from_csv(self.csv_path)
+        update_player_stats(Player.objects.get(name="Edited").id, home_run=50)
+
+        result = PlayerImportService.import_from_csv(self.csv_path)
+
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(Player.objects.get(name="Edited").home_run, 5)
+
+
+    def test_copy_path_not_used_off_postgres(self):
+        """Non-PostgreSQL backends fall back to the ORM bulk path."""
+        if connection.vendor == "postgresql":
+            self.skipTest("ORM fallback only applies to other backends")
+        self.create_csv([{"name": "Fallback", "player_id": "1"}])
+
+        with patch.object(PlayerImportService, "use_postgres_copy", True), patch.object(
+            PlayerImportService, "_write_batch_copy"
+        ) as copy_path:
+            result = PlayerImportService.import_from_csv(self.csv_path)
+
+        copy_path.assert_not_called()
+        self.assertEqual(result["created"], 1)
+
+
+    def test_copy_columns_cover_not_null_columns(self):
+        """Every NOT NULL players column is staged by the COPY merge or has a database default."""
+        from django.db.models import NOT_PROVIDED
+
+        from roster.services.player_import import COPY_COLUMNS
+
+        supplied = {"id", "created_at", "updated_at", *COPY_COLUMNS}
+        uncovered = [
+            field.column
+            for field in Player._meta.concrete_fields
+            if not field.null and field.column not in supplied and field.db_default is NOT_PROVIDED
+        ]
+        self.assertEqual(uncovered, [])
+
+
+@skipUnless(connection.vendor == "postgresql", "COPY fast path requires PostgreSQL")
+class PostgresCopyImportTestCase(TestCase):
+    """Run the COPY + staging-table merge path against a real PostgreSQL database."""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = Path(self.temp_dir.name) / "test_players.csv"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_csv(self, rows):
+        with open(self.csv_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def test_copy_merge_counts(self):
+        Player.objects.create(name="Existing", team=self.team, home_run=1)
+        rows = [
+            {"name": "Existing", "player_id": "1", "home_run": "2", "team_id": "7"},
+            {"name": "New", "player_id": "2", "home_run": "3", "team_id": "7"},
+            {"name": "New", "player_id": "2", "home_run": "4", "team_id": "7"},
+        ]
+        self.create_csv(rows)
+
+        result = PlayerImportService.import_from_csv(self.csv_path)
+
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["updated"], 2)
+        self.assertTrue(Team.objects.filter(pk=7).exists())
+        self.assertEqual(Player.objects.get(name="New").home_run, 4)
+        self.assertIsNotNone(Player.objects.get(name="Existing").vectors_version)
+        # New rows start from the db defaults and get their vectors from the refresh
+        new = Player.objects.get(name="New")
+        self.assertIsNotNone(new.vectors_version)
+        self.assertGreaterEqual(new.wos_score, 0.0)
+
+        again = PlayerImportService.import_from_csv(self.csv_path)
+        self.assertEqual(again["unchanged"], 2)
+
+    def test_copy_multi_season_reimport_is_unchanged(self):
+        """Older seasons in the same file are kept as history and compared with their own fingerprint."""
+        from roster.models import PlayerSeasonStats
+
+        rows = [
+            {"name": "Veteran", "player_id": "1", "year": str(year), "pa": str(pa), "team_id": "1"}
+            for year, pa in ((2024, 400), (2025, 600))
+        ]
+        self.create_csv(rows)
+        first = PlayerImportService.import_from_csv(self.csv_path)
+        self.assertEqual((first["created"], first["updated"]), (1, 1))
+
+        again = PlayerImportService.import_from_csv(self.csv_path)
+
+        self.assertEqual((again["updated"], again["unchanged"]), (0, 2))
+        self.assertEqual(Player.objects.get(name="Veteran").year, 2025)
+        self.assertEqual(set(PlayerSeasonStats.objects.values_list("year", "pa")), {(2024, 400), (2025, 600)})
@@ -1,8 +1,11 @@
 from django.test import TestCase
 
+from roster.services.player_vectors import refresh_player_vectors
+
 from roster.models import Player, Team
 from roster.services.player_ranking import (
     create_player_with_stats,
+    encode_rank_cursor,
     get_ranked_players,
     get_team_by_id,
     update_player_stats,
@@ -61,3 +64,50 @@ class PlayerRankingServiceTestCase(TestCase):
         Player.objects.all().delete()
         result = get_ranked_players()
         self.assertEqual(result, [])
+
+
+class RankedPlayersDatabaseTestCase(TestCase):
+    """Test that ranking, limiting and paging happen in the database."""
+
+    def setUp(self):
+        # Scores rise with home runs; Player 0 is the weakest
+        for i in range(12):
+            Player.objects.create(name=f"Player {i:02d}", pa=500, hit=120, home_run=i * 3, walk=40)
+        refresh_player_vectors()
+
+    def test_top_n_is_sorted_before_limiting(self):
+        """top_n returns the best players, not the first rows sorted afterwards."""
+        ranked = get_ranked_players(top_n=3)
+        self.assertEqual([p["name"] for p in ranked], ["Player 11", "Player 10", "Player 09"])
+        self.assertGreater(ranked[0]["wos_score"], ranked[1]["wos_score"])
+
+        lowest = get_ranked_players(ascending=True, top_n=1)
+        self.assertEqual(lowest[0]["name"], "Player 00")
+
+    def test_keyset_pages_cover_every_player_once(self):
+        """Following cursors walks the full ranking without gaps or repeats, even with tied scores."""
+        Player.objects.create(name="Tied", pa=500, hit=120, home_run=33, walk=40)
+        refresh_player_vectors()
+
+        seen = []
+        after = None
+        while True:
+            page = get_ranked_players(top_n=5, after=after)
+            if not page:
+                break
+            seen.extend(p["name"] for p in page)
+            after = encode_rank_cursor(page[-1])
+
+        self.assertEqual(len(seen), 13)
+        self.assertEqual(len(set(seen)), 13)
+        self.assertEqual(seen[:2], ["Tied", "Player 11"])
+
+    def test_page_is_a_single_query(self):
+        """A page is one ORDER BY ... LIMIT query regardless of roster size."""
+        with self.assertNumQueries(1):
+            get_ranked_players(top_n=5, after=encode_rank_cursor({"wos_score": 0.4, "id": 1}))
+
+    def test_invalid_cursor(self):
+        """Malformed cursors raise ValueError."""
+        with self.assertRaises(ValueError):
+            get_ranked_players(after="not-a-cursor")
@@ -0,0 +1,105 @@
+from django.test import TestCase
+
+from lineups.services.algorithm_logic import calculate_player_baserun_values, player_rate_matrix
+from roster.models import Player, Team
+from roster.services.player_vectors import VECTOR_VERSION, refresh_player_vectors, stored_baserun_rates
+from simulator.services.player_service import PlayerService
+
+
+class PlayerVectorsTestCase(TestCase):
+    """Test the stored per-player derived vectors."""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.players = [
+            Player.objects.create(
+                name=f"Player {i}",
+                team=self.team,
+                pa=400 + i,
+                hit=100 + i,
+                double=20,
+                triple=2,
+                home_run=10 + i,
+                strikeout=80,
+                walk=40,
+                b_game=100.0,
+                b_total_bases=160 + i,
+                b_gnd_into_dp=5,
+            )
+            for i in range(9)
+        ]
+
+    def test_refresh_matches_batter_stats(self):
+        """Stored probabilities match the on-the-fly BatterStats conversion."""
+        service = PlayerService()
+        expected = [service._convert_to_batter_stats(p).to_probabilities() for p in self.players]
+
+        self.assertEqual(refresh_player_vectors(), 9)
+
+        for player, probs in zip(Player.objects.order_by("id"), expected):
+            self.assertEqual(player.vectors_version, VECTOR_VERSION)
+            for stored, fresh in zip(player.outcome_probabilities, probs):
+                self.assertAlmostEqual(stored, fresh, places=12)
+            self.assertEqual(len(player.baserun_rates), 12)
+            self.assertAlmostEqual(player.baserun_rates[0], player.pa / 100.0)
+
+    def test_baserun_uses_stored_rates(self):
+        """BaseRuns gives the same answer from stored rates and raw stats."""
+        raw_runs = calculate_player_baserun_values(tuple(self.players))
+        raw_matrix = player_rate_matrix(self.players)
+
+        refresh_player_vectors()
+        refreshed = list(Player.objects.order_by("id"))
+        self.assertIsNotNone(stored_baserun_rates(refreshed[0]))
+        self.assertAlmostEqual(calculate_player_baserun_values(tuple(refreshed)), raw_runs, places=9)
+        self.assertTrue((abs(player_rate_matrix(refreshed) - raw_matrix) < 1e-12).all())
+
+    def test_invalid_and_empty_players(self):
+        """Inconsistent stats store no probabilities; zero PA/games store defaults."""
+        bad = Player.objects.create(name="Bad", pa=10, hit=8, walk=5, b_game=3.0)
+        empty = Player.objects.create(name="Empty", pa=0, b_game=0.0)
+        refresh_player_vectors([bad.id, empty.id])
+
+        bad.refresh_from_db()
+        empty.refresh_from_db()
+        self.assertIsNone(bad.outcome_probabilities)
+        self.assertEqual(empty.outcome_probabilities, [0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+        self.assertEqual(empty.baserun_rates, [0.0] * 12)
+
+    def test_stale_version_is_ignored(self):
+        refresh_player_vectors()
+        Player.objects.update(vectors_version=VECTOR_VERSION - 1)
+        self.assertIsNone(stored_baserun_rates(Player.objects.first()))
+
+    def test_stat_writes_invalidate_stored_vectors(self):
+        """Any stat change outside the refresh (save, queryset update) drops the stored vectors and fingerprint."""
+        refresh_player_vectors()
+        Player.objects.update(stats_fingerprint="abc")
+        player, other, renamed = Player.objects.order_by("id")[:3]
+
+        player.home_run = 40
+        player.save()
+        Player.objects.filter(pk=other.pk).update(walk=90)
+        renamed.name = "Renamed"
+        renamed.save(update_fields=["name"])
+
+        player, other, renamed = Player.objects.order_by("id")[:3]
+        for stale in (player, other):
+            self.assertIsNone(stored_baserun_rates(stale))
+            self.assertIsNone(stale.stats_fingerprint)
+        self.assertIsNotNone(stored_baserun_rates(renamed))
+        self.assertEqual(renamed.stats_fingerprint, "abc")
+
+        # The simulator then derives probabilities from the edited stats
+        batter = PlayerService()._convert_to_batter_stats(player)
+        self.assertAlmostEqual(batter.to_probabilities()[6], 40 / player.pa)
+
+    def test_api_update_refreshes_vectors(self):
+        player = self.players[0]
+        response = self.client.patch(
+            f"/api/v1/roster/players/{player.id}/", {"home_run": 30}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        player.refresh_from_db()
+        self.assertEqual(player.vectors_version, VECTOR_VERSION)
+        self.assertAlmostEqual(player.outcome_probabilities[6], 30 / player.pa)
@@ -0,0 +1,115 @@
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+
+from lineups.services.algorithm_logic import player_rate_matrix
+from lineups.services.databa_access import fetch_players_by_ids
+from roster.models import Player, PlayerProjection, ProjectionBaseline, Team
+from roster.services.projections import (
+    PROJECTION_STAT_FIELDS,
+    PROJECTION_VERSION,
+    REGRESSION_PA,
+    blend_seasons,
+    league_rates,
+    refresh_projections,
+)
+from roster.services.season_stats import append_season, season_from_values, upsert_seasons
+from simulator.services.player_service import PlayerService
+
+
+def season_line(pa, hit, home_run, walk, strikeout, games):
+    return {
+        "pa": pa,
+        "hit": hit,
+        "double": hit // 5,
+        "home_run": home_run,
+        "walk": walk,
+        "strikeout": strikeout,
+        "b_game": games,
+        "b_total_bases": hit + 3 * home_run,
+    }
+
+
+class ProjectionTestCase(TestCase):
+    """Test the regressed multi-season projections."""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.regulars = [Player.objects.create(name=f"Regular {i}", team=self.team, year=2025) for i in range(8)]
+        self.callup = Player.objects.create(name="Callup", team=self.team, year=2025, **season_line(21, 12, 4, 3, 2, 6))
+        for year in (2023, 2024, 2025):
+            append_season(
+                year,
+                [{"player_id": p.id, "team_id": 1, **season_line(600, 150, 20, 60, 130, 150)} for p in self.regulars],
+            )
+        append_season(2025, [{"player_id": self.callup.id, "team_id": 1, **season_line(21, 12, 4, 3, 2, 6)}])
+
+    def test_blend_matches_marcel_formula(self):
+        """Weighted, regressed rates follow the 5/4/3 + league-regression formula."""
+        history = np.zeros((1, 3, len(PROJECTION_STAT_FIELDS)))
+        pa, hr = PROJECTION_STAT_FIELDS.index("pa"), PROJECTION_STAT_FIELDS.index("home_run")
+        history[0, :, pa] = [500, 400, 300]
+        history[0, :, hr] = [30, 20, 10]
+        league = np.zeros(len(PROJECTION_STAT_FIELDS))
+        league[pa], league[hr] = 1.0, 0.03
+
+        rates, projected_pa = blend_seasons(history, league)
+
+        expected = (5 * 30 + 4 * 20 + 3 * 10 + 0.03 * REGRESSION_PA) / (5 * 500 + 4 * 400 + 3 * 300 + REGRESSION_PA)
+        self.assertAlmostEqual(rates[0, hr], expected)
+        self.assertAlmostEqual(rates[0, pa], 1.0)
+        self.assertAlmostEqual(projected_pa[0], 0.5 * 500 + 0.1 * 400 + 200)
+        self.assertTrue((league_rates(np.zeros((3, len(PROJECTION_STAT_FIELDS)))) == 0).all())
+
+    def test_appending_seasons_refreshes_projections(self):
+        """Season appends keep projections current without a separate rebuild."""
+        self.assertEqual(PlayerProjection.objects.count(), 9)
+        projection = PlayerProjection.objects.get(player=self.callup)
+        self.assertEqual(projection.version, PROJECTION_VERSION)
+        self.assertEqual(projection.through_year, 2025)
+        self.assertEqual(projection.seasons_used, 1)
+        self.assertEqual(PlayerProjection.objects.get(player=self.regulars[0]).seasons_used, 3)
+
+    def test_small_sample_is_regressed(self):
+        """A 21-PA callup projects close to league average, not to the raw line."""
+        raw = PlayerService().get_players_by_ids([self.callup.id])[0].to_probabilities()
+        projected = PlayerService(use_projections=True).get_players_by_ids([self.callup.id])[0].probabilities
+
+        league_hr = 20 / 600
+        self.assertAlmostEqual(raw[6], 4 / 21)
+        self.assertLess(abs(projected[6] - league_hr), abs(raw[6] - league_hr) / 10)
+        self.assertAlmostEqual(sum(projected), 1.0)
+
+    def test_optimizer_reads_projections(self):
+        """fetch_players_by_ids(projected=True) feeds projected rates to BaseRuns in one query."""
+        ids = [p.id for p in self.regulars] + [self.callup.id]
+        with self.assertNumQueries(1):
+            players = fetch_players_by_ids(ids, projected=True)
+        stored = PlayerProjection.objects.get(player=self.callup).baserun_rates
+        np.testing.assert_allclose(player_rate_matrix(players)[-1], stored)
+
+    def test_incremental_refresh_and_command(self):
+        """Refreshing a subset only rewrites those rows; the command rebuilds everything."""
+        PlayerProjection.objects.all().delete()
+        self.assertEqual(refresh_projections([self.callup.id]), 1)
+        self.assertEqual(PlayerProjection.objects.count(), 1)
+
+        call_command("refresh_projections", stdout=StringIO())
+        self.assertEqual(PlayerProjection.objects.count(), 9)
+
+    def test_partial_refresh_follows_a_moved_baseline(self):
+        """An upsert that shifts the league totals re-regresses every player, not just the one upserted."""
+        regular = self.regulars[0]
+        before = PlayerProjection.objects.get(player=regular).outcome_probabilities
+
+        upsert_seasons([season_from_values(self.callup.id, 2025, 1, season_line(650, 200, 45, 90, 80, 155))])
+        after = PlayerProjection.objects.get(player=regular).outcome_probabilities
+        self.assertNotEqual(after, before)
+
+        # Same numbers a full rebuild against the new baseline gives
+        baseline = ProjectionBaseline.objects.get()
+        refresh_projections()
+        np.testing.assert_allclose(after, PlayerProjection.objects.get(player=regular).outcome_probabilities)
+        self.assertEqual(ProjectionBaseline.objects.get().league_rates, baseline.league_rates)
@@ -0,0 +1,156 @@
+import csv
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from lineups.services.databa_access import fetch_players_by_ids
+from roster.models import Player, PlayerSeasonStats, Team
+from roster.services.player_import import PlayerImportService
+from roster.services.player_ranking import update_player_stats
+from roster.services.season_stats import append_season, current_season_year, players_for_season
+from simulator.services.player_service import PlayerService
+
+
+class SeasonStatsTestCase(TestCase):
+    """Test the per-season stat history."""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.other_team = Team.objects.create(id=2)
+        self.players = [
+            Player.objects.create(name=f"Player {i}", team=self.team, year=2025, pa=500, hit=130, walk=50, strikeout=90)
+            for i in range(3)
+        ]
+
+    def test_append_season_leaves_other_years(self):
+        """Appending a season only touches that year's rows."""
+        append_season(2024, [{"player_id": p.id, "team_id": 2, "pa": 300, "hit": 70} for p in self.players])
+        append_season(2025, [{"player_id": p.id, "team_id": 1, "pa": 500, "hit": 130} for p in self.players])
+
+        # Reloading 2024 overwrites 2024 only
+        append_season(2024, [{"player_id": self.players[0].id, "team_id": 2, "pa": 310, "hit": 75}])
+
+        self.assertEqual(PlayerSeasonStats.objects.count(), 6)
+        self.assertEqual(PlayerSeasonStats.objects.get(player=self.players[0], year=2024).pa, 310)
+        self.assertEqual(PlayerSeasonStats.objects.get(player=self.players[0], year=2025).pa, 500)
+        self.assertEqual(PlayerSeasonStats.objects.for_season(2024).count(), 3)
+
+    def test_current_season(self):
+        """current() returns the latest season's rows in one query."""
+        append_season(2023, [{"player_id": self.players[0].id, "pa": 100}])
+        append_season(2024, [{"player_id": p.id, "pa": 200} for p in self.players[:2]])
+
+        self.assertEqual(current_season_year(), 2024)
+        with self.assertNumQueries(1):
+            rows = list(PlayerSeasonStats.objects.current())
+        self.assertEqual({row.year for row in rows}, {2024})
+        self.assertEqual(len(rows), 2)
+
+    def test_players_for_season_single_query(self):
+        """Season lookups overlay that season's stats on Player objects in one query."""
+        append_season(2024, [{"player_id": p.id, "team_id": 2, "pa": 321, "hit": 80} for p in self.players])
+        ids = [p.id for p in self.players]
+
+        with self.assertNumQueries(1):
+            players = players_for_season(ids, 2024)
+            teams = [p.team.id for p in players]
+
+        self.assertEqual(len(players), 3)
+        self.assertEqual({p.pa for p in players}, {321})
+        self.assertEqual(set(teams), {2})
+        self.assertTrue(all(p.vectors_version is None for p in players))
+        # The snapshot itself is untouched
+        self.assertEqual(Player.objects.get(id=ids[0]).pa, 500)
+
+    def test_optimizer_and_simulator_read_season(self):
+        """Lineup and simulator lookups can target a past season."""
+        append_season(2024, [{"player_id": p.id, "team_id": 2, "pa": 250, "hit": 60} for p in self.players])
+        ids = [p.id for p in reversed(self.players)]
+
+        players = fetch_players_by_ids(ids, season=2024)
+        self.assertEqual([p.id for p in players], ids)
+        self.assertEqual(players[0].pa, 250)
+
+        stats = PlayerService().get_players_by_ids(ids, season=2024)
+        self.assertEqual([s.plate_appearances for s in stats], [250, 250, 250])
+        self.assertIsNone(stats[0].probabilities)
+
+        team_stats = PlayerService().get_team_players(2, season=2024)
+        self.assertEqual(len(team_stats), 3)
+        with self.assertRaises(ValueError):
+            PlayerService().get_players_by_ids(ids, season=2019)
+
+    def test_manual_update_records_season(self):
+        """Editing a player's snapshot keeps that season's history row in sync."""
+        update_player_stats(self.players[0].id, pa=555)
+
+        season = PlayerSeasonStats.objects.get(player=self.players[0], year=2025)
+        self.assertEqual(season.pa, 555)
+
+
+class SeasonImportTestCase(TestCase):
+    """Test that CSV imports append seasons instead of overwriting them."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = Path(self.temp_dir.name) / "season.csv"
+        copy_patch = patch.object(PlayerImportService, "use_postgres_copy", False)
+        copy_patch.start()
+        self.addCleanup(copy_patch.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def import_season(self, year, pa):
+        with open(self.csv_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=["name", "player_id", "year", "pa", "team_id"])
+            writer.writeheader()
+            writer.writerows({"name": f"Hitter {i}", "player_id": i, "year": year, "pa": pa, "team_id": 1} for i in range(4))
+        return PlayerImportService.import_from_csv(self.csv_path)
+
+    def test_older_season_does_not_overwrite_snapshot(self):
+        """Importing 2024 after 2025 adds history but keeps the 2025 snapshot."""
+        self.import_season(2025, 600)
+        result = self.import_season(2024, 400)
+
+        self.assertEqual(result["updated"], 4)
+        self.assertEqual(set(Player.objects.values_list("year", "pa")), {(2025, 600)})
+        self.assertEqual(PlayerSeasonStats.objects.count(), 8)
+        self.assertEqual(set(PlayerSeasonStats.objects.for_season(2024).values_list("pa", flat=True)), {400})
+
+    def test_newer_season_updates_snapshot_and_history(self):
+        """A newer season replaces the snapshot and is appended to the history."""
+        self.import_season(2024, 400)
+        self.import_season(2025, 600)
+
+        self.assertEqual(set(Player.objects.values_list("year", "pa")), {(2025, 600)})
+        self.assertEqual(set(PlayerSeasonStats.objects.values_list("year", flat=True)), {2024, 2025})
+        self.assertEqual(PlayerSeasonStats.objects.current().count(), 4)
+
+    def test_unchanged_reimport_skips_history(self):
+        """Re-importing the same season writes nothing."""
+        self.import_season(2025, 600)
+        result = self.import_season(2025, 600)
+
+        self.assertEqual(result["unchanged"], 4)
+        self.assertEqual(PlayerSeasonStats.objects.count(), 4)
+
+    def test_multi_season_reimport_is_unchanged(self):
+        """Older seasons are compared with their own stored fingerprint, so a re-import writes nothing."""
+        with open(self.csv_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=["name", "player_id", "year", "pa", "team_id"])
+            writer.writeheader()
+            for year, pa in ((2024, 400), (2025, 600)):
+                writer.writerows({"name": f"Hitter {i}", "player_id": i, "year": year, "pa": pa, "team_id": 1} for i in range(3))
+        first = PlayerImportService.import_from_csv(self.csv_path)
+        self.assertEqual((first["created"], first["updated"]), (3, 3))
+
+        with patch("roster.services.season_stats.refresh_projections") as refresh:
+            again = PlayerImportService.import_from_csv(self.csv_path)
+
+        self.assertEqual((again["updated"], again["unchanged"]), (0, 6))
+        refresh.assert_not_called()
+        self.assertEqual(set(Player.objects.values_list("year", "pa")), {(2025, 600)})
+        self.assertEqual(set(PlayerSeasonStats.objects.values_list("year", "pa")), {(2024, 400), (2025, 600)})
@@ -0,0 +1,159 @@
+from multiprocessing import shared_memory
+
+from django.test import TestCase
+
+from roster.models import Player, PlayerSeasonStats, Team
+from roster.services.player_vectors import refresh_player_vectors
+from roster.services.roster_version import ROSTER_KEY, bump_roster_versions
+from roster.services.shared_roster import SharedRosterMatrix, roster_publisher
+from simulator.services import engines
+from simulator.services.player_service import PlayerService
+from simulator.services.simulation import SimulationService
+
+
+class SharedRosterMatrixTestCase(TestCase):
+    """Test publishing/attaching a team's roster matrix in shared memory."""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.players = [
+            Player.objects.create(
+                name=f"Player {i}",
+                team=self.team,
+                pa=400,
+                hit=100 + i,
+                double=20,
+                triple=2,
+                home_run=10 + i,
+                strikeout=80,
+                walk=40,
+                b_game=100.0,
+            )
+            for i in range(10)
+        ]
+        # Half the roster has stored vectors, the other half is computed on publish
+        refresh_player_vectors([p.id for p in self.players[:5]])
+
+    def test_publish_and_attach(self):
+        with SharedRosterMatrix.publish(team_id=self.team.id) as published:
+            self.assertEqual(list(published.player_ids), [p.id for p in self.players])
+            attached = SharedRosterMatrix.attach(published.handle)
+            try:
+                self.assertTrue((attached.probabilities == published.probabilities).all())
+                self.assertTrue((attached.baserun_rates == published.baserun_rates).all())
+                self.assertFalse(attached.probabilities.flags.writeable)
+                self.assertAlmostEqual(attached.probabilities[:, :].sum(), 10.0)
+                self.assertAlmostEqual(attached.baserun_rates[3, 0], 4.0)
+            finally:
+                attached.close()
+
+    def test_rows_for(self):
+        with SharedRosterMatrix.publish(team_id=self.team.id) as matrix:
+            self.assertEqual(matrix.rows_for([self.players[2].id, self.players[0].id]), [2, 0])
+            with self.assertRaises(ValueError):
+                matrix.rows_for([999999])
+
+    def test_publish_empty_team(self):
+        with self.assertRaises(ValueError):
+            SharedRosterMatrix.publish(team_id=Team.objects.create().id)
+
+
+
+class RosterPublisherTestCase(TestCase):
+    """Test the roster published for the simulator's process pools."""
+
+    def setUp(self):
+        self.team = Team.objects.create(id=1)
+        self.players = [
+            Player.objects.create(
+                name=f"Player {i}", team=self.team, year=2024, pa=400, hit=100 + i, double=20, triple=2,
+                home_run=10 + i, strikeout=80, walk=40,
+            )
+            for i in range(10)
+        ]
+        self.ids = [p.id for p in self.players[1:]]
+        roster_publisher.close()
+
+    def tearDown(self):
+        roster_publisher.close()
+
+    @staticmethod
+    def is_linked(matrix):
+        try:
+            shared_memory.SharedMemory(name=matrix.handle.name).close()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def test_published_once_per_version(self):
+        with roster_publisher.lease() as first:
+            self.assertEqual(list(first.player_ids), sorted(p.id for p in self.players))
+        with roster_publisher.lease() as again:
+            self.assertIs(again, first)
+
+        bump_roster_versions([ROSTER_KEY])
+        with roster_publisher.lease() as bumped:
+            self.assertIsNot(bumped, first)
+        # Nothing held the superseded block
+        self.assertFalse(self.is_linked(first))
+
+    def test_superseded_block_outlives_its_runs(self):
+        running = roster_publisher.acquire()
+        bump_roster_versions([ROSTER_KEY])
+        with roster_publisher.lease() as current:
+            self.assertIsNot(current, running)
+            self.assertTrue(self.is_linked(running))
+        roster_publisher.release(running)
+        self.assertFalse(self.is_linked(running))
+
+    def test_process_engine_reads_shared_rows(self):
+        """Seeded batches give the same scores from the shared rows as from the pickled lineup."""
+        service = SimulationService()
+        batter_stats = PlayerService().get_players_by_ids(self.ids)
+        lineup = service._build_lineup(batter_stats)
+        matrix, shared = service._share_lineup(engines.get_engine("batch-processes"), batter_stats, lineup)
+        try:
+            self.assertEqual(list(matrix.player_ids[list(shared.rows)]), self.ids)
+        finally:
+            service._release_lineup(matrix)
+
+        shared_run = service.simulate_lineup(batter_stats, 400, engine="batch-processes", seed=5)
+        pickled_run = service.simulate_lineup(batter_stats, 400, engine="batch-threads", seed=5)
+        self.assertEqual(shared_run.all_scores, pickled_run.all_scores)
+
+    def test_unversioned_write_republishes(self):
+        service = SimulationService()
+        engine = engines.get_engine("batch-processes")
+        with roster_publisher.lease() as before:
+            pass
+        # A queryset update bumps no roster version
+        Player.objects.filter(id=self.ids[0]).update(home_run=40)
+        batter_stats = PlayerService().get_players_by_ids(self.ids)
+        matrix, shared = service._share_lineup(engine, batter_stats, service._build_lineup(batter_stats))
+        try:
+            self.assertIsNot(matrix, before)
+            self.assertAlmostEqual(matrix.probabilities[shared.rows[0]][6], 40 / 400)
+        finally:
+            service._release_lineup(matrix)
+
+    def test_season_and_thread_lineups_are_pickled(self):
+        service = SimulationService()
+        for player in self.players:
+            PlayerSeasonStats.objects.create(
+                player=player, year=2023, team=self.team, pa=500, hit=120, double=25, triple=1, home_run=30,
+                strikeout=90, walk=50,
+            )
+        season_stats = PlayerService().get_players_by_ids(self.ids, season=2023)
+        self.assertEqual(
+            service._share_lineup(
+                engines.get_engine("batch-processes"), season_stats, service._build_lineup(season_stats)
+            ),
+            (None, None),
+        )
+        batter_stats = PlayerService().get_players_by_ids(self.ids)
+        self.assertEqual(
+            service._share_lineup(
+                engines.get_engine("batch-threads"), batter_stats, service._build_lineup(batter_stats)
+            ),
+            (None, None),
+        )
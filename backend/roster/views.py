@@ -5,14 +5,22 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from .conditional import ConditionalGetMixin
+from .fast_serializers import PLAYER_LIST_MAPPER
+from .filters import PlayerFilterBackend
 from .models import Player, Team
-from .serializer import PlayerSerializer, TeamSerializer
+from .pagination import PlayerCursorPagination
+from .serializer import PlayerRankQuerySerializer, PlayerSerializer, TeamSerializer, requested_fields
+from .services.player_vectors import refresh_player_vectors
+from .services.roster_version import LINEUPS_KEY, ROSTER_KEY, bump_roster_versions, player_write_keys, team_key
+from .services.season_stats import record_player_seasons
 
 
 
-class TeamViewSet(viewsets.ModelViewSet):
+class TeamViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Team model.
     Provides CRUD operations for teams.
@@ -21,22 +29,107 @@ class TeamViewSet(viewsets.ModelViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
 
+    def perform_create(self, serializer):
+        team = serializer.save()
+        bump_roster_versions(player_write_keys([team.id]))
 
-class PlayerViewSet(viewsets.ModelViewSet):
+    def perform_update(self, serializer):
+        team = serializer.save()
+        bump_roster_versions(player_write_keys([team.id]))
+
+    def perform_destroy(self, instance):
+        team_id = instance.id
+        instance.delete()
+        # Deleting a team cascades to its players and lineups
+        bump_roster_versions(player_write_keys([team_id]) + [LINEUPS_KEY])
+
+
+class PlayerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Player model.
     Provides CRUD operations for players.
+
+    The list accepts filters (see PlayerFilterBackend), a ?fields= sparse fieldset and opt-in
+    cursor pagination (?page_size= / ?cursor=). Reads carry ETag / Last-Modified; a list filtered
+    to one team is only invalidated by writes to that team.
     """
 
     queryset = Player.objects.all()
     serializer_class = PlayerSerializer
+    pagination_class = PlayerCursorPagination
+    filter_backends = [PlayerFilterBackend]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = requested_fields(self.request)
+        if requested:
+            # Only load the columns the sparse fieldset will render
+            columns = [f for f in PlayerSerializer.Meta.fields if f in requested and f != "id"]
+            queryset = queryset.only("id", *columns)
+        return queryset
+
+    def get_version_key(self, request):
+        team = request.query_params.get("team", "")
+        if self.action == "list" and team.isdigit():
+            return team_key(int(team))
+        return ROSTER_KEY
 
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, self._list_rows)
 
+    def _list_rows(self, request):
+        """Fast path: render rows straight from values_list() with the same schema as PlayerSerializer."""
+        mapper = PLAYER_LIST_MAPPER.subset(requested_fields(request))
+        if not mapper.fields:
+            # values_list() with no columns would select every column
+            raise ValidationError({"fields": [f"Choose from: {', '.join(PLAYER_LIST_MAPPER.keys)}."]})
+        # Cursor pagination reads its ordering columns from each row, even when ?fields= leaves them out
+        ordering = [column.lstrip("-") for column in self.paginator.ordering] if self.paginator else []
+        rows = mapper.rows(self.filter_queryset(self.get_queryset()), extra_columns=ordering)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(mapper.serialize(page))
+        return Response(mapper.serialize(rows))
+
+    def perform_create(self, serializer):
+        player = serializer.save()
+        refresh_player_vectors([player.id])
+        record_player_seasons([player.id])
+        bump_roster_versions(player_write_keys([player.team_id]))
+
+    def perform_update(self, serializer):
+        old_team_id = serializer.instance.team_id
+        # Manual edits must not be mistaken for an unchanged CSV row on the next import
+        player = serializer.save(stats_fingerprint=None)
+        refresh_player_vectors([player.id])
+        record_player_seasons([player.id])
+        # Saved lineups embed player names
+        bump_roster_versions(player_write_keys([old_team_id, player.team_id]) + [LINEUPS_KEY])
+
+    def perform_destroy(self, instance):
+        team_id = instance.team_id
+        instance.delete()
+        bump_roster_versions(player_write_keys([team_id]) + [LINEUPS_KEY])
 
     @action(detail=False, methods=["get"])
     def ranked(self, request):
-        """Get all players ranked by wos_score."""
-        from .services.player_ranking import get_ranked_players
-        ranked_players = get_ranked_players()
-        return Response({"players": ranked_players})
+        """
+        Get players ranked by wos_score, one keyset page at a time.
+
+        Query params: ascending (bool), top (page size, default 100), after (cursor from "next").
+        """
+        return self._conditional(request, self._ranked_page)
+
+    def _ranked_page(self, request):
+        from .services.player_ranking import encode_rank_cursor, get_ranked_players
+
+        query = PlayerRankQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        top = query.validated_data["top"]
+        # Fetch one extra row to know whether another page exists
+        ranked_players = get_ranked_players(
+            ascending=query.validated_data["ascending"], top_n=top + 1, after=query.validated_data.get("after")
+        )
+        next_cursor = encode_rank_cursor(ranked_players[top - 1]) if len(ranked_players) > top else None
+        return Response({"players": ranked_players[:top], "next": next_cursor})
 
@@ -1,7 +1,15 @@
 """
 django admin configuration for simulator app.
-currently empty because simulator has no database models to manage.
-if models are added later, register them here for admin interface.
+registers the stored simulation runs (read-mostly: they change only through refine).
 """
 
-# no models to register - no imports needed
+from django.contrib import admin
+
+from .models import SimulationRun
+
+
+@admin.register(SimulationRun)
+class SimulationRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "engine", "games", "created_at", "updated_at")
+    list_filter = ("engine",)
+    search_fields = ("owner",)
@@ -0,0 +1,59 @@
+"""
+helpers for the async (asgi) api endpoints.
+
+drf views are synchronous, so the async endpoints are plain django coroutine views.
+this module gives them the same request handling as @api_view: drf authentication
+(jwt / session, with session csrf checks), the IsAuthenticated permission, json
+parsing and serializer validation all run in a worker thread via sync_to_async,
+and errors come back with drf's status codes and bodies.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def _validate(request, serializer_class, require_auth):
+    """Sync part: authenticate, authorize, parse and validate. Returns (data, error response)."""
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    drf_request = Request(request, parsers=[JSONParser()], authenticators=authenticators)
+    try:
+        user = drf_request.user
+        if require_auth and not (user and user.is_authenticated):
+            raise exceptions.NotAuthenticated()
+        payload = drf_request.data
+    except exceptions.APIException as exc:
+        return None, _exception_response(exc, authenticators, request)
+
+    serializer = serializer_class(data=payload)
+    if not serializer.is_valid():
+        return None, JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return serializer.validated_data, None
+
+
+def _exception_response(exc, authenticators, request):
+    """Mirror APIView.handle_exception: 401 with WWW-Authenticate when an authenticator offers one."""
+    response = JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        header = next(
+            (auth.authenticate_header(request) for auth in authenticators if auth.authenticate_header(request)), None
+        )
+        if header:
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response["WWW-Authenticate"] = header
+        else:
+            response.status_code = status.HTTP_403_FORBIDDEN
+    return response
+
+
+async def validated_request_data(request, serializer_class, require_auth=True):
+    """
+    Validate an async view's request the way @api_view + the serializer would.
+
+    Returns:
+        (validated_data, None) on success, (None, JsonResponse) with the error otherwise
+    """
+    return await sync_to_async(_validate)(request, serializer_class, require_auth)
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(max_length=64)),
+                ('lineup_names', models.JSONField()),
+                ('probabilities', models.JSONField()),
+                ('engine', models.CharField(max_length=32)),
+                ('seed', models.CharField(max_length=40)),
+                ('stream_position', models.PositiveIntegerField()),
+                ('games', models.PositiveIntegerField()),
+                ('score_total', models.BigIntegerField()),
+                ('score_total_sq', models.BigIntegerField()),
+                ('histogram', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'simulation_runs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['owner', '-created_at'], name='simulation_runs_owner_idx')],
+            },
+        ),
+    ]
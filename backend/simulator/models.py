@@ -1,8 +1,42 @@
 """
 django models for simulator app.
-currently empty because simulator doesn't persist any data to database.
-all simulation results are computed on-demand and returned via api.
+simulation results are computed on-demand and returned via api; results of seeded
+sampling engines are also kept as SimulationRun rows (a mergeable score aggregate
+plus the random stream position) so a later refine request can add games to them.
 player data comes from roster.models.Player.
 """
 
-# no models needed - simulator is stateless
+from django.db import models
+
+
+class SimulationRun(models.Model):
+    """A stored simulation result: score aggregate, lineup and random stream position."""
+
+    # scheduler.request_owner key of the requester; only the owner may refine the run
+    owner = models.CharField(max_length=64)
+    lineup_names = models.JSONField()
+    # Outcome probabilities of the 9 batters (Batter.probs order), so refinement
+    # plays the same lineup even after the player stats change
+    probabilities = models.JSONField()
+    engine = models.CharField(max_length=32)
+    # SeedSequence entropy (up to 128 bits, so stored as text) and the batches of it
+    # played so far; refinement continues the stream from there
+    seed = models.CharField(max_length=40)
+    stream_position = models.PositiveIntegerField()
+    # Mergeable aggregate: game count, moment sums and {score: games} histogram
+    games = models.PositiveIntegerField()
+    score_total = models.BigIntegerField()
+    score_total_sq = models.BigIntegerField()
+    histogram = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "simulation_runs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "-created_at"], name="simulation_runs_owner_idx"),
+        ]
+
+    def __str__(self):
+        return f"Simulation {self.pk}: {self.games} games ({self.engine})"
@@ -1,14 +1,60 @@
 """
 serializers for validating api request inputs and formatting response outputs.
 uses django rest framework serializers to enforce constraints like 9 players required,
-game count limits (100-100k), and structure simulation results consistently.
-called by views.py for all three endpoints (by ids, names, team).
+game count limits (100-100k), optional time budgets, engine choice / seed / exact mode,
+and structure simulation results consistently.
+called by views.py for all three endpoints (by ids, names, team) and for refining a stored result.
 """
 
 from rest_framework import serializers
 
+from .services.engines import engine_names
 
-class PlayerInputSerializer(serializers.Serializer):
+
+class GameCountSerializer(serializers.Serializer):
+    """
+    Game count and time budget shared by the simulate and refine inputs.
+
+    Without num_games the request runs 10,000 games, or - when time_budget_ms is given -
+    as many games as fit in the budget (num_games is then None).
+    """
+
+    num_games = serializers.IntegerField(
+        required=False, min_value=100, max_value=100000, help_text="Number of games to simulate"
+    )
+    time_budget_ms = serializers.IntegerField(
+        required=False,
+        min_value=100,
+        max_value=60000,
+        help_text="Wall-clock budget; alone it plays as many games as fit, with num_games it caps the run",
+    )
+
+    def validate(self, attrs):
+        if "num_games" not in attrs:
+            attrs["num_games"] = None if attrs.get("time_budget_ms") else 10000
+        return attrs
+
+
+class SimulateOptionsSerializer(GameCountSerializer):
+    """Game count plus the engine selection options (see services.engines) of the simulate inputs."""
+
+    engine = serializers.ChoiceField(
+        choices=engine_names(),
+        required=False,
+        help_text="Run on this engine instead of the fastest capable one (testing and benchmarking)",
+    )
+    seed = serializers.IntegerField(
+        required=False, min_value=0, max_value=2**32 - 1, help_text="Seed for a reproducible run"
+    )
+    exact = serializers.BooleanField(
+        default=False, help_text="Compute the exact score distribution instead of simulating games"
+    )
+    refinable = serializers.BooleanField(
+        default=False, help_text="Store the result so it can be refined with more games (seeded engines only)"
+    )
+
+
+class PlayerInputSerializer(SimulateOptionsSerializer):
     """Input serializer for specifying players by ID."""
 
     player_ids = serializers.ListField(
@@ -17,12 +63,15 @@ class PlayerInputSerializer(serializers.Serializer):
         max_length=9,
         help_text="List of exactly 9 player IDs in batting order",
     )
-    num_games = serializers.IntegerField(
-        default=10000, min_value=100, max_value=100000, help_text="Number of games to simulate"
+    season = serializers.IntegerField(
+        required=False, min_value=1871, help_text="Season year to simulate from (defaults to current stats)"
+    )
+    projected = serializers.BooleanField(
+        default=False, help_text="Use regressed multi-season projections instead of the raw season line"
     )
 
 
-class PlayerNameInputSerializer(serializers.Serializer):
+class PlayerNameInputSerializer(SimulateOptionsSerializer):
     """Input serializer for specifying players by name."""
 
     player_names = serializers.ListField(
@@ -31,18 +80,25 @@ class PlayerNameInputSerializer(serializers.Serializer):
         max_length=9,
         help_text="List of exactly 9 player names in batting order",
     )
-    num_games = serializers.IntegerField(
-        default=10000, min_value=100, max_value=100000, help_text="Number of games to simulate"
+    projected = serializers.BooleanField(
+        default=False, help_text="Use regressed multi-season projections instead of the raw season line"
     )
 
 
-class TeamInputSerializer(serializers.Serializer):
+class TeamInputSerializer(SimulateOptionsSerializer):
     """Input serializer for using a team's top players."""
 
     team_id = serializers.IntegerField(help_text="Team ID to use")
-    num_games = serializers.IntegerField(
-        default=10000, min_value=100, max_value=100000, help_text="Number of games to simulate"
+    season = serializers.IntegerField(
+        required=False, min_value=1871, help_text="Season year to simulate from (defaults to current stats)"
     )
+    projected = serializers.BooleanField(
+        default=False, help_text="Use regressed multi-season projections instead of the raw season line"
+    )
+
+
+class RefineInputSerializer(GameCountSerializer):
+    """Input serializer for refining a stored result: num_games / time_budget_ms apply to the additional games."""
 
 
 class SimulationResultSerializer(serializers.Serializer):
@@ -57,4 +113,16 @@ class SimulationResultSerializer(serializers.Serializer):
     min_score = serializers.IntegerField()
     max_score = serializers.IntegerField()
     score_distribution = serializers.DictField(
-        child=serializers.IntegerField(), help_text="Mapping of score -> frequency")
+        child=serializers.IntegerField(), required=False, help_text="Mapping of score -> frequency")
+    score_probabilities = serializers.DictField(
+        child=serializers.FloatField(), required=False, help_text="Exact results: mapping of score -> probability"
+    )
+    games_requested = serializers.IntegerField(
+        allow_null=True, help_text="Games asked for (null in time-budget mode); num_games counts games played"
+    )
+    partial = serializers.BooleanField(help_text="True when the time budget ran out before every game was played")
+    engine = serializers.CharField(help_text="Engine that produced the result")
+    exact = serializers.BooleanField(help_text="True when the distribution was computed exactly (num_games is 0)")
+    result_id = serializers.IntegerField(
+        allow_null=True, help_text="Stored result to refine with more games (null when the run cannot be continued)"
+    )
@@ -7,7 +7,7 @@ simulation.py (creates simulationresult from games).
 """
 
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -22,6 +22,11 @@ class BatterStats:
     home_runs: int
     strikeouts: int
     walks: int
+    # precomputed [K, out, walk, 1B, 2B, 3B, HR] stored with the roster
+    probabilities: Optional[List[float]] = None
+    # roster.models.Player id when these are the player's current snapshot stats (lets process
+    # pools read the shared roster matrix instead of pickling the lineup)
+    player_id: Optional[int] = None
 
     @property
     def singles(self) -> int:
@@ -34,10 +39,14 @@ class BatterStats:
         Validates that probabilities don't exceed 1.0 (data quality check).
 
         Returns list of 7 probabilities: [K, out, walk, 1B, 2B, 3B, HR]
+        Uses the precomputed probabilities when they were supplied.
 
         Raises:
             ValueError: If outcome counts exceed plate appearances (invalid data)
         """
+        if self.probabilities is not None:
+            return list(self.probabilities)
+
         if self.plate_appearances == 0:
             # Default to all outs if no data
             return [0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0]
@@ -90,10 +99,27 @@ class SimulationResult:
     median_score: float
     std_dev: float
     all_scores: List[int]
+    # num_games counts games actually played; a deadline can stop a run short of games_requested
+    games_requested: Optional[int] = None
+    partial: bool = False
+    # Registered engine that produced the result (see services.engines)
+    engine: str = ""
+    # Exact results play no games: num_games is 0, all_scores empty, and
+    # score_probabilities maps each score to its probability
+    exact: bool = False
+    score_probabilities: Optional[Dict[int, float]] = None
+    # Sampled results: {score: games}. Refined results keep only this (all_scores is empty)
+    score_distribution: Optional[Dict[int, int]] = None
+    # Seeded engines: seed and stream position to continue the run from (see engines.EngineRun)
+    seed: Optional[int] = None
+    stream_position: Optional[int] = None
+    # Id of the stored SimulationRun this result can be refined through
+    result_id: Optional[int] = None
 
     def __str__(self) -> str:
         return (
-            f"Simulation Results ({self.num_games} games):\n"
+            f"Simulation Results ({'exact' if self.exact else f'{self.num_games} games'}"
+            f"{', partial' if self.partial else ''}):\n"
             f"  Average Score: {self.avg_score:.2f}\n"
             f"  Median Score: {self.median_score:.1f}\n"
             f"  Std Deviation: {self.std_dev:.2f}\n"
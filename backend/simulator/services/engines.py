@@ -0,0 +1,359 @@
+"""
+simulation engines and the registry that picks one for each request.
+
+an engine plays (or computes) the games of one lineup. each engine declares what it
+can do (EngineCapabilities) and a rough cost model; select_engine picks the cheapest
+registered engine whose capabilities cover the request (EngineRequest). a request may
+also name an engine outright (the api's `engine` field) for testing and benchmarking.
+
+registered engines:
+- scalar: the reference game-by-game engine (baseball.Game) on processes. the only
+  engine that streams running aggregates (ParallelGame.iter_play); it cannot be seeded.
+- batch-threads: the vectorized batch engine on threads in this process; no pool
+  start-up or pickling, so it wins for runs up to settings.SIMULATION_THREAD_MAX_GAMES.
+- batch-processes: the batch engine on the process pool, for large and time-budget runs.
+- markov: the exact score distribution by dynamic programming (markov_game); plays no
+  games, so it serves exact requests only.
+
+a new engine subclasses SimulationEngine and is added with register().
+"""
+
+import abc
+import math
+import os
+import sys
+from dataclasses import dataclass, fields
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import worker_pool
+
+lib_path = os.path.join(
+    os.path.dirname(__file__), "..", "..", "lib", "baseball-simulator"
+)
+if lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
+
+from batter import Batter  # type: ignore  # noqa: E402
+from batch_game import ThreadedBatchGame  # type: ignore  # noqa: E402
+from markov_game import score_distribution  # type: ignore  # noqa: E402
+from parallel_game import ChunkSizer, ParallelGame, ScoreAggregate  # type: ignore  # noqa: E402
+
+
+class EngineUnavailable(ValueError):
+    """No engine (or not the requested one) can serve the request."""
+
+
+@dataclass(frozen=True)
+class EngineCapabilities:
+    """What an engine can do; a request lists the capabilities it needs by field name."""
+
+    # The mean (and distribution) are computed exactly, not estimated from games
+    exact_mean: bool = False
+    # The result includes the full score distribution, not just the mean
+    distribution: bool = False
+    # A seed reproduces the result exactly
+    seeding: bool = False
+    # Running aggregates are available while games are still being played
+    streaming: bool = False
+    # Plays individual games, so a run has a game count and can stop short of it
+    sampling: bool = False
+    # Can play as many games as fit in a time budget
+    time_budget: bool = False
+
+    def names(self) -> FrozenSet[str]:
+        return frozenset(field.name for field in fields(self) if getattr(self, field.name))
+
+
+@dataclass(frozen=True)
+class EngineRequest:
+    """What a simulation asks of an engine."""
+
+    # None plays as many games as fit in the time budget (ignored when exact)
+    num_games: Optional[int] = 10000
+    exact: bool = False
+    seed: Optional[int] = None
+    # With a seed: batches of that seed already played (continue a stored run's stream)
+    stream_position: int = 0
+    streaming: bool = False
+
+    def required(self) -> FrozenSet[str]:
+        """Capabilities an engine needs to serve this request."""
+        needed = {"distribution", "exact_mean" if self.exact else "sampling"}
+        # An exact result is the same for every seed, so the seed is ignored there
+        if self.seed is not None and not self.exact:
+            needed.add("seeding")
+        if self.num_games is None and not self.exact:
+            needed.add("time_budget")
+        if self.streaming:
+            needed.add("streaming")
+        return frozenset(needed)
+
+
+class SharedLineup(NamedTuple):
+    """A lineup as rows of a probability table in shared memory (roster.services.shared_roster)."""
+
+    # (block name, rows, byte offset), as SharedRosterHandle.probability_table()
+    table: Tuple[str, int, int]
+    rows: Tuple[int, ...]
+
+    def game_options(self) -> dict:
+        """ParallelGame / ThreadedBatchGame keyword arguments that make workers read the table."""
+        return {"shared_table": self.table, "lineup_rows": self.rows}
+
+
+@dataclass
+class EngineRun:
+    """Output of one engine run: game scores, or exact probabilities for engines that play no games."""
+
+    scores: List[int]
+    probabilities: Optional[np.ndarray] = None
+    # Seeded engines: the seed actually used (drawn when the request had none) and where
+    # its stream stands after the run; None when the run cannot be continued
+    seed: Optional[int] = None
+    stream_position: Optional[int] = None
+
+    def aggregate(self) -> ScoreAggregate:
+        return ScoreAggregate().add(self.scores)
+
+
+class SimulationEngine(abc.ABC):
+    """
+    Base class of the registered engines.
+
+    Subclasses set name and capabilities, tune the cost model (startup_seconds,
+    games_per_second per core) and implement run / run_async. Engines running on
+    worker processes set shares_roster and read the lineup from shared memory when
+    run gets a SharedLineup.
+    """
+
+    name = ""
+    capabilities = EngineCapabilities()
+    shares_roster = False
+    startup_seconds = 0.0
+    # Rough single-core throughput, measured on a development machine
+    games_per_second = 1.0
+
+    def accepts(self, request: EngineRequest) -> bool:
+        return request.required() <= self.capabilities.names()
+
+    def usable_cores(self, cores: int) -> int:
+        return max(1, cores)
+
+    def estimate_seconds(self, request: EngineRequest, cores: int) -> float:
+        """Expected wall time of a run; a time-budget run counts as SIMULATION_BUDGET_MAX_GAMES games."""
+        games = settings.SIMULATION_BUDGET_MAX_GAMES if request.num_games is None else request.num_games
+        return self.startup_seconds + games / (self.games_per_second * self.usable_cores(cores))
+
+    @abc.abstractmethod
+    def run(
+        self, lineup: List[Batter], request: EngineRequest, cores: int, deadline: float,
+        shared: Optional[SharedLineup] = None,
+    ) -> EngineRun:
+        """
+        Play the request on up to cores cores, stopping at deadline (a time.monotonic() value).
+
+        shared (only passed to engines with shares_roster) locates the same lineup in shared memory.
+        """
+
+    @abc.abstractmethod
+    async def run_async(
+        self, lineup: List[Batter], request: EngineRequest, cores: int, deadline: float,
+        shared: Optional[SharedLineup] = None,
+    ) -> EngineRun:
+        """Same as run, awaiting the shared worker pool; cancelling withdraws the chunks not started."""
+
+
+class ScalarEngine(SimulationEngine):
+    """baseball.Game one game at a time, on processes (ParallelGame)."""
+
+    name = "scalar"
+    capabilities = EngineCapabilities(distribution=True, streaming=True, sampling=True, time_budget=True)
+    shares_roster = True
+    startup_seconds = 0.05
+    games_per_second = 1200.0
+
+    def run(self, lineup, request, cores, deadline, shared=None):
+        options = shared.game_options() if shared is not None else {}
+        if request.num_games is None:
+            game = ParallelGame(
+                lineup=lineup, num_games=settings.SIMULATION_BUDGET_MAX_GAMES, num_processes=cores, **options
+            )
+            game.play_for(deadline)
+        else:
+            game = ParallelGame(lineup=lineup, num_games=request.num_games, num_processes=cores, **options)
+            game.play(deadline=deadline, chunk_games=settings.SIMULATION_CHUNK_GAMES)
+        return EngineRun(game.get_scores())
+
+    async def run_async(self, lineup, request, cores, deadline, shared=None):
+        options = shared.game_options() if shared is not None else {}
+        if request.num_games is None:
+            game = ParallelGame(lineup=lineup, num_games=settings.SIMULATION_BUDGET_MAX_GAMES, **options)
+            sizer = ChunkSizer(deadline, max_games=game.num_games)
+            results = await worker_pool.run_sized_chunks(
+                game.worker, game.chunk_args, sizer, max_in_flight=cores, deadline=deadline
+            )
+        else:
+            game = ParallelGame(lineup=lineup, num_games=request.num_games, **options)
+            chunks = game.plan_chunks(worker_pool.chunk_count(request.num_games))
+            results = await worker_pool.run_chunks(game.worker, chunks, max_in_flight=cores, deadline=deadline)
+        game.collect(results)
+        return EngineRun(game.get_scores())
+
+
+class BatchThreadEngine(SimulationEngine):
+    """The vectorized batch engine on the shared thread pool (ThreadedBatchGame)."""
+
+    name = "batch-threads"
+    capabilities = EngineCapabilities(distribution=True, seeding=True, sampling=True, time_budget=True)
+    games_per_second = 100000.0
+    # Batches release the gil only inside numpy kernels
+    thread_scaling = 2
+
+    def usable_cores(self, cores):
+        return max(1, min(cores, self.thread_scaling))
+
+    def estimate_seconds(self, request, cores):
+        # Past the threshold the process pool is the better backend
+        if request.num_games is None or request.num_games > settings.SIMULATION_THREAD_MAX_GAMES:
+            return math.inf
+        return super().estimate_seconds(request, cores)
+
+    def executor(self):
+        return worker_pool.get_thread_executor()
+
+    def async_executor(self):
+        return self.executor()
+
+    def game(self, lineup, request, cores, shared=None) -> ThreadedBatchGame:
+        return ThreadedBatchGame(
+            probabilities=[batter.probs for batter in lineup],
+            num_games=settings.SIMULATION_BUDGET_MAX_GAMES if request.num_games is None else request.num_games,
+            # Concurrency only: the batch split (and so a seeded run's scores) ignores it
+            num_threads=self.usable_cores(cores),
+            seed=request.seed,
+            batch_games=settings.SIMULATION_BATCH_GAMES,
+            executor=self.executor(),
+            stream_position=request.stream_position if request.seed is not None else 0,
+            **(shared.game_options() if shared is not None else {}),
+        )
+
+    @staticmethod
+    def result(game: ThreadedBatchGame) -> EngineRun:
+        return EngineRun(
+            game.get_scores(), seed=game.seed_sequence.entropy, stream_position=game.stream_position
+        )
+
+    def run(self, lineup, request, cores, deadline, shared=None):
+        game = self.game(lineup, request, cores, shared)
+        if request.num_games is None:
+            game.play_for(deadline)
+        else:
+            game.play(deadline=deadline)
+        return self.result(game)
+
+    async def run_async(self, lineup, request, cores, deadline, shared=None):
+        game = self.game(lineup, request, cores, shared)
+        if request.num_games is None:
+            sizer = ChunkSizer(deadline, max_games=game.num_games, probe_games=500)
+            results = await worker_pool.run_sized_chunks(
+                game.worker, game.chunk_args, sizer, max_in_flight=game.num_threads, deadline=deadline,
+                executor=self.async_executor(),
+            )
+        else:
+            results = await worker_pool.run_chunks(
+                game.worker, game.plan_chunks(), max_in_flight=game.num_threads, deadline=deadline,
+                executor=self.async_executor(),
+            )
+        game.collect(results)
+        return self.result(game)
+
+
+class BatchProcessEngine(BatchThreadEngine):
+    """The batch engine on the shared process pool: every core, at the price of pickling each batch."""
+
+    name = "batch-processes"
+    shares_roster = True
+    startup_seconds = 0.02
+
+    def usable_cores(self, cores):
+        return max(1, cores)
+
+    def estimate_seconds(self, request, cores):
+        return SimulationEngine.estimate_seconds(self, request, cores)
+
+    def executor(self):
+        return worker_pool.get_executor()
+
+    def async_executor(self):
+        # worker_pool's own process pool, restarted if a worker died
+        return None
+
+
+class MarkovEngine(SimulationEngine):
+    """Exact score distribution from the game's Markov chain (markov_game); plays no games."""
+
+    name = "markov"
+    # Plays no games, so there is no random stream to seed (exact requests ignore their seed)
+    capabilities = EngineCapabilities(exact_mean=True, distribution=True)
+    startup_seconds = 0.05
+
+    def estimate_seconds(self, request, cores):
+        return self.startup_seconds
+
+    def run(self, lineup, request, cores, deadline, shared=None):
+        return EngineRun([], probabilities=score_distribution([batter.probs for batter in lineup]))
+
+    async def run_async(self, lineup, request, cores, deadline, shared=None):
+        return await sync_to_async(self.run, thread_sensitive=False)(lineup, request, cores, deadline)
+
+
+_engines: Dict[str, SimulationEngine] = {}
+
+
+def register(engine: SimulationEngine) -> SimulationEngine:
+    """Add (or replace) an engine under its name."""
+    _engines[engine.name] = engine
+    return engine
+
+
+def engine_names() -> List[str]:
+    return list(_engines)
+
+
+def get_engine(name: str) -> SimulationEngine:
+    try:
+        return _engines[name]
+    except KeyError:
+        raise EngineUnavailable(f"Unknown simulation engine '{name}'. Choose one of: {', '.join(_engines)}.") from None
+
+
+def select_engine(request: EngineRequest, cores: int, name: Optional[str] = None) -> SimulationEngine:
+    """
+    Engine for a request: the named one when given (it must have the needed
+    capabilities), otherwise the registered engine with the lowest estimate.
+
+    Raises:
+        EngineUnavailable: The named engine is unknown or lacks a needed capability,
+            or no engine can serve the request
+    """
+    if name is not None:
+        engine = get_engine(name)
+        missing = request.required() - engine.capabilities.names()
+        if missing:
+            raise EngineUnavailable(
+                f"Engine '{name}' cannot serve this request; it lacks: {', '.join(sorted(missing))}."
+            )
+        return engine
+    candidates = [engine for engine in _engines.values() if engine.accepts(request)]
+    if not candidates:
+        needed = ", ".join(sorted(request.required()))
+        raise EngineUnavailable(f"No simulation engine supports this request (needs {needed}).")
+    return min(candidates, key=lambda engine: engine.estimate_seconds(request, cores))
+
+
+for _engine in (MarkovEngine(), BatchThreadEngine(), BatchProcessEngine(), ScalarEngine()):
+    register(_engine)
@@ -6,7 +6,7 @@ called by views.py to get player data before running simulations.
 uses dto.py for batterstats structure.
 """
 
-from typing import List
+from typing import List, Optional
 
 from .dto import BatterStats
 
@@ -14,26 +14,49 @@ from .dto import BatterStats
 class PlayerService:
     """Service for fetching player data and converting to simulation DTOs."""
 
-    def __init__(self):
+    def __init__(self, use_projections: bool = False):
+        """
+        Args:
+            use_projections: Simulate current-snapshot players from their regressed multi-season
+                projections (roster.services.projections) instead of the raw season line
+        """
         # Import here to avoid circular dependencies
         from roster.models import Player
+        from roster.services.player_vectors import stored_outcome_probabilities
+        from roster.services.projections import apply_projections
+        from roster.services.season_stats import as_season_player, season_queryset
 
         self.Player = Player
-
-    def get_players_by_ids(self, player_ids: List[int]) -> List[BatterStats]:
+        self.stored_outcome_probabilities = stored_outcome_probabilities
+        self.season_queryset = season_queryset
+        self.as_season_player = as_season_player
+        self.apply_projections = apply_projections
+        self.use_projections = use_projections
+
+    def _snapshot_players(self, queryset) -> list:
+        """Evaluate a Player queryset, swapping in projections (same query) when enabled."""
+        if not self.use_projections:
+            return list(queryset)
+        return self.apply_projections(queryset.select_related("projection"))
+
+    def get_players_by_ids(self, player_ids: List[int], season: Optional[int] = None) -> List[BatterStats]:
         """
         Fetch players by their IDs and convert to BatterStats.
 
         Args:
             player_ids: List of player primary keys
+            season: Optional year to read from the season history instead of the current snapshot
 
         Returns:
             List of BatterStats in the same order as player_ids
 
         Raises:
-            ValueError: If any player is not found or missing required stats
+            ValueError: If any player is not found (for that season) or missing required stats
         """
-        players = self.Player.objects.filter(id__in=player_ids)
+        if season is None:
+            players = self._snapshot_players(self.Player.objects.filter(id__in=player_ids))
+        else:
+            players = [self.as_season_player(s) for s in self.season_queryset(season).filter(player_id__in=player_ids)]
 
         # Create a lookup dict to maintain order
         player_dict = {p.id: p for p in players}
@@ -47,7 +70,7 @@ class PlayerService:
         batter_stats = []
         for player_id in player_ids:
             player = player_dict[player_id]
-            stats = self._convert_to_batter_stats(player)
+            stats = self._convert_to_batter_stats(player, snapshot=season is None)
             batter_stats.append(stats)
 
         return batter_stats
@@ -62,7 +85,7 @@ class PlayerService:
         Returns:
             List of BatterStats in the same order as names
         """
-        players = self.Player.objects.filter(name__in=names)
+        players = self._snapshot_players(self.Player.objects.filter(name__in=names))
 
         player_dict = {p.name: p for p in players}
 
@@ -78,30 +101,40 @@ class PlayerService:
 
         return batter_stats
 
-    def get_team_players(self, team_id: int, limit: int = 9) -> List[BatterStats]:
+    def get_team_players(self, team_id: int, limit: int = 9, season: Optional[int] = None) -> List[BatterStats]:
         """
         Get players from a specific team, ordered by plate appearances.
 
         Args:
             team_id: Team ID
             limit: Maximum number of players to return (default 9)
+            season: Optional year; uses that season's team membership and stats
 
         Returns:
             List of BatterStats for top players by PA
         """
-        players = self.Player.objects.filter(
-            team_id=team_id).order_by("-pa")[:limit]
+        if season is None:
+            players = self._snapshot_players(self.Player.objects.filter(
+                team_id=team_id).order_by("-pa")[:limit])
+        else:
+            players = [
+                self.as_season_player(s)
+                for s in self.season_queryset(season).filter(team_id=team_id).order_by("-pa")[:limit]
+            ]
 
         if not players:
             raise ValueError(f"No players found for team {team_id}")
 
-        return [self._convert_to_batter_stats(p) for p in players]
+        return [self._convert_to_batter_stats(p, snapshot=season is None) for p in players]
 
-    def _convert_to_batter_stats(self, player) -> BatterStats:
+    def _convert_to_batter_stats(self, player, snapshot: bool = True) -> BatterStats:
         """
         Convert a Player model instance to a BatterStats domain entity.
 
-        Extracts the raw counting stats needed for simulation.
+        Extracts the raw counting stats needed for simulation and attaches the
+        precomputed outcome probabilities when the player has current ones.
+        Current-snapshot players (not a season's, not projected) keep their id,
+        so the simulator can read them from the shared roster matrix.
         """
         pa = player.pa or 0
         if pa == 0:
@@ -117,4 +150,6 @@ class PlayerService:
             home_runs=player.home_run or 0,
             strikeouts=player.strikeout or 0,
             walks=player.walk or 0,
+            probabilities=self.stored_outcome_probabilities(player),
+            player_id=player.id if snapshot and not self.use_projections else None,
         )
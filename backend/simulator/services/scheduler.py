@@ -0,0 +1,288 @@
+"""
+process-wide cpu scheduler and admission control for simulations and optimizations.
+
+every cpu-heavy job (ParallelGame runs, async pool simulations, the BaseRuns
+optimizer, bench re-optimization) reserves cores here before it starts, so one web
+process never runs more simulation work than settings.SIMULATION_CORE_BUDGET cores,
+however many requests are in flight. with several gunicorn workers, set the budget
+to cores / workers.
+
+- grants are elastic: a job asks for up to n cores and starts as soon as at least
+  one is free, receiving min(n, free); ParallelGame sizes its pool to the grant.
+- the wait queue is fair across owners (users, or client ip when anonymous):
+  owners are served round-robin, each owner's jobs in fifo order.
+- admission control: an owner may hold SIMULATION_MAX_PER_USER running + queued
+  jobs (more -> 429), and at most SIMULATION_MAX_QUEUE jobs wait in total
+  (more, or waiting longer than SIMULATION_QUEUE_TIMEOUT -> 503). both carry a
+  Retry-After hint.
+
+threads (wsgi) use reserve(), coroutines (asgi) use reserve_async(); both share
+one budget. a caller that shares another job's run (a single-flight follower)
+holds attach() instead: it counts toward its owner's limit but takes no cores.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+
+
+class SchedulerBusy(Exception):
+    """A job was not admitted; carries the http status and a retry hint."""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: int, **details):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.details = details
+
+    def response_data(self) -> dict:
+        return {"error": str(self), "retry_after": self.retry_after, **self.details}
+
+    def response_headers(self) -> dict:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class QueueFull(SchedulerBusy):
+    """The shared wait queue is full, or the job waited too long (503)."""
+
+    status_code = 503
+
+
+class UserLimitReached(SchedulerBusy):
+    """The owner already has its maximum number of jobs running or queued (429)."""
+
+    status_code = 429
+
+
+class _Waiter:
+    __slots__ = ("owner", "cores", "granted", "event", "loop", "future")
+
+    def __init__(self, owner, cores, loop=None):
+        self.owner = owner
+        self.cores = cores
+        self.granted = 0
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(self.granted)
+
+
+class SimulationScheduler:
+    """Core budget shared by every simulation/optimization job in this process."""
+
+    def __init__(self, cores: int, max_queue: int, max_per_user: int, queue_timeout: float, retry_after: int = 2):
+        self.cores = max(1, cores)
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._free = self.cores
+        self._running: Dict[str, int] = {}
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()  # owner -> waiters, in round-robin order
+        self._queued = 0
+
+    # ---- public api ----
+
+    @contextmanager
+    def reserve(self, owner: str, cores: int = 1):
+        """Block until cores are granted; yields the number granted (1..cores)."""
+        granted = self._acquire(owner, cores)
+        try:
+            yield granted
+        finally:
+            self.release(owner, granted)
+
+    @asynccontextmanager
+    async def reserve_async(self, owner: str, cores: int = 1):
+        """Await until cores are granted without blocking the event loop; yields the number granted."""
+        granted = await self._acquire_async(owner, cores)
+        try:
+            yield granted
+        finally:
+            self.release(owner, granted)
+
+    @contextmanager
+    def attach(self, owner: str):
+        """
+        Count a caller sharing another job's cores against owner's per-user limit.
+
+        Takes no cores and never queues, so it does not block.
+
+        Raises:
+            UserLimitReached: owner already has its maximum number of jobs
+        """
+        with self._lock:
+            self._check_user_limit(owner)
+            self._running[owner] = self._running.get(owner, 0) + 1
+        try:
+            yield
+        finally:
+            self.release(owner, 0)
+
+    def release(self, owner: str, cores: int) -> None:
+        with self._lock:
+            self._free += cores
+            self._running[owner] -= 1
+            if not self._running[owner]:
+                del self._running[owner]
+            woken = self._dispatch()
+        for waiter in woken:
+            waiter.wake()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cores": self.cores,
+                "free_cores": self._free,
+                "running": sum(self._running.values()),
+                "queued": self._queued,
+            }
+
+    # ---- internals ----
+
+    def _acquire(self, owner, cores):
+        with self._lock:
+            granted, waiter = self._admit(owner, cores, loop=None)
+        if waiter is None:
+            return granted
+        if waiter.event.wait(self.queue_timeout):
+            return waiter.granted
+        with self._lock:
+            if waiter.granted:
+                # granted right as the wait timed out
+                return waiter.granted
+            self._withdraw(waiter)
+        raise self._timed_out()
+
+    async def _acquire_async(self, owner, cores):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            granted, waiter = self._admit(owner, cores, loop=loop)
+        if waiter is None:
+            return granted
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._withdraw(waiter)
+            if granted:
+                if isinstance(exc, asyncio.TimeoutError):
+                    return granted
+                # cancelled after the grant: hand the cores back
+                self.release(owner, granted)
+            if isinstance(exc, asyncio.TimeoutError):
+                raise self._timed_out() from None
+            raise
+
+    def _admit(self, owner, cores, loop):
+        """Grant now, queue, or refuse. Caller holds the lock. Returns (granted, waiter)."""
+        cores = max(1, min(cores, self.cores))
+        self._check_user_limit(owner)
+        if self._free > 0 and not self._queued:
+            granted = min(cores, self._free)
+            self._free -= granted
+            self._running[owner] = self._running.get(owner, 0) + 1
+            return granted, None
+        if self._queued >= self.max_queue:
+            raise QueueFull(
+                "The simulation queue is full; try again shortly.",
+                self.retry_after,
+                queued=self._queued,
+            )
+        waiter = _Waiter(owner, cores, loop)
+        self._queues.setdefault(owner, deque()).append(waiter)
+        self._queued += 1
+        return 0, waiter
+
+    def _check_user_limit(self, owner) -> None:
+        """Refuse an owner at its job limit. Caller holds the lock."""
+        queued_for_owner = len(self._queues.get(owner, ()))
+        if self._running.get(owner, 0) + queued_for_owner >= self.max_per_user:
+            raise UserLimitReached(
+                "Too many simulations in progress for this user.",
+                self.retry_after,
+                limit=self.max_per_user,
+            )
+
+    def _dispatch(self):
+        """Hand free cores to waiting owners round-robin. Caller holds the lock; returns waiters to wake."""
+        woken = []
+        while self._free > 0 and self._queues:
+            owner, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+            # the owner goes to the back of the rotation (or leaves it when drained)
+            del self._queues[owner]
+            if queue:
+                self._queues[owner] = queue
+            waiter.granted = min(waiter.cores, self._free)
+            self._free -= waiter.granted
+            self._running[owner] = self._running.get(owner, 0) + 1
+            woken.append(waiter)
+        return woken
+
+    def _withdraw(self, waiter) -> None:
+        """Drop a waiter that gave up. Caller holds the lock."""
+        queue = self._queues.get(waiter.owner)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._queues[waiter.owner]
+
+    def _timed_out(self):
+        return QueueFull(
+            "Timed out waiting for a free simulation slot; try again shortly.",
+            self.retry_after,
+            queued=self._queued,
+        )
+
+
+_scheduler: Optional[SimulationScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SimulationScheduler:
+    """Process-wide scheduler configured from settings, created on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SimulationScheduler(
+                cores=settings.SIMULATION_CORE_BUDGET,
+                max_queue=settings.SIMULATION_MAX_QUEUE,
+                max_per_user=settings.SIMULATION_MAX_PER_USER,
+                queue_timeout=settings.SIMULATION_QUEUE_TIMEOUT,
+            )
+        return _scheduler
+
+
+def reset_scheduler() -> None:
+    """Forget the scheduler so the next get_scheduler() re-reads settings (tests)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = None
+
+
+def request_owner(request) -> str:
+    """Fair-queue owner of a request: the user, or the client address when anonymous."""
+    user = getattr(request, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        return f"user:{user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', 'unknown')}"
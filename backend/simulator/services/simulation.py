@@ -5,114 +5,515 @@ source: https://github.com/BramStoker/baseball-simulator
 converts batterstats dtos to batter probability objects,
 runs thousands of game simulations in parallel using multiprocessing (default 10k),
 calculates aggregate statistics (mean, median, std dev),
-and returns simulationresult dto.
+and returns simulationresult dto. every run has a deadline (the request's time budget,
+capped at settings.SIMULATION_MAX_SECONDS); when it passes, the games finished so far
+come back as a partial result. with a time budget and no game count, a run plays as many
+games as fit in the budget, sizing chunks from measured throughput. the engine that plays
+the games comes from the engine registry (engines.select_engine), or is named by the
+request; exact requests get the analytic distribution instead of simulated games.
+engines on worker processes read roster lineups from the shared roster matrix
+(roster.services.shared_roster.roster_publisher) instead of pickling them.
+results of seeded engines that the caller asks to keep (refinable) are stored as
+SimulationRun rows (score histogram, moment sums and random stream position); refine_result continues such a run's stream with more games
+and merges them in, so refining never replays or discards a game.
 called by views.py after player_service.py fetches data.
 """
 
-# Import Bram's baseball simulator from lib directory
-# Add lib path dynamically since it's not a proper Python package
-import os
-import statistics
-import sys
-from typing import List
+from typing import List, Optional
 
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import SimulationRun
+from . import engines, worker_pool
 from .dto import BatterStats, SimulationResult
+from .engines import Batter, EngineRequest, EngineRun, ScoreAggregate, SharedLineup
 from .player_service import PlayerService
+from .scheduler import SchedulerBusy, get_scheduler
+from .single_flight import AsyncSingleFlight, SingleFlight
+
+# Exact results list scores at least this likely
+MIN_REPORTED_PROBABILITY = 1e-9
+
 
-lib_path = os.path.join(
-    os.path.dirname(__file__), "..", "..", "lib", "baseball-simulator"
-)
-if lib_path not in sys.path:
-    sys.path.insert(0, lib_path)
 
-from batter import Batter  # type: ignore  # noqa: E402
-from parallel_game import ParallelGame  # type: ignore  # noqa: E402
+class RefinementConflict(Exception):
+    """The stored run changed (another refinement finished first) while this one was playing."""
+
+
+# Process-wide coalescing groups for in-flight simulations
+_simulation_flights = SingleFlight()
+_async_simulation_flights = AsyncSingleFlight()
 
 
 class SimulationService:
-    """Service for running baseball game simulations."""
+    """
+    Service for running baseball game simulations.
+
+    Every run reserves cores from the process-wide scheduler on behalf of owner
+    (see scheduler.request_owner), so it can raise scheduler.SchedulerBusy.
+    """
+
+    def __init__(self, owner: str = "system"):
+        self.owner = owner
 
     def simulate_lineup(
-        self, batter_stats: List[BatterStats], num_games: int = 10000
+        self,
+        batter_stats: List[BatterStats],
+        num_games: Optional[int] = 10000,
+        time_budget_ms: Optional[int] = None,
+        engine: Optional[str] = None,
+        seed: Optional[int] = None,
+        exact: bool = False,
     ) -> SimulationResult:
         """
         Simulate multiple games with the given lineup using parallel processing.
 
         Args:
             batter_stats: List of exactly 9 BatterStats objects
-            num_games: Number of games to simulate
+            num_games: Number of games to simulate; None plays as many as fit in time_budget_ms
+            time_budget_ms: Optional wall-clock budget; the games finished when it runs out
+                are returned as a partial result
+            engine: Optional registered engine name; by default the fastest capable engine
+            seed: Optional seed for a reproducible run (only seedable engines qualify)
+            exact: Compute the exact score distribution instead of simulating games
 
         Returns:
             SimulationResult with aggregate statistics
 
         Raises:
-            ValueError: If lineup doesn't have exactly 9 batters
+            ValueError: If lineup doesn't have exactly 9 batters, or neither a game count nor a budget is given
+            engines.EngineUnavailable: No engine (or not the named one) can serve the request
+            worker_pool.DeadlineExceeded: The budget ran out before any game finished
+        """
+        lineup = self._build_lineup(batter_stats)
+        request = self._engine_request(num_games, time_budget_ms, seed, exact)
+        chosen = engines.select_engine(request, settings.SIMULATION_CORE_BUDGET, name=engine)
+
+        def play():
+            deadline = worker_pool.deadline_after(self._budget_seconds(time_budget_ms))
+            matrix, shared = self._share_lineup(chosen, batter_stats, lineup)
+            try:
+                # Run simulations in parallel across the cores the scheduler grants
+                with get_scheduler().reserve(self.owner, cores=settings.SIMULATION_CORE_BUDGET) as cores:
+                    return chosen.run(lineup, request, cores, deadline, shared=shared)
+            finally:
+                self._release_lineup(matrix)
+
+        # Identical concurrent requests share one run (see single_flight). Each follower is admitted
+        # under its own owner, and retries rather than inheriting the leader's refusal
+        run = _simulation_flights.do(
+            self.flight_key(lineup, request, time_budget_ms, chosen.name), play,
+            join=self._join_flight, unshared=(SchedulerBusy,),
+        )
+        return self._build_result([stats.name for stats in batter_stats], request, run, chosen.name)
+
+    async def simulate_lineup_async(
+        self,
+        batter_stats: List[BatterStats],
+        num_games: Optional[int] = 10000,
+        time_budget_ms: Optional[int] = None,
+        engine: Optional[str] = None,
+        seed: Optional[int] = None,
+        exact: bool = False,
+    ) -> SimulationResult:
+        """
+        Same as simulate_lineup, awaiting the shared worker pool instead of forking a pool per request.
+
+        Games are split into chunks (see worker_pool.chunk_count, or sized from throughput in
+        budget mode); cancelling the awaiting task, or reaching the deadline, withdraws the
+        chunks that have not started.
+        """
+        lineup = self._build_lineup(batter_stats)
+        request = self._engine_request(num_games, time_budget_ms, seed, exact)
+        chosen = engines.select_engine(request, settings.SIMULATION_WORKERS, name=engine)
+
+        async def play():
+            deadline = worker_pool.deadline_after(self._budget_seconds(time_budget_ms))
+            # Publishing the roster reads the database
+            matrix, shared = await sync_to_async(self._share_lineup)(chosen, batter_stats, lineup)
+            try:
+                # At most one chunk per granted core is in the pool at a time
+                async with get_scheduler().reserve_async(self.owner, cores=settings.SIMULATION_WORKERS) as cores:
+                    return await chosen.run_async(lineup, request, cores, deadline, shared=shared)
+            finally:
+                self._release_lineup(matrix)
+
+        # Identical concurrent requests share one run; it is cancelled only when every caller has gone.
+        # Followers are admitted per owner as in simulate_lineup
+        run = await _async_simulation_flights.do(
+            self.flight_key(lineup, request, time_budget_ms, chosen.name), play,
+            join=self._join_flight, unshared=(SchedulerBusy,),
+        )
+        return self._build_result([stats.name for stats in batter_stats], request, run, chosen.name)
+
+    def _join_flight(self):
+        """Scheduler slot a coalesced caller holds while it shares another owner's run."""
+        return get_scheduler().attach(self.owner)
+
+    @staticmethod
+    def flight_key(
+        lineup: List[Batter], request: EngineRequest, time_budget_ms: Optional[int] = None, engine: str = ""
+    ) -> tuple:
+        """
+        Coalescing key of a simulation: the engine request, time budget, engine and each slot's
+        outcome probabilities.
+
+        Names are left out, so the same nine requested by ids, by names or by team share
+        one run (each caller still gets its own lineup names in the result).
         """
+        return (request, time_budget_ms, engine, tuple(tuple(float(p) for p in batter.probs) for batter in lineup))
+
+    @staticmethod
+    def _engine_request(
+        num_games: Optional[int], time_budget_ms: Optional[int], seed: Optional[int], exact: bool
+    ) -> EngineRequest:
+        if exact:
+            # The distribution is computed, not sampled: no game count, no budget to fill
+            return EngineRequest(num_games=None, exact=True, seed=seed)
+        if num_games is None and time_budget_ms is None:
+            raise ValueError("Either num_games or time_budget_ms is required.")
+        return EngineRequest(num_games=num_games, seed=seed)
+
+    @staticmethod
+    def _budget_seconds(time_budget_ms: Optional[int]) -> Optional[float]:
+        return None if time_budget_ms is None else time_budget_ms / 1000
+
+    def _build_lineup(self, batter_stats: List[BatterStats]) -> List[Batter]:
+        """Convert domain entities to simulator Batter objects (exactly 9)."""
         if len(batter_stats) != 9:
             raise ValueError(
                 f"Lineup must have exactly 9 batters, got {len(batter_stats)}"
             )
+        return [Batter(probabilities=stats.to_probabilities(), name=stats.name) for stats in batter_stats]
+
+    @staticmethod
+    def _share_lineup(chosen, batter_stats: List[BatterStats], lineup: List[Batter]) -> tuple:
+        """
+        (leased matrix, SharedLineup) of a snapshot lineup for an engine on worker processes.
+
+        The shared rows are used only when they hold exactly the lineup's probabilities. A matrix that
+        disagrees with the lineup just read (players written without a roster version bump) is
+        republished once; if it still disagrees, or the lineup has season or projected stats, this
+        gives (None, None) and the engine pickles the lineup. Release the matrix with _release_lineup.
+        """
+        if not chosen.shares_roster or any(stats.player_id is None for stats in batter_stats):
+            return None, None
+        from roster.services.shared_roster import roster_publisher
+
+        player_ids = [stats.player_id for stats in batter_stats]
+        probabilities = np.array([batter.probs for batter in lineup], dtype=np.float64)
+        stale = None
+        for _ in range(2):
+            try:
+                matrix = roster_publisher.acquire(stale=stale)
+            except ValueError:
+                return None, None
+            try:
+                rows = matrix.rows_for(player_ids)
+            except ValueError:
+                rows = None
+            if rows is not None and np.allclose(matrix.probabilities[rows], probabilities, rtol=0.0, atol=1e-9):
+                return matrix, SharedLineup(matrix.handle.probability_table(), tuple(rows))
+            roster_publisher.release(matrix)
+            stale = matrix
+        return None, None
+
+    @staticmethod
+    def _release_lineup(matrix) -> None:
+        if matrix is not None:
+            from roster.services.shared_roster import roster_publisher
 
-        # Convert domain entities to simulator Batter objects
-        lineup = []
-        for stats in batter_stats:
-            probabilities = stats.to_probabilities()
-            batter = Batter(probabilities=probabilities, name=stats.name)
-            lineup.append(batter)
+            roster_publisher.release(matrix)
+
+    def _build_result(
+        self, lineup_names: List[str], request: EngineRequest, run: EngineRun, engine: str
+    ) -> SimulationResult:
+        """
+        Calculate aggregate statistics from raw game scores (or from an exact distribution).
 
-        # Run simulations in parallel across multiple CPU cores
-        # This provides ~4x speedup on 4-core machines (or more on higher core counts)
-        parallel_game = ParallelGame(lineup=lineup, num_games=num_games)
-        parallel_game.play()
-        scores = parallel_game.get_scores()
+        request.num_games is the number requested (None in budget mode); fewer scores mean a
+        deadline cut the run short.
 
-        # Calculate statistics
-        avg_score = statistics.mean(scores)
-        median_score = statistics.median(scores)
-        std_dev = statistics.stdev(scores) if len(scores) > 1 else 0.0
+        Raises:
+            worker_pool.DeadlineExceeded: No game finished in time
+        """
+        if run.probabilities is not None:
+            return self._exact_result(lineup_names, run.probabilities, engine)
+        return self._aggregate_result(
+            lineup_names,
+            run.aggregate(),
+            request.num_games,
+            engine,
+            all_scores=run.scores,
+            seed=run.seed,
+            stream_position=run.stream_position,
+        )
+
+    @staticmethod
+    def _aggregate_result(
+        lineup_names: List[str],
+        aggregate: ScoreAggregate,
+        games_requested: Optional[int],
+        engine: str,
+        all_scores: Optional[List[int]] = None,
+        seed: Optional[int] = None,
+        stream_position: Optional[int] = None,
+    ) -> SimulationResult:
+        """
+        SimulationResult of a score aggregate (one run, or a stored run merged with a refinement).
+
+        Raises:
+            worker_pool.DeadlineExceeded: The aggregate holds no games
+        """
+        if not aggregate.count:
+            raise worker_pool.DeadlineExceeded(
+                "The simulation time budget ran out before any games finished; allow more time."
+            )
+        return SimulationResult(
+            lineup_names=lineup_names,
+            num_games=aggregate.count,
+            avg_score=aggregate.mean,
+            median_score=aggregate.median,
+            std_dev=aggregate.std_dev,
+            all_scores=all_scores if all_scores is not None else [],
+            games_requested=games_requested,
+            partial=games_requested is not None and aggregate.count < games_requested,
+            engine=engine,
+            score_distribution=dict(aggregate.histogram),
+            seed=seed,
+            stream_position=stream_position,
+        )
 
+    @staticmethod
+    def _exact_result(lineup_names: List[str], probabilities: np.ndarray, engine: str) -> SimulationResult:
+        """Moments and median of an exact score distribution (p[s] = probability of scoring s)."""
+        scores = np.arange(len(probabilities))
+        mean = float(scores @ probabilities)
+        variance = float((scores - mean) ** 2 @ probabilities)
+        median = int(np.searchsorted(np.cumsum(probabilities), 0.5))
         return SimulationResult(
-            lineup_names=[stats.name for stats in batter_stats],
-            num_games=num_games,
-            avg_score=avg_score,
-            median_score=median_score,
-            std_dev=std_dev,
-            all_scores=scores,
+            lineup_names=lineup_names,
+            num_games=0,
+            avg_score=mean,
+            median_score=float(median),
+            std_dev=variance**0.5,
+            all_scores=[],
+            engine=engine,
+            exact=True,
+            score_probabilities={
+                int(score): float(p) for score, p in enumerate(probabilities) if p >= MIN_REPORTED_PROBABILITY
+            },
         )
 
     def run_simulation_flow(
-        self, player_input: list | int, num_games: int, fetch_method: str
+        self,
+        player_input: list | int,
+        num_games: int | None,
+        fetch_method: str,
+        season: int | None = None,
+        projected: bool = False,
+        time_budget_ms: int | None = None,
+        refinable: bool = False,
+        **engine_options,
     ) -> SimulationResult:
         """
-        Orchestrate the simulation flow: fetch players -> validate -> simulate.
+        Orchestrate the simulation flow: fetch players -> validate -> simulate -> store.
 
         Args:
             player_input: List of IDs, names, or a team ID
-            num_games: Number of games to simulate
+            num_games: Number of games to simulate (None: as many as fit in time_budget_ms)
             fetch_method: 'ids', 'names', or 'team'
+            season: Optional year to simulate from the season history ('ids' and 'team' only)
+            projected: Use regressed multi-season projections for current-snapshot players
+            time_budget_ms: Optional wall-clock budget for the games (partial result past it)
+            refinable: Store the result (see save_result) so refine_result can add games to it
+            **engine_options: engine / seed / exact, as for simulate_lineup
 
         Returns:
-            SimulationResult object
+            SimulationResult object (with result_id when it was stored for refinement)
 
         Raises:
             ValueError: If validation fails (wrong number of players, not found, etc.)
         """
-        player_service = PlayerService()
-
         # 1. Fetch players based on method
+        batter_stats = self.fetch_batter_stats(player_input, fetch_method, season=season, projected=projected)
+
+        # 2. Run simulation (validation happens inside simulate_lineup)
+        result = self.simulate_lineup(batter_stats, num_games=num_games, time_budget_ms=time_budget_ms, **engine_options)
+
+        # 3. Keep it refinable when asked to
+        return self.save_result(result, batter_stats) if refinable else result
+
+    async def run_simulation_flow_async(
+        self,
+        player_input: list | int,
+        num_games: int | None,
+        fetch_method: str,
+        season: int | None = None,
+        projected: bool = False,
+        time_budget_ms: int | None = None,
+        refinable: bool = False,
+        **engine_options,
+    ) -> SimulationResult:
+        """
+        Async run_simulation_flow: the player lookup and the store run in a thread (the ORM
+        is sync), the games in the shared worker pool.
+        """
+        batter_stats = await sync_to_async(self.fetch_batter_stats)(
+            player_input, fetch_method, season=season, projected=projected
+        )
+        result = await self.simulate_lineup_async(
+            batter_stats, num_games=num_games, time_budget_ms=time_budget_ms, **engine_options
+        )
+        if not refinable:
+            return result
+        return await sync_to_async(self.save_result)(result, batter_stats)
+
+    def save_result(self, result: SimulationResult, batter_stats: List[BatterStats]) -> SimulationResult:
+        """
+        Store a result that can be continued (a seeded engine reported its stream position)
+        as a SimulationRun owned by self.owner, and set result.result_id. Other results are
+        returned unchanged.
+        """
+        if result.stream_position is None or result.score_distribution is None:
+            return result
+        aggregate = ScoreAggregate.from_histogram(result.score_distribution)
+        run = SimulationRun.objects.create(
+            owner=self.owner,
+            lineup_names=result.lineup_names,
+            probabilities=[stats.to_probabilities() for stats in batter_stats],
+            engine=result.engine,
+            seed=str(result.seed),
+            stream_position=result.stream_position,
+            **self._aggregate_fields(aggregate),
+        )
+        result.result_id = run.pk
+        return result
+
+    def refine_result(
+        self, result_id: int, num_games: Optional[int] = 10000, time_budget_ms: Optional[int] = None
+    ) -> SimulationResult:
+        """
+        Play num_games more games of a stored run and merge them into it.
+
+        The games continue the run's random stream from its stored position, so no game
+        repeats one already counted, and the merged aggregate replaces the stored one.
+
+        Args:
+            result_id: SimulationRun id (must belong to self.owner)
+            num_games: Additional games; None plays as many as fit in time_budget_ms
+            time_budget_ms: Optional wall-clock budget for the additional games
+
+        Returns:
+            SimulationResult of the merged run (all_scores is empty: only the aggregate is kept)
+
+        Raises:
+            SimulationRun.DoesNotExist: No such run for this owner
+            RefinementConflict: Another refinement of the run finished first
+            worker_pool.DeadlineExceeded: The budget ran out before any new game finished
+        """
+        stored, lineup, request, chosen = self._refinement(result_id, num_games, time_budget_ms)
+        deadline = worker_pool.deadline_after(self._budget_seconds(time_budget_ms))
+        with get_scheduler().reserve(self.owner, cores=settings.SIMULATION_CORE_BUDGET) as cores:
+            run = chosen.run(lineup, request, cores, deadline)
+        return self._merge_refinement(stored, num_games, run, chosen.name)
+
+    async def refine_result_async(
+        self, result_id: int, num_games: Optional[int] = 10000, time_budget_ms: Optional[int] = None
+    ) -> SimulationResult:
+        """Async refine_result: the ORM work runs in a thread, the games in the shared worker pool."""
+        stored, lineup, request, chosen = await sync_to_async(self._refinement)(result_id, num_games, time_budget_ms)
+        deadline = worker_pool.deadline_after(self._budget_seconds(time_budget_ms))
+        async with get_scheduler().reserve_async(self.owner, cores=settings.SIMULATION_WORKERS) as cores:
+            run = await chosen.run_async(lineup, request, cores, deadline)
+        return await sync_to_async(self._merge_refinement)(stored, num_games, run, chosen.name)
+
+    def _refinement(self, result_id: int, num_games: Optional[int], time_budget_ms: Optional[int]) -> tuple:
+        """(stored run, lineup, engine request, engine) of a refinement."""
+        if num_games is None and time_budget_ms is None:
+            raise ValueError("Either num_games or time_budget_ms is required.")
+        stored = SimulationRun.objects.get(pk=result_id, owner=self.owner)
+        lineup = [
+            Batter(probabilities=probs, name=name) for probs, name in zip(stored.probabilities, stored.lineup_names)
+        ]
+        request = EngineRequest(num_games=num_games, seed=int(stored.seed), stream_position=stored.stream_position)
+        # Any seedable engine continues the same stream
+        chosen = engines.select_engine(request, settings.SIMULATION_CORE_BUDGET)
+        return stored, lineup, request, chosen
+
+    def _merge_refinement(
+        self, stored: SimulationRun, num_games: Optional[int], run: EngineRun, engine: str
+    ) -> SimulationResult:
+        """
+        Merge a refinement's games into the stored run and return the merged result.
+
+        The update only applies while the run is still at the stream position the
+        refinement started from; otherwise another refinement already used that stretch
+        of the stream and these games would duplicate it.
+        """
+        if not run.scores:
+            raise worker_pool.DeadlineExceeded(
+                "The simulation time budget ran out before any additional games finished; allow more time."
+            )
+        aggregate = ScoreAggregate.from_histogram(stored.histogram).merge(run.aggregate())
+        updated = SimulationRun.objects.filter(pk=stored.pk, stream_position=stored.stream_position).update(
+            engine=engine,
+            stream_position=run.stream_position,
+            updated_at=timezone.now(),
+            **self._aggregate_fields(aggregate),
+        )
+        if not updated:
+            raise RefinementConflict("The result was refined by another request meanwhile; try again.")
+        result = self._aggregate_result(
+            stored.lineup_names,
+            aggregate,
+            None if num_games is None else stored.games + num_games,
+            engine,
+            seed=run.seed,
+            stream_position=run.stream_position,
+        )
+        result.result_id = stored.pk
+        return result
+
+    @staticmethod
+    def _aggregate_fields(aggregate: ScoreAggregate) -> dict:
+        """SimulationRun fields holding an aggregate."""
+        return {
+            "games": aggregate.count,
+            "score_total": aggregate.total,
+            "score_total_sq": aggregate.total_sq,
+            "histogram": {str(score): games for score, games in sorted(aggregate.histogram.items())},
+        }
+
+    def fetch_batter_stats(
+        self,
+        player_input: list | int,
+        fetch_method: str,
+        season: int | None = None,
+        projected: bool = False,
+    ) -> List[BatterStats]:
+        """
+        Look up the lineup's BatterStats for a simulation flow.
+
+        Raises:
+            ValueError: Invalid fetch method, players not found or team too small
+        """
+        player_service = PlayerService(use_projections=projected)
+
         if fetch_method == "ids":
-            batter_stats = player_service.get_players_by_ids(player_input)
+            batter_stats = player_service.get_players_by_ids(player_input, season=season)
         elif fetch_method == "names":
             batter_stats = player_service.get_players_by_names(player_input)
         elif fetch_method == "team":
-            batter_stats = player_service.get_team_players(player_input, limit=9)
+            batter_stats = player_service.get_team_players(player_input, limit=9, season=season)
             if len(batter_stats) < 9:
                 raise ValueError(
                     f"Team {player_input} only has {len(batter_stats)} players with valid stats. Need exactly 9."
                 )
         else:
             raise ValueError(f"Invalid fetch method: {fetch_method}")
-
-        # 2. Run simulation (validation happens inside simulate_lineup)
-        return self.simulate_lineup(batter_stats, num_games=num_games)
+        return batter_stats
 
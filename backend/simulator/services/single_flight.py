@@ -0,0 +1,151 @@
+"""
+single-flight request coalescing.
+
+when several callers ask for the same deterministic computation at the same time
+(e.g. a shared lineup link hit by many users within seconds), only the first
+caller runs it; the others attach to the running computation and receive its
+result (or exception). nothing is cached: once the computation finishes, the next
+caller with the same key starts a fresh one.
+
+followers can be admitted on their own terms (join: a context manager each
+follower holds while it waits, e.g. a scheduler slot counted against its own
+user) and can decline to inherit some of the leader's exceptions (unshared:
+they try again instead, leading a fresh computation when none is running).
+
+SingleFlight serves threads (wsgi workers), AsyncSingleFlight serves coroutines
+on one event loop (asgi workers).
+"""
+
+import asyncio
+import threading
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Type
+
+Join = Optional[Callable[[], AbstractContextManager]]
+
+
+class _Call:
+    """One in-flight computation shared by its callers."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe single-flight group."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(
+        self, key: Hashable, fn: Callable[[], Any], join: Join = None, unshared: Tuple[Type[BaseException], ...] = ()
+    ) -> Any:
+        """
+        Return fn(), sharing one execution among concurrent callers with the same key.
+
+        Args:
+            join: Optional context manager factory a follower enters before attaching and
+                holds while it waits; whatever it raises goes to that follower alone
+            unshared: Exception types of the leader's fn that followers do not inherit;
+                they try again instead (running their own fn when nothing is in flight)
+
+        Raises:
+            Whatever fn raised, in every caller attached to that execution
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    call.waiters += 1
+            if leader:
+                break
+            with join() if join is not None else nullcontext():
+                with self._lock:
+                    call.waiters += 1
+                call.done.wait()
+            if call.error is not None:
+                if isinstance(call.error, unshared):
+                    continue
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key: Hashable) -> int:
+        """Number of callers currently attached to key (0 when idle)."""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call is not None else 0
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight group for coroutines.
+
+    The computation runs as its own task; every caller awaits it through a shield,
+    so one caller being cancelled (client disconnect) does not cancel it for the
+    others. The task is cancelled only when its last caller goes away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, list] = {}  # key -> [task, waiter count]
+
+    async def do(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        join: Join = None,
+        unshared: Tuple[Type[BaseException], ...] = (),
+    ) -> Any:
+        """
+        Await factory(), sharing one execution among concurrent callers with the same key.
+
+        join and unshared work as for SingleFlight.do; join must not block.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = self._calls.get(key)
+            leader = entry is None or entry[0].get_loop() is not loop or entry[0].done() or entry[0].cancelling()
+            if leader:
+                task = loop.create_task(factory())
+                entry = self._calls[key] = [task, 0]
+                task.add_done_callback(lambda _, key=key, entry=entry: self._forget(key, entry))
+            with join() if join is not None and not leader else nullcontext():
+                entry[1] += 1
+                try:
+                    return await asyncio.shield(entry[0])
+                except asyncio.CancelledError:
+                    if not entry[0].done() and entry[1] == 1:
+                        entry[0].cancel()
+                    raise
+                except unshared:
+                    if leader:
+                        raise
+                finally:
+                    entry[1] -= 1
+
+    def in_flight(self, key: Hashable) -> int:
+        """Number of callers currently attached to key (0 when idle)."""
+        entry = self._calls.get(key)
+        return entry[1] if entry is not None and not entry[0].done() else 0
+
+    def _forget(self, key: Hashable, entry: list) -> None:
+        if self._calls.get(key) is entry:
+            del self._calls[key]
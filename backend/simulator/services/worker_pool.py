@@ -0,0 +1,224 @@
+"""
+process-wide worker pool for the async (asgi) simulate and optimize endpoints.
+
+one ProcessPoolExecutor per web process, sized by settings.SIMULATION_WORKERS, is
+shared by every request. coroutines submit cpu-bound work and await it, so the
+event loop keeps serving other requests while games are played. work is
+submitted chunk by chunk: when the awaiting task is cancelled (the asgi handler
+cancels the view when the client disconnects) every chunk that has not started
+yet is withdrawn, so an abandoned request stops occupying the pool after its
+running chunks finish.
+
+a deadline (time.monotonic() value) works the same way between chunks: when it
+passes, the chunks not yet finished are withdrawn and the finished ones are
+returned, so callers can answer with a partial result. run_sized_chunks has no
+fixed plan at all: it sizes each chunk from measured throughput and keeps going
+until the time budget is spent.
+
+small workloads skip the processes altogether: the vectorized batch engine
+releases the gil in its array kernels, so its shards run on a thread pool in this
+process (get_thread_executor, run_chunks(executor=...)) with no pickling or ipc.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_thread_executor = None
+_executor_lock = threading.Lock()
+
+
+class DeadlineExceeded(Exception):
+    """The deadline passed before any work finished, so there is no partial result to return."""
+
+
+def deadline_after(seconds: Optional[float]) -> float:
+    """time.monotonic() deadline seconds from now, capped at settings.SIMULATION_MAX_SECONDS."""
+    limit = settings.SIMULATION_MAX_SECONDS
+    return time.monotonic() + (limit if seconds is None else min(seconds, limit))
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Shared pool, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.SIMULATION_WORKERS)
+        return _executor
+
+
+def get_thread_executor() -> ThreadPoolExecutor:
+    """Shared thread pool for batch-engine shards, created on first use."""
+    global _thread_executor
+    with _executor_lock:
+        if _thread_executor is None:
+            _thread_executor = ThreadPoolExecutor(
+                max_workers=settings.SIMULATION_WORKERS, thread_name_prefix="simulation"
+            )
+        return _thread_executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Stop the shared pools; the next submission starts fresh ones."""
+    global _executor, _thread_executor
+    with _executor_lock:
+        executors = (_executor, _thread_executor)
+        _executor = _thread_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def chunk_count(num_games: int) -> int:
+    """
+    Number of chunks for a simulation: at least one per worker (to use every core)
+    and small enough that no chunk exceeds SIMULATION_CHUNK_GAMES (cancellation
+    granularity).
+    """
+    by_size = math.ceil(num_games / max(1, settings.SIMULATION_CHUNK_GAMES))
+    return max(1, min(num_games, max(settings.SIMULATION_WORKERS, by_size)))
+
+
+async def run_in_pool(fn: Callable, *args) -> Any:
+    """Run one picklable call in the shared pool and await its result."""
+    results = await run_chunks(fn, [args], star=True)
+    return results[0]
+
+
+def _submit(fn: Callable, args, star: bool, executor: Optional[Executor] = None) -> Future:
+    if executor is not None:
+        return executor.submit(fn, *args) if star else executor.submit(fn, args)
+    try:
+        executor = get_executor()
+        return executor.submit(fn, *args) if star else executor.submit(fn, args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); start over with a fresh pool
+        logger.warning("simulation pool is broken, restarting it")
+        shutdown_executor(wait=False)
+        executor = get_executor()
+        return executor.submit(fn, *args) if star else executor.submit(fn, args)
+
+
+async def run_chunks(
+    fn: Callable,
+    chunk_args: Sequence,
+    star: bool = False,
+    max_in_flight: Optional[int] = None,
+    deadline: Optional[float] = None,
+    executor: Optional[Executor] = None,
+) -> List[Any]:
+    """
+    Submit fn once per chunk and await every result, in submission order.
+
+    Args:
+        fn: Picklable module-level function
+        chunk_args: One argument per call (an args tuple per call when star is True)
+        star: Unpack each entry of chunk_args as positional arguments
+        max_in_flight: Most chunks submitted at once (the cores granted by the scheduler);
+            the next chunk is submitted as one finishes. None submits everything up front.
+        deadline: Optional time.monotonic() value; when it passes, unfinished chunks are
+            withdrawn and only the finished ones are returned
+        executor: Run the chunks here (e.g. get_thread_executor()) instead of the process pool
+
+    Returns:
+        List of results, one per chunk (one per finished chunk when the deadline passed)
+
+    Raises:
+        asyncio.CancelledError: The awaiting task was cancelled; chunks not yet
+            started are cancelled before re-raising
+    """
+    limit = max(1, max_in_flight or len(chunk_args))
+    results: List[Any] = [None] * len(chunk_args)
+    finished_at = []
+    pending = {}  # asyncio future -> (chunk index, concurrent future)
+    next_index = 0
+    try:
+        while next_index < len(chunk_args) or pending:
+            while next_index < len(chunk_args) and len(pending) < limit:
+                future = _submit(fn, chunk_args[next_index], star, executor)
+                pending[asyncio.wrap_future(future)] = (next_index, future)
+                next_index += 1
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                index, _ = pending.pop(finished)
+                results[index] = finished.result()
+                finished_at.append(index)
+            if not done:
+                # Deadline passed: keep what finished, withdraw the rest
+                _withdraw(pending)
+                return [results[index] for index in sorted(finished_at)]
+        return results
+    except BaseException:
+        # Cancellation or a failing chunk: withdraw whatever has not started
+        _withdraw(pending)
+        raise
+
+
+async def run_sized_chunks(
+    fn: Callable,
+    chunk_args_for: Callable[[int], Any],
+    sizer,
+    max_in_flight: Optional[int] = None,
+    deadline: Optional[float] = None,
+    executor: Optional[Executor] = None,
+) -> List[Any]:
+    """
+    Keep up to max_in_flight chunks in the pool, each sized by sizer, until the sizer stops.
+
+    Args:
+        fn: Picklable module-level function taking one chunk argument
+        chunk_args_for: Builds the argument of a chunk of n games
+        sizer: parallel_game.ChunkSizer (next_chunk() -> games, 0 to stop; record(games, seconds))
+        max_in_flight: Most chunks in the pool at once (defaults to SIMULATION_WORKERS)
+        deadline: Optional time.monotonic() value; unfinished chunks are withdrawn when it passes
+        executor: Run the chunks here instead of the process pool
+
+    Returns:
+        Results of the finished chunks, in completion order
+
+    Raises:
+        asyncio.CancelledError: The awaiting task was cancelled; chunks not yet
+            started are cancelled before re-raising
+    """
+    limit = max(1, max_in_flight or settings.SIMULATION_WORKERS)
+    results: List[Any] = []
+    pending = {}  # asyncio future -> (games, submit time, concurrent future)
+    try:
+        while True:
+            while len(pending) < limit:
+                games = sizer.next_chunk()
+                if games <= 0:
+                    break
+                future = _submit(fn, chunk_args_for(games), False, executor)
+                pending[asyncio.wrap_future(future)] = (games, time.monotonic(), future)
+            if not pending:
+                return results
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                _withdraw(pending)
+                return results
+            for finished in done:
+                games, submitted, _ = pending.pop(finished)
+                results.append(finished.result())
+                sizer.record(games, time.monotonic() - submitted)
+    except BaseException:
+        _withdraw(pending)
+        raise
+
+
+def _withdraw(pending) -> None:
+    for waiting, entry in pending.items():
+        entry[-1].cancel()
+        waiting.cancel()
@@ -18,6 +18,7 @@ from rest_framework.test import APIClient, APITestCase
 from roster.models import Player, Team
 
 from .services.dto import BatterStats, SimulationResult
+from .services.engines import EngineRequest, EngineRun
 from .services.player_service import PlayerService
 from .services.simulation import SimulationService
 
@@ -151,6 +152,745 @@ class SimulationServiceTestCase(TestCase):
         self.assertGreater(sem_small, sem_large)
 
 
+class SimulationCoalescingTestCase(TestCase):
+    """Test single-flight coalescing of identical in-flight simulations."""
+
+    def setUp(self):
+        self.service = SimulationService()
+        self.lineup = [
+            BatterStats(name=f"Player {i+1}", plate_appearances=600, hits=150, doubles=30,
+                        triples=3, home_runs=20, strikeouts=120, walks=60)
+            for i in range(9)
+        ]
+        self.plays = 0
+
+    def _slow_parallel_game(self):
+        """ParallelGame stand-in that takes a moment and counts runs."""
+        test = self
+
+        class SlowGame:
+            def __init__(self, lineup, num_games, **kwargs):
+                self.num_games = num_games
+
+            def play(self, **kwargs):
+                import time
+                test.plays += 1
+                time.sleep(0.3)
+
+            def get_scores(self):
+                return list(range(self.num_games))
+
+        return SlowGame
+
+    def test_concurrent_identical_requests_share_one_run(self):
+        """Threads asking for the same lineup and game count get one run's result."""
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest.mock import patch
+
+        from django.test import override_settings
+
+        renamed = [BatterStats(name=f"Alias {i}", plate_appearances=600, hits=150, doubles=30, triples=3,
+                               home_runs=20, strikeouts=120, walks=60) for i in range(9)]
+        from .services.scheduler import reset_scheduler
+
+        # Every caller counts against the owner's limit, followers included
+        reset_scheduler()
+        self.addCleanup(reset_scheduler)
+        # Keep these runs on the scalar engine the fake stands in for
+        with override_settings(SIMULATION_MAX_PER_USER=4), \
+                patch("simulator.services.engines.ParallelGame", self._slow_parallel_game()):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [pool.submit(self.service.simulate_lineup, lineup, 100, engine="scalar")
+                           for lineup in (self.lineup, self.lineup, self.lineup, renamed)]
+                results = [f.result() for f in futures]
+
+            self.assertEqual(self.plays, 1)
+            self.assertTrue(all(r.all_scores is results[0].all_scores for r in results))
+            self.assertEqual(results[3].lineup_names[0], "Alias 0")
+
+            # Nothing is cached: the next request runs again, a different game count runs separately
+            self.service.simulate_lineup(self.lineup, 100, engine="scalar")
+            self.service.simulate_lineup(self.lineup, 200, engine="scalar")
+            self.assertEqual(self.plays, 3)
+
+    def test_coalesced_callers_are_admitted_per_owner(self):
+        """Followers count against their own user limit, and do not inherit the leader's refusal."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest.mock import patch
+
+        from django.test import override_settings
+
+        from .services.scheduler import UserLimitReached, get_scheduler, reset_scheduler
+
+        reset_scheduler()
+        self.addCleanup(reset_scheduler)
+        with override_settings(SIMULATION_MAX_PER_USER=1), \
+                patch("simulator.services.engines.ParallelGame", self._slow_parallel_game()):
+            scheduler = get_scheduler()
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                # b has a job in progress (holding no cores, so the leader is not queued)
+                with scheduler.attach("b"):
+                    leader = pool.submit(SimulationService("a").simulate_lineup, self.lineup, 100, engine="scalar")
+                    time.sleep(0.1)
+                    # b is at its limit: refused on its own, the leader's run is unaffected
+                    with self.assertRaises(UserLimitReached):
+                        SimulationService("b").simulate_lineup(self.lineup, 100, engine="scalar")
+                    follower = pool.submit(SimulationService("c").simulate_lineup, self.lineup, 100, engine="scalar")
+                    time.sleep(0.1)
+                    self.assertEqual(scheduler.stats()["running"], 3)
+                    self.assertIs(leader.result().all_scores, follower.result().all_scores)
+            self.assertEqual(self.plays, 1)
+
+            # A leader refused under its owner's limit does not refuse its follower
+            with scheduler.attach("a"):
+                release = threading.Event()
+                real_reserve = scheduler.reserve
+
+                def slow_refusal(owner, cores=1):
+                    release.wait(1)
+                    return real_reserve(owner, cores)
+
+                with patch.object(scheduler, "reserve", side_effect=slow_refusal):
+                    with ThreadPoolExecutor(max_workers=2) as pool:
+                        leader = pool.submit(SimulationService("a").simulate_lineup, self.lineup, 100, engine="scalar")
+                        time.sleep(0.05)
+                        follower = pool.submit(SimulationService("c").simulate_lineup, self.lineup, 100, engine="scalar")
+                        time.sleep(0.05)
+                        release.set()
+                        with self.assertRaises(UserLimitReached):
+                            leader.result()
+                        self.assertEqual(len(follower.result().all_scores), 100)
+        self.assertEqual(self.plays, 2)
+
+    def test_async_coalescing_survives_one_cancelled_caller(self):
+        """A disconnecting caller does not cancel the run the others are waiting for."""
+        import asyncio
+        from unittest.mock import patch
+
+        from .services import simulation
+
+        started = []
+        cancelled = []
+
+        async def fake_run_chunks(fn, chunks, **options):
+            started.append(len(chunks))
+            try:
+                await asyncio.sleep(0.2)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return [[7] * chunk[1] for chunk in chunks]
+
+        async def scenario():
+            first = asyncio.ensure_future(self.service.simulate_lineup_async(self.lineup, 100))
+            second = asyncio.ensure_future(self.service.simulate_lineup_async(self.lineup, 100))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            result = await second
+            self.assertEqual(result.all_scores, [7] * 100)
+
+            # When every caller leaves, the run itself is cancelled
+            lone = asyncio.ensure_future(self.service.simulate_lineup_async(self.lineup, 300))
+            await asyncio.sleep(0.05)
+            lone.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await lone
+            await asyncio.sleep(0)
+
+        with patch.object(simulation.worker_pool, "run_chunks", fake_run_chunks):
+            asyncio.run(scenario())
+
+        self.assertEqual(len(started), 2)
+        self.assertEqual(cancelled, [True])
+
+
+class SimulationSchedulerTestCase(APITestCase):
+    """Test the process-wide core budget, fair queue and admission control."""
+
+    def setUp(self):
+        from .services.scheduler import reset_scheduler
+
+        reset_scheduler()
+        self.addCleanup(reset_scheduler)
+
+    def _scheduler(self, cores=1, max_queue=8, max_per_user=3, queue_timeout=5.0):
+        from .services.scheduler import SimulationScheduler
+
+        return SimulationScheduler(cores=cores, max_queue=max_queue, max_per_user=max_per_user, queue_timeout=queue_timeout)
+
+    def test_grants_are_elastic(self):
+        """A job gets up to the cores it asks for, but starts with whatever is free."""
+        scheduler = self._scheduler(cores=4)
+        with scheduler.reserve("a", cores=3) as first:
+            with scheduler.reserve("b", cores=4) as second:
+                self.assertEqual((first, second), (3, 1))
+                self.assertEqual(scheduler.stats()["free_cores"], 0)
+        self.assertEqual(scheduler.stats(), {"cores": 4, "free_cores": 4, "running": 0, "queued": 0})
+
+    def test_waiting_owners_are_served_round_robin(self):
+        """A user with several queued jobs cannot starve another user's single job."""
+        import asyncio
+
+        scheduler = self._scheduler(cores=1)
+        order = []
+
+        async def job(owner, tag):
+            async with scheduler.reserve_async(owner):
+                order.append(tag)
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            async with scheduler.reserve_async("a"):
+                tasks = [asyncio.ensure_future(job(owner, tag)) for owner, tag in (("a", "a1"), ("a", "a2"), ("b", "b1"))]
+                await asyncio.sleep(0.01)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(scenario())
+        self.assertEqual(order, ["a1", "b1", "a2"])
+
+    def test_admission_limits(self):
+        """Per-user limit answers 429, a full queue and a queue timeout answer 503."""
+        from .services.scheduler import QueueFull, UserLimitReached
+
+        scheduler = self._scheduler(cores=1, max_queue=0, max_per_user=1, queue_timeout=0.05)
+        with scheduler.reserve("a"):
+            with self.assertRaises(UserLimitReached) as limit:
+                with scheduler.reserve("a"):
+                    pass
+            with self.assertRaises(QueueFull) as full:
+                with scheduler.reserve("b"):
+                    pass
+        self.assertEqual(limit.exception.status_code, 429)
+        self.assertEqual(full.exception.status_code, 503)
+        self.assertEqual(limit.exception.response_headers(), {"Retry-After": "2"})
+
+        scheduler = self._scheduler(cores=1, queue_timeout=0.05)
+        with scheduler.reserve("a"):
+            with self.assertRaises(QueueFull):
+                with scheduler.reserve("b"):
+                    pass
+            self.assertEqual(scheduler.stats()["queued"], 0)
+        self.assertEqual(scheduler.stats()["free_cores"], 1)
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        """A disconnecting client's queued job is withdrawn and never takes cores."""
+        import asyncio
+
+        scheduler = self._scheduler(cores=1)
+
+        async def scenario():
+            async with scheduler.reserve_async("a"):
+                waiting = asyncio.ensure_future(scheduler.reserve_async("b").__aenter__())
+                await asyncio.sleep(0.01)
+                self.assertEqual(scheduler.stats()["queued"], 1)
+                waiting.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await waiting
+                self.assertEqual(scheduler.stats()["queued"], 0)
+
+        asyncio.run(scenario())
+        self.assertEqual(scheduler.stats(), {"cores": 1, "free_cores": 1, "running": 0, "queued": 0})
+
+    def test_views_answer_busy_with_retry_after(self):
+        """Sync and async simulate endpoints turn a refused admission into 429 + Retry-After."""
+        from django.test import override_settings
+
+        user = User.objects.create_user(username="busyuser", password="testpass123")
+        team = Team.objects.create(id=1)
+        players = [
+            Player.objects.create(name=f"Busy {i}", team=team, pa=600, hit=150, double=30,
+                                  triple=3, home_run=20, strikeout=120, walk=60)
+            for i in range(9)
+        ]
+        client = APIClient()
+        client.force_authenticate(user=user)
+        data = {"player_ids": [p.id for p in players], "num_games": 100}
+
+        with override_settings(SIMULATION_MAX_PER_USER=0):
+            for url in ("/api/v1/simulator/simulate-by-ids/", "/api/v1/simulator/async/simulate-by-ids/"):
+                response = client.post(url, data, format="json")
+                self.assertEqual(response.status_code, 429)
+                self.assertEqual(response["Retry-After"], "2")
+                self.assertEqual(response.json()["limit"], 0)
+
+
+def _sleep_then_return(seconds):
+    """Picklable pool task for the deadline tests."""
+    import time
+
+    time.sleep(seconds)
+    return seconds
+
+
+class SimulationDeadlineTestCase(TestCase):
+    """Test deadlines and partial results for long simulations."""
+
+    @classmethod
+    def tearDownClass(cls):
+        from .services import worker_pool
+
+        worker_pool.shutdown_executor()
+        super().tearDownClass()
+
+    def setUp(self):
+        from .services.scheduler import reset_scheduler
+
+        reset_scheduler()
+        self.addCleanup(reset_scheduler)
+        self.lineup = [
+            BatterStats(name=f"Player {i+1}", plate_appearances=600, hits=150, doubles=30,
+                        triples=3, home_runs=20, strikeouts=120, walks=60)
+            for i in range(9)
+        ]
+
+    def test_run_chunks_returns_finished_chunks_at_deadline(self):
+        """Past the deadline the finished chunks come back and the rest are withdrawn."""
+        import asyncio
+        import time
+
+        from .services import worker_pool
+
+        async def scenario():
+            deadline = time.monotonic() + 0.3
+            return await worker_pool.run_chunks(_sleep_then_return, [0.0, 0.0, 0.8, 0.8], max_in_flight=3, deadline=deadline)
+
+        self.assertEqual(asyncio.run(scenario()), [0.0, 0.0])
+        # A chunk that already started runs to completion; wait for it so later tests get a free pool
+        worker_pool.shutdown_executor()
+
+    def test_parallel_game_stops_at_deadline(self):
+        """ParallelGame.play(deadline=...) terminates its pool and keeps the finished chunks."""
+        import time
+
+        from batter import Batter  # type: ignore
+        from parallel_game import ParallelGame  # type: ignore
+
+        lineup = [Batter(probabilities=[0.2, 0.4, 0.1, 0.2, 0.05, 0.01, 0.04], name="B")] * 9
+        game = ParallelGame(lineup=lineup, num_games=200000, num_processes=1)
+        started = time.monotonic()
+        game.play(deadline=started + 0.5, chunk_games=200)
+
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertTrue(game.partial)
+        self.assertEqual(game.games_played % 200, 0)
+
+    def test_time_budget_returns_partial_result(self):
+        """A budget too short for the requested games yields a partial result for both paths."""
+        import asyncio
+
+        service = SimulationService()
+        # The scalar engine: the batch engines can finish 100k games within the budget
+        for result in (
+            service.simulate_lineup(self.lineup, 100000, time_budget_ms=800, engine="scalar"),
+            asyncio.run(service.simulate_lineup_async(self.lineup, 100000, time_budget_ms=800, engine="scalar")),
+        ):
+            self.assertTrue(result.partial)
+            self.assertEqual(result.games_requested, 100000)
+            self.assertEqual(result.num_games, len(result.all_scores))
+            self.assertLess(result.num_games, 100000)
+
+    def test_no_finished_games_is_a_timeout(self):
+        """When nothing finished in time the view answers 504."""
+        from .services.worker_pool import DeadlineExceeded
+
+        with self.assertRaises(DeadlineExceeded):
+            SimulationService()._build_result(["x"] * 9, EngineRequest(num_games=1000), EngineRun([]), "scalar")
+
+        with patch("simulator.views.SimulationService") as service:
+            service.return_value.run_simulation_flow.side_effect = DeadlineExceeded("too slow")
+            response = _handle_simulation_request([1] * 9, 1000, "ids", time_budget_ms=100)
+        self.assertEqual(response.status_code, 504)
+
+
+class SimulationTimeBudgetTestCase(APITestCase):
+    """Test the time-budget mode: as many games as fit in time_budget_ms."""
+
+    @classmethod
+    def tearDownClass(cls):
+        from .services import worker_pool
+
+        worker_pool.shutdown_executor()
+        super().tearDownClass()
+
+    def setUp(self):
+        from .services.scheduler import reset_scheduler
+
+        reset_scheduler()
+        self.addCleanup(reset_scheduler)
+        self.lineup = [
+            BatterStats(name=f"Player {i+1}", plate_appearances=600, hits=150, doubles=30,
+                        triples=3, home_runs=20, strikeouts=120, walks=60)
+            for i in range(9)
+        ]
+
+    def test_chunk_sizer_follows_measured_throughput(self):
+        """Probe first, then chunks of about target_seconds at the measured rate, shrinking near the deadline."""
+        import time
+
+        from parallel_game import ChunkSizer  # type: ignore
+
+        sizer = ChunkSizer(time.monotonic() + 10, max_games=1000, probe_games=20, target_seconds=0.1)
+        self.assertEqual(sizer.next_chunk(), 20)
+        sizer.record(20, 0.01)  # 2000 games/s
+        self.assertEqual(sizer.next_chunk(), 200)
+        sizer.record(200, 0.2)  # 1000 games/s, smoothed to 1500
+        self.assertEqual(sizer.next_chunk(), 150)
+        sizer.rate = 1e6
+        self.assertEqual(sizer.next_chunk(), 1000 - 370)  # capped by max_games
+        self.assertEqual(sizer.next_chunk(), 0)
+
+        closing = ChunkSizer(time.monotonic() + 0.07, probe_games=20, target_seconds=1.0, margin_seconds=0.02)
+        closing.rate = 1000
+        self.assertLessEqual(closing.next_chunk(), 50)
+        self.assertEqual(ChunkSizer(time.monotonic() - 1).next_chunk(), 0)
+
+    def test_budget_mode_fills_the_budget(self):
+        """Without num_games both paths play games until the budget is nearly spent."""
+        import asyncio
+        import time
+
+        service = SimulationService()
+        for run in (
+            lambda: service.simulate_lineup(self.lineup, None, time_budget_ms=600),
+            lambda: asyncio.run(service.simulate_lineup_async(self.lineup, None, time_budget_ms=600)),
+        ):
+            started = time.monotonic()
+            result = run()
+            self.assertLess(time.monotonic() - started, 1.5)
+            self.assertGreater(result.num_games, 0)
+            self.assertEqual(result.num_games, len(result.all_scores))
+            self.assertIsNone(result.games_requested)
+            self.assertFalse(result.partial)
+
+        with self.assertRaises(ValueError):
+            service.simulate_lineup(self.lineup, None)
+
+    def test_budget_mode_endpoint(self):
+        """time_budget_ms alone selects budget mode; no field at all keeps the 10,000 game default."""
+        from .serializers import PlayerInputSerializer
+
+        user = User.objects.create_user(username="budgetuser", password="testpass123")
+        team = Team.objects.create(id=1)
+        players = [
+            Player.objects.create(name=f"Budget {i}", team=team, pa=600, hit=150, double=30,
+                                  triple=3, home_run=20, strikeout=120, walk=60)
+            for i in range(9)
+        ]
+        ids = [p.id for p in players]
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.post("/api/v1/simulator/simulate-by-ids/", {"player_ids": ids, "time_budget_ms": 300}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["games_requested"])
+        self.assertFalse(response.data["partial"])
+        self.assertEqual(sum(response.data["score_distribution"].values()), response.data["num_games"])
+
+        serializer = PlayerInputSerializer(data={"player_ids": ids})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data["num_games"], 10000)
+
+
+class BatchEngineTestCase(TestCase):
+    """Test the vectorized batch engine and its thread-pool backend."""
+
+    PROBS = [0.2, 0.45, 0.08, 0.16, 0.05, 0.005, 0.055]
+
+    @classmethod
+    def tearDownClass(cls):
+        from .services import worker_pool
+
+        worker_pool.shutdown_executor()
+        super().tearDownClass()
+
+    def setUp(self):
+        from .services.scheduler import reset_scheduler
+
+        reset_scheduler()
+        self.addCleanup(reset_scheduler)
+
+    def test_matches_scalar_engine(self):
+        """Same rules as baseball.Game: the score distributions agree."""
+        from batch_game import BatchGame  # type: ignore
+        from batter import Batter  # type: ignore
+        from parallel_game import play_games_chunk  # type: ignore
+
+        game_params = {"nr_innings": 9}
+        scalar = np.array(play_games_chunk(([Batter(probabilities=self.PROBS, name="B")] * 9, 2000, game_params)))
+        batch = BatchGame([self.PROBS] * 9, **game_params).play(50000, np.random.default_rng(7))
+
+        standard_error = scalar.std() / np.sqrt(len(scalar))
+        self.assertLess(abs(scalar.mean() - batch.mean()), 4 * standard_error)
+        self.assertAlmostEqual(batch.std(), scalar.std(), delta=0.3)
+        self.assertEqual(batch.min(), 0)
+
+    def test_transition_rules(self):
+        """Spot checks of the base-state tables against baseball.Game."""
+        from batch_game import DOUBLE, HOMERUN, NEXT_BASES, RUNS, SINGLE, WALK  # type: ignore
+
+        self.assertEqual((NEXT_BASES[WALK, 7, 0, 0], RUNS[WALK, 7, 0, 0]), (7, 1))
+        self.assertEqual((NEXT_BASES[HOMERUN, 7, 0, 0], RUNS[HOMERUN, 7, 0, 0]), (0, 4))
+        # 1st and 2nd, single: runner scores from 2nd and the runner from 1st takes 3rd
+        self.assertEqual((NEXT_BASES[SINGLE, 3, 1, 1], RUNS[SINGLE, 3, 1, 1]), (5, 1))
+        # bases loaded, double, runner from 1st scores too
+        self.assertEqual((NEXT_BASES[DOUBLE, 7, 1, 0], RUNS[DOUBLE, 7, 1, 0]), (2, 3))
+
+    def test_threaded_runs_are_reproducible_and_stop_at_deadline(self):
+        """A seed fixes the scores however threads interleave; a deadline drops unfinished batches."""
+        import time
+
+        from batch_game import ThreadedBatchGame  # type: ignore
+
+        runs = []
+        for _ in range(2):
+            game = ThreadedBatchGame([self.PROBS] * 9, num_games=5000, num_threads=3, seed=11, batch_games=700)
+            game.play()
+            runs.append(game.get_scores())
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(len(runs[0]), 5000)
+
+        game = ThreadedBatchGame([self.PROBS] * 9, num_games=5000, num_threads=2, batch_games=500)
+        game.play(deadline=time.monotonic() - 1)
+        self.assertTrue(game.partial)
+
+    def test_batch_engine_time_budget_and_seed_stream(self):
+        """play_for fills a budget; chunk_args continues the seed stream instead of repeating it."""
+        import time
+
+        from batch_game import ThreadedBatchGame  # type: ignore
+
+        game = ThreadedBatchGame([self.PROBS] * 9, num_games=10**6, num_threads=1, seed=5)
+        started = time.monotonic()
+        game.play_for(started + 0.3)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertGreater(game.games_played, 500)
+
+        game = ThreadedBatchGame([self.PROBS] * 9, num_games=400, seed=5)
+        first, second = game.chunk_args(200)[2], game.chunk_args(200)[2]
+        self.assertNotEqual(first.generate_state(2).tolist(), second.generate_state(2).tolist())
+
+
+class EngineRegistryTestCase(TestCase):
+    """Test engine capabilities, automatic selection and the override parameter."""
+
+    PROBS = [0.2, 0.45, 0.08, 0.16, 0.05, 0.005, 0.055]
+
+    def setUp(self):
+        self.lineup = [
+            BatterStats(name=f"Player {i+1}", plate_appearances=600, hits=150, doubles=30,
+                        triples=3, home_runs=20, strikeouts=120, walks=60)
+            for i in range(9)
+        ]
+
+    def test_selection_follows_capabilities_and_cost(self):
+        """Small runs go to threads, large and budget runs to processes, exact runs to markov."""
+        from django.test import override_settings
+
+        from .services.engines import EngineRequest, EngineUnavailable, SimulationEngine, get_engine, select_engine
+
+        with override_settings(SIMULATION_THREAD_MAX_GAMES=20000):
+            self.assertEqual(select_engine(EngineRequest(num_games=5000), cores=1).name, "batch-threads")
+            self.assertEqual(select_engine(EngineRequest(num_games=100000), cores=1).name, "batch-processes")
+            self.assertEqual(select_engine(EngineRequest(num_games=None), cores=4).name, "batch-processes")
+            self.assertEqual(select_engine(EngineRequest(exact=True), cores=4).name, "markov")
+            # Markov plays no seeded stream; an exact request's seed changes nothing
+            self.assertNotIn("seeding", get_engine("markov").capabilities.names())
+            self.assertEqual(select_engine(EngineRequest(exact=True, seed=3), cores=4).name, "markov")
+            self.assertEqual(select_engine(EngineRequest(streaming=True), cores=4).name, "scalar")
+
+            # The override wins over cost, but not over capabilities
+            self.assertEqual(select_engine(EngineRequest(num_games=100000), 1, name="batch-threads").name,
+                             "batch-threads")
+            with self.assertRaises(EngineUnavailable):
+                select_engine(EngineRequest(num_games=1000, seed=3), 1, name="scalar")
+            with self.assertRaises(EngineUnavailable):
+                select_engine(EngineRequest(num_games=1000), 1, name="markov")
+            with self.assertRaises(EngineUnavailable):
+                select_engine(EngineRequest(num_games=1000), 1, name="warp-drive")
+
+        # An engine must implement both run and run_async
+        class SyncOnlyEngine(SimulationEngine):
+            def run(self, lineup, request, cores, deadline, shared=None):
+                return None
+
+        for engine_class in (SimulationEngine, SyncOnlyEngine):
+            with self.assertRaises(TypeError):
+                engine_class()
+
+    def test_markov_engine_matches_simulation(self):
+        """The exact distribution sums to 1 and its mean sits within a few standard errors of the batch engine."""
+        import numpy as np
+
+        from batch_game import BatchGame  # type: ignore
+        from markov_game import expected_score, score_distribution  # type: ignore
+
+        distribution = score_distribution([self.PROBS] * 9)
+        self.assertAlmostEqual(float(distribution.sum()), 1.0, places=9)
+        scores = BatchGame([self.PROBS] * 9).play(100000, np.random.default_rng(8))
+        standard_error = scores.std() / np.sqrt(len(scores))
+        self.assertLess(abs(expected_score([self.PROBS] * 9) - scores.mean()), 4 * standard_error)
+
+    def test_service_seeded_and_exact_runs(self):
+        """A seed reproduces a service run on either batch backend; exact runs report probabilities."""
+        service = SimulationService()
+        first = service.simulate_lineup(self.lineup, 3000, seed=9)
+        again = service.simulate_lineup(self.lineup, 3000, seed=9, engine="batch-processes")
+        self.assertEqual(first.engine, "batch-threads")
+        self.assertEqual(first.all_scores, again.all_scores)
+
+        exact = service.simulate_lineup(self.lineup, exact=True)
+        self.assertTrue(exact.exact)
+        self.assertEqual((exact.engine, exact.num_games, exact.all_scores), ("markov", 0, []))
+        self.assertAlmostEqual(sum(exact.score_probabilities.values()), 1.0, places=6)
+        self.assertLess(abs(exact.avg_score - first.avg_score), 4 * first.std_dev / 3000**0.5)
+
+    def test_seeded_scores_do_not_depend_on_core_grant(self):
+        """A seed gives the same scores however many cores the scheduler grants; threads stay capped."""
+        import asyncio
+        import time
+
+        from django.test import override_settings
+
+        from .services.engines import EngineRequest, get_engine
+
+        lineup = SimulationService()._build_lineup(self.lineup)
+        request = EngineRequest(num_games=3000, seed=21)
+        engine = get_engine("batch-threads")
+        with override_settings(SIMULATION_BATCH_GAMES=500):
+            self.assertEqual(engine.game(lineup, request, cores=8).num_threads, engine.thread_scaling)
+            runs = [engine.run(lineup, request, cores, time.monotonic() + 30) for cores in (1, 6, 8)]
+            runs.append(asyncio.run(engine.run_async(lineup, request, 6, time.monotonic() + 30)))
+        self.assertEqual(len(runs[0].scores), 3000)
+        for run in runs[1:]:
+            self.assertEqual(run.scores, runs[0].scores)
+            self.assertEqual(run.stream_position, runs[0].stream_position)
+
+    def test_api_engine_override_and_exact(self):
+        """The simulate endpoint honours engine/exact and rejects an engine lacking a capability."""
+        from unittest.mock import patch
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username="engines", password="pw"))
+        url = "/api/v1/simulator/simulate-by-ids/"
+        body = {"player_ids": list(range(1, 10)), "num_games": 500}
+        with patch("simulator.services.simulation.SimulationService.fetch_batter_stats", return_value=self.lineup):
+            response = client.post(url, {**body, "engine": "batch-processes", "seed": 1}, format="json")
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual((response.data["engine"], response.data["num_games"]), ("batch-processes", 500))
+
+            response = client.post(url, {**body, "exact": True}, format="json")
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertTrue(response.data["exact"])
+            self.assertNotIn("score_distribution", response.data)
+            self.assertGreater(len(response.data["score_probabilities"]), 10)
+
+            self.assertEqual(client.post(url, {**body, "engine": "scalar", "seed": 1}, format="json").status_code, 400)
+            self.assertEqual(client.post(url, {**body, "engine": "nope"}, format="json").status_code, 400)
+
+
+class SimulationRefinementTestCase(APITestCase):
+    """Test stored results and refining them with more games."""
+
+    def setUp(self):
+        self.lineup = [
+            BatterStats(name=f"Player {i+1}", plate_appearances=600, hits=150, doubles=30,
+                        triples=3, home_runs=20, strikeouts=120, walks=60)
+            for i in range(9)
+        ]
+        self.service = SimulationService(owner="user:1")
+
+    def _stored(self, num_games=2000, **options):
+        result = self.service.simulate_lineup(self.lineup, num_games, **options)
+        return self.service.save_result(result, self.lineup)
+
+    def test_refine_continues_the_stream_and_merges(self):
+        """A refinement plays the games after the stored stream position and merges the histograms."""
+        from collections import Counter
+
+        from batch_game import ThreadedBatchGame  # type: ignore
+
+        from .models import SimulationRun
+
+        first = self._stored(2000, seed=4)
+        stored = SimulationRun.objects.get(pk=first.result_id)
+        self.assertEqual((stored.games, stored.stream_position), (2000, first.stream_position))
+
+        refined = self.service.refine_result(first.result_id, 3000)
+        # The same continuation played directly: same seed, starting where the stored run stopped
+        continuation = ThreadedBatchGame(
+            [stats.to_probabilities() for stats in self.lineup], num_games=3000, num_threads=1, seed=4,
+            stream_position=stored.stream_position,
+        )
+        continuation.play()
+        expected = Counter(first.score_distribution) + Counter(continuation.get_scores())
+
+        self.assertEqual(refined.score_distribution, dict(expected))
+        self.assertEqual((refined.num_games, refined.games_requested, refined.all_scores), (5000, 5000, []))
+        self.assertEqual(refined.result_id, first.result_id)
+        stored.refresh_from_db()
+        self.assertEqual(stored.games, 5000)
+        self.assertEqual(stored.stream_position, continuation.stream_position)
+        self.assertEqual(stored.score_total, sum(score * games for score, games in expected.items()))
+
+    def test_unseeded_runs_are_stored_and_conflicts_are_refused(self):
+        """Unseeded batch runs record their drawn seed; a refinement from a stale position is rejected."""
+        from .models import SimulationRun
+        from .services.simulation import RefinementConflict
+
+        first = self._stored(1000)
+        self.assertIsNotNone(first.result_id)
+        stale = SimulationRun.objects.get(pk=first.result_id)
+        self.service.refine_result(first.result_id, 500)
+
+        run = EngineRun([3] * 10, seed=int(stale.seed), stream_position=stale.stream_position + 1)
+        with self.assertRaises(RefinementConflict):
+            self.service._merge_refinement(stale, 10, run, "batch-threads")
+        self.assertEqual(SimulationRun.objects.get(pk=first.result_id).games, 1500)
+
+        # Nothing to continue: the scalar engine is unseeded, exact results play no games
+        self.assertIsNone(self._stored(100, engine="scalar").result_id)
+        self.assertIsNone(self._stored(exact=True).result_id)
+
+    def test_refine_endpoints(self):
+        """A refinable simulate returns a result_id; refine merges more games, only for the owner (sync and async)."""
+        from unittest.mock import patch
+
+        from .models import SimulationRun
+
+        owner = User.objects.create_user(username="refiner", password="pw")
+        other = User.objects.create_user(username="stranger", password="pw")
+        client = APIClient()
+        client.force_authenticate(owner)
+        body = {"player_ids": list(range(1, 10)), "num_games": 500}
+        with patch("simulator.services.simulation.SimulationService.fetch_batter_stats", return_value=self.lineup):
+            # Ordinary simulations are not stored
+            for url in ("/api/v1/simulator/simulate-by-ids/", "/api/v1/simulator/async/simulate-by-ids/"):
+                response = client.post(url, body, format="json")
+                self.assertEqual(response.status_code, 200, response.content)
+                self.assertIsNone(response.json()["result_id"])
+            self.assertFalse(SimulationRun.objects.exists())
+
+            response = client.post("/api/v1/simulator/simulate-by-ids/", {**body, "refinable": True}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        result_id = response.data["result_id"]
+        self.assertEqual(SimulationRun.objects.count(), 1)
+
+        response = client.post(f"/api/v1/simulator/results/{result_id}/refine/", {"num_games": 1000}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["num_games"], 1500)
+        self.assertEqual(sum(response.data["score_distribution"].values()), 1500)
+
+        response = client.post(f"/api/v1/simulator/async/results/{result_id}/refine/", {"num_games": 500}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["num_games"], 2000)
+
+        client.force_authenticate(other)
+        response = client.post(f"/api/v1/simulator/results/{result_id}/refine/", {"num_games": 1000}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+
 class SimulationFlowTestCase(TestCase):
     """Test SimulationService.run_simulation_flow orchestration."""
 
@@ -400,6 +1140,101 @@ class SimulatorAPITestCase(APITestCase):
         self.assertIn("error", response.data)
 
 
+class AsyncSimulatorAPITestCase(APITestCase):
+    """Test the async (ASGI) simulate endpoints and the shared worker pool."""
+
+    @classmethod
+    def tearDownClass(cls):
+        from .services import worker_pool
+
+        worker_pool.shutdown_executor()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="asyncuser", password="testpass123")
+        self.team = Team.objects.create(id=1)
+        self.players = [
+            Player.objects.create(
+                name=f"Player {i+1}", team=self.team, pa=600, hit=150, double=30,
+                triple=3, home_run=20, strikeout=120, walk=60,
+            )
+            for i in range(9)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_async_matches_sync_response_shape(self):
+        """The async endpoints return the sync endpoints' body."""
+        data = {"player_ids": [p.id for p in self.players], "num_games": 120}
+        sync_response = self.client.post("/api/v1/simulator/simulate-by-ids/", data, format="json")
+        async_response = self.client.post("/api/v1/simulator/async/simulate-by-ids/", data, format="json")
+
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        body = async_response.json()
+        self.assertEqual(set(body), set(sync_response.data))
+        self.assertEqual(body["num_games"], 120)
+        self.assertEqual(sum(body["score_distribution"].values()), 120)
+
+        team_response = self.client.post(
+            "/api/v1/simulator/async/simulate-by-team/", {"team_id": self.team.id, "num_games": 100}, format="json"
+        )
+        self.assertEqual(team_response.status_code, status.HTTP_200_OK)
+
+    def test_async_errors(self):
+        """Validation, lookup and auth errors keep their status codes."""
+        url = "/api/v1/simulator/async/simulate-by-names/"
+        response = self.client.post(url, {"num_games": 100}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("player_names", response.json())
+
+        names = [p.name for p in self.players[:8]] + ["Nobody"]
+        response = self.client.post(url, {"player_names": names, "num_games": 100}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.json())
+
+        response = APIClient().post(url, {"num_games": 100}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    def test_cancel_withdraws_queued_chunks(self):
+        """Cancelling the awaiting task cancels every chunk that has not started."""
+        import asyncio
+        import time
+
+        from django.test import override_settings
+
+        from .services import worker_pool
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(worker_pool.run_chunks(time.sleep, [0.3] * 10))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        worker_pool.shutdown_executor()
+        with override_settings(SIMULATION_WORKERS=1):
+            try:
+                started = time.monotonic()
+                asyncio.run(cancel_midway())
+                worker_pool.shutdown_executor(wait=True)
+                # the running chunk and at most one prefetched chunk finish; 10 x 0.3 s would not
+                self.assertLess(time.monotonic() - started, 1.5)
+            finally:
+                worker_pool.shutdown_executor()
+
+    def test_chunk_count(self):
+        """Chunks cover every worker and stay under the cancellation granularity."""
+        from django.test import override_settings
+
+        from .services import worker_pool
+
+        with override_settings(SIMULATION_WORKERS=4, SIMULATION_CHUNK_GAMES=500):
+            self.assertEqual(worker_pool.chunk_count(100), 4)
+            self.assertEqual(worker_pool.chunk_count(10000), 20)
+            self.assertEqual(worker_pool.chunk_count(2), 2)
+
+
 class ParallelGameIntegrationTests(TestCase):
     """Integration tests for ParallelGame comparing statistics."""
 
@@ -465,6 +1300,40 @@ class ParallelGameIntegrationTests(TestCase):
             self.assertGreaterEqual(score, 0)
             self.assertIsInstance(score, (int, np.integer))
 
+    def test_iter_play_streams_merged_aggregates(self):
+        """iter_play yields a growing aggregate per chunk that matches the final scores."""
+        import statistics
+
+        lineup = [self.Batter(probabilities=[0.2, 0.4, 0.1, 0.2, 0.05, 0.01, 0.04], name="B")] * 9
+        game = self.ParallelGame(lineup=lineup, num_games=1000, num_processes=2)
+        self.assertEqual(game.auto_chunk_count(), 8)
+        self.assertEqual(game.auto_chunk_count(chunk_games=50), 20)
+
+        counts = [aggregate.count for aggregate in game.iter_play()]
+        self.assertEqual(len(counts), 8)
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], 1000)
+
+        scores = game.get_scores()
+        from parallel_game import ScoreAggregate  # type: ignore
+
+        aggregate = ScoreAggregate().add(scores[:300]).merge(ScoreAggregate().add(scores[300:]))
+        self.assertAlmostEqual(aggregate.mean, statistics.mean(scores))
+        self.assertAlmostEqual(aggregate.std_dev, statistics.stdev(scores))
+        self.assertEqual(aggregate.median, statistics.median(scores))
+        self.assertEqual(ScoreAggregate().add([3, 1, 2]).median, 2)
+        self.assertEqual((aggregate.min_score, aggregate.max_score), (min(scores), max(scores)))
+
+    def test_iter_play_can_stop_early(self):
+        """Breaking out of iter_play terminates the pool and keeps the chunks played so far."""
+        lineup = [self.Batter(probabilities=[0.2, 0.4, 0.1, 0.2, 0.05, 0.01, 0.04], name="B")] * 9
+        game = self.ParallelGame(lineup=lineup, num_games=50000, num_processes=1)
+        for aggregate in game.iter_play(chunk_games=200):
+            if aggregate.count >= 400:
+                break
+        self.assertTrue(game.partial)
+        self.assertEqual(game.games_played, aggregate.count)
+
     def test_parallel_speedup(self):
         """Test that parallel execution uses multiple cores."""
         probs = [0.15, 0.35, 0.10, 0.20, 0.10, 0.05, 0.05]
@@ -515,6 +1384,8 @@ class SimulatorViewsCoverageTest(TestCase):
         # Setup mock result with empty scores
         mock_result = MagicMock()
         mock_result.all_scores = []  # Empty list triggers the error
+        mock_result.exact = False
+        mock_result.score_distribution = None
         mock_service.run_simulation_flow.return_value = mock_result
 
         # Call the helper directly
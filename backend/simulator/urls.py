@@ -4,6 +4,8 @@ maps three url patterns to view functions in views.py:
 - simulate-by-ids/ -> simulate_by_player_ids
 - simulate-by-names/ -> simulate_by_player_names
 - simulate-by-team/ -> simulate_by_team
+- results/<id>/refine/ -> refine_result
+plus async/ versions of each for asgi deployments.
 """
 
 from django.urls import path
@@ -17,4 +19,10 @@ urlpatterns = [
     path("simulate-by-names/", views.simulate_by_player_names,
          name="simulate-by-names"),
     path("simulate-by-team/", views.simulate_by_team, name="simulate-by-team"),
+    path("results/<int:result_id>/refine/", views.refine_result, name="refine-result"),
+    # async (asgi) versions: same bodies, games run in the shared worker pool
+    path("async/simulate-by-ids/", views.simulate_by_player_ids_async, name="simulate-by-ids-async"),
+    path("async/simulate-by-names/", views.simulate_by_player_names_async, name="simulate-by-names-async"),
+    path("async/simulate-by-team/", views.simulate_by_team_async, name="simulate-by-team-async"),
+    path("async/results/<int:result_id>/refine/", views.refine_result_async, name="refine-result-async"),
 ]
@@ -1,6 +1,8 @@
 """
 rest api endpoints for running baseball simulations.
-three endpoints: simulate by player ids, player names, or team id.
+three endpoints: simulate by player ids, player names, or team id,
+plus refining a stored result with more games,
+each also served as an async (asgi) view under async/.
 uses player_service.py to fetch data from database,
 simulation.py to run monte carlo simulations,
 and serializers.py to validate input/output.
@@ -13,61 +15,169 @@ https://github.com/BramStoker/baseball-simulator
 import logging
 from collections import Counter
 
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .serializers import PlayerInputSerializer, PlayerNameInputSerializer, SimulationResultSerializer, TeamInputSerializer
-from .services.simulation import SimulationService
+from .async_api import validated_request_data
+from .serializers import (
+    PlayerInputSerializer,
+    PlayerNameInputSerializer,
+    RefineInputSerializer,
+    SimulationResultSerializer,
+    TeamInputSerializer,
+)
+from .services.scheduler import SchedulerBusy, request_owner
+from .services.simulation import RefinementConflict, SimulationService
+from .services.worker_pool import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
 
-def _handle_simulation_request(player_input, num_games, fetch_method):
+def _engine_options(validated_data):
+    """engine / seed / exact / refinable of a validated simulate request, as run_simulation_flow keyword arguments."""
+    return {
+        "engine": validated_data.get("engine"),
+        "seed": validated_data.get("seed"),
+        "exact": validated_data.get("exact", False),
+        "refinable": validated_data.get("refinable", False),
+    }
+
+
+def _handle_simulation_request(
+    player_input,
+    num_games,
+    fetch_method,
+    season=None,
+    projected=False,
+    owner="system",
+    time_budget_ms=None,
+    engine_options=None,
+):
     """
     Helper to handle simulation request with consistent error handling.
-    Delegates orchestration to SimulationService.
+    Delegates orchestration to SimulationService; owner is the scheduler's fair-queue key.
     """
+    headers = None
     try:
-        service = SimulationService()
-        result = service.run_simulation_flow(player_input, num_games, fetch_method)
-
-        # Handle empty scores edge case
-        if not result.all_scores:
-            return Response(
-                {"error": "Simulation produced no results. Please check input data."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-        response_data = {
-            "lineup": result.lineup_names,
-            "num_games": result.num_games,
-            "avg_score": result.avg_score,
-            "median_score": result.median_score,
-            "std_dev": result.std_dev,
-            "min_score": min(result.all_scores),
-            "max_score": max(result.all_scores),
-            "score_distribution": _calculate_distribution(result.all_scores),
-        }
-
-        output_serializer = SimulationResultSerializer(response_data)
-        return Response(output_serializer.data, status=status.HTTP_200_OK)
-
-    except ValueError as e:
+        service = SimulationService(owner=owner)
+        result = service.run_simulation_flow(
+            player_input,
+            num_games,
+            fetch_method,
+            season=season,
+            projected=projected,
+            time_budget_ms=time_budget_ms,
+            **(engine_options or {}),
+        )
+        body, status_code = _simulation_response(result)
+    except Exception as e:
+        body, status_code, headers = _simulation_error(e)
+    return Response(body, status=status_code, headers=headers)
+
+
+async def _handle_simulation_request_async(
+    player_input,
+    num_games,
+    fetch_method,
+    season=None,
+    projected=False,
+    owner="system",
+    time_budget_ms=None,
+    engine_options=None,
+):
+    """
+    Async twin of _handle_simulation_request for the ASGI endpoints: awaits the shared
+    worker pool, so the event loop keeps serving other requests meanwhile. Client
+    disconnects cancel this coroutine, which withdraws the queued game chunks.
+    """
+    headers = None
+    try:
+        service = SimulationService(owner=owner)
+        result = await service.run_simulation_flow_async(
+            player_input,
+            num_games,
+            fetch_method,
+            season=season,
+            projected=projected,
+            time_budget_ms=time_budget_ms,
+            **(engine_options or {}),
+        )
+        body, status_code = _simulation_response(result)
+    except Exception as e:
+        body, status_code, headers = _simulation_error(e)
+    return JsonResponse(body, status=status_code, headers=headers)
+
+
+def _simulation_response(result):
+    """(body, status) for a finished simulation."""
+    # Handle empty scores edge case
+    if not (result.all_scores or result.score_distribution or result.exact):
+        return (
+            {"error": "Simulation produced no results. Please check input data."},
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    response_data = {
+        "lineup": result.lineup_names,
+        "num_games": result.num_games,
+        "avg_score": result.avg_score,
+        "median_score": result.median_score,
+        "std_dev": result.std_dev,
+        "games_requested": result.games_requested,
+        "partial": result.partial,
+        "engine": result.engine,
+        "exact": result.exact,
+        "result_id": result.result_id,
+    }
+    if result.exact:
+        response_data["min_score"] = min(result.score_probabilities)
+        response_data["max_score"] = max(result.score_probabilities)
+        response_data["score_probabilities"] = result.score_probabilities
+    else:
+        # Refined results keep only the histogram; fresh ones have it as well as the scores
+        distribution = result.score_distribution or _calculate_distribution(result.all_scores)
+        response_data["min_score"] = min(distribution)
+        response_data["max_score"] = max(distribution)
+        response_data["score_distribution"] = distribution
+
+    output_serializer = SimulationResultSerializer(response_data)
+    return output_serializer.data, status.HTTP_200_OK
+
+
+def _simulation_error(e):
+    """(body, status, headers) for a simulation that raised."""
+    if isinstance(e, SchedulerBusy):
+        # Not admitted: per-user limit (429) or queue full / wait timed out (503)
+        logger.info(f"Simulation not admitted: {str(e)}")
+        return e.response_data(), e.status_code, e.response_headers()
+    if isinstance(e, ObjectDoesNotExist):
+        return {"error": "Simulation result not found."}, status.HTTP_404_NOT_FOUND, None
+    if isinstance(e, RefinementConflict):
+        return {"error": str(e)}, status.HTTP_409_CONFLICT, None
+    if isinstance(e, DeadlineExceeded):
+        logger.info(f"Simulation deadline passed: {str(e)}")
+        return {"error": str(e)}, status.HTTP_504_GATEWAY_TIMEOUT, None
+    if isinstance(e, ValueError):
         # Player not found or data validation error
         logger.warning(f"ValueError in simulation: {str(e)}")
-        return Response(
+        return (
             {"error": str(e), "hint": "Check that all player IDs/names exist and have valid statistics."},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-    except Exception as e:
-        # Unexpected error - log for debugging
-        logger.error(f"Simulation failed: {str(e)}", exc_info=True)
-        return Response(
-            {"error": "An unexpected error occurred during simulation.", "detail": str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status.HTTP_400_BAD_REQUEST,
+            None,
         )
+    # Unexpected error - log for debugging
+    logger.error(f"Simulation failed: {str(e)}", exc_info=True)
+    return (
+        {"error": "An unexpected error occurred during simulation.", "detail": str(e)},
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        None,
+    )
 
 
 @api_view(["POST"])
@@ -80,7 +190,14 @@ def simulate_by_player_ids(request):
     POST /api/simulator/simulate-by-ids/
     Body: {
         "player_ids": [1, 2, 3, 4, 5, 6, 7, 8, 9],
-        "num_games": 1000
+        "num_games": 1000,
+        "season": 2024,  (optional)
+        "projected": false,  (optional)
+        "time_budget_ms": 2000,  (optional)
+        "engine": "batch-threads",  (optional)
+        "seed": 42,  (optional)
+        "exact": false,  (optional)
+        "refinable": false  (optional)
     }
     """
     serializer = PlayerInputSerializer(data=request.data)
@@ -90,7 +207,19 @@ def simulate_by_player_ids(request):
     player_ids = serializer.validated_data["player_ids"]
     num_games = serializer.validated_data["num_games"]
 
-    return _handle_simulation_request(player_ids, num_games, fetch_method="ids")
+    season = serializer.validated_data.get("season")
+    projected = serializer.validated_data["projected"]
+
+    return _handle_simulation_request(
+        player_ids,
+        num_games,
+        fetch_method="ids",
+        season=season,
+        projected=projected,
+        owner=request_owner(request),
+        time_budget_ms=serializer.validated_data.get("time_budget_ms"),
+        engine_options=_engine_options(serializer.validated_data),
+    )
 
 
 @api_view(["POST"])
@@ -103,7 +232,13 @@ def simulate_by_player_names(request):
     POST /api/simulator/simulate-by-names/
     Body: {
         "player_names": ["Player One", "Player Two", ...],
-        "num_games": 1000
+        "num_games": 1000,
+        "projected": false,  (optional)
+        "time_budget_ms": 2000,  (optional)
+        "engine": "batch-threads",  (optional)
+        "seed": 42,  (optional)
+        "exact": false,  (optional)
+        "refinable": false  (optional)
     }
     """
     serializer = PlayerNameInputSerializer(data=request.data)
@@ -113,7 +248,17 @@ def simulate_by_player_names(request):
     player_names = serializer.validated_data["player_names"]
     num_games = serializer.validated_data["num_games"]
 
-    return _handle_simulation_request(player_names, num_games, fetch_method="names")
+    projected = serializer.validated_data["projected"]
+
+    return _handle_simulation_request(
+        player_names,
+        num_games,
+        fetch_method="names",
+        projected=projected,
+        owner=request_owner(request),
+        time_budget_ms=serializer.validated_data.get("time_budget_ms"),
+        engine_options=_engine_options(serializer.validated_data),
+    )
 
 
 @api_view(["POST"])
@@ -126,7 +271,14 @@ def simulate_by_team(request):
     POST /api/simulator/simulate-by-team/
     Body: {
         "team_id": 1,
-        "num_games": 1000
+        "num_games": 1000,
+        "season": 2024,  (optional)
+        "projected": false,  (optional)
+        "time_budget_ms": 2000,  (optional)
+        "engine": "batch-threads",  (optional)
+        "seed": 42,  (optional)
+        "exact": false,  (optional)
+        "refinable": false  (optional)
     }
     """
     serializer = TeamInputSerializer(data=request.data)
@@ -136,7 +288,152 @@ def simulate_by_team(request):
     team_id = serializer.validated_data["team_id"]
     num_games = serializer.validated_data["num_games"]
 
-    return _handle_simulation_request(team_id, num_games, fetch_method="team")
+    season = serializer.validated_data.get("season")
+    projected = serializer.validated_data["projected"]
+
+    return _handle_simulation_request(
+        team_id,
+        num_games,
+        fetch_method="team",
+        season=season,
+        projected=projected,
+        owner=request_owner(request),
+        time_budget_ms=serializer.validated_data.get("time_budget_ms"),
+        engine_options=_engine_options(serializer.validated_data),
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def refine_result(request, result_id):
+    """
+    Add games to a stored simulation result (the result_id of an earlier response).
+
+    Only the additional games are played, continuing the stored run's random stream,
+    and they are merged into the stored aggregate; the response describes the merged
+    result (num_games = all games so far). Only results simulated with "refinable": true
+    are stored; those of the scalar engine and exact results never are.
+
+    POST /api/v1/simulator/results/<result_id>/refine/
+    Body: {
+        "num_games": 90000,  (optional, additional games)
+        "time_budget_ms": 2000  (optional)
+    }
+    404 when the result does not exist or belongs to another user,
+    409 when another refinement of it finished first.
+    """
+    serializer = RefineInputSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    headers = None
+    try:
+        service = SimulationService(owner=request_owner(request))
+        result = service.refine_result(
+            result_id,
+            num_games=serializer.validated_data["num_games"],
+            time_budget_ms=serializer.validated_data.get("time_budget_ms"),
+        )
+        body, status_code = _simulation_response(result)
+    except Exception as e:
+        body, status_code, headers = _simulation_error(e)
+    return Response(body, status=status_code, headers=headers)
+
+
+# ---- ASGI endpoints ----
+# Same request bodies, responses and errors as the views above, served as coroutine
+# views (see async_api) so a worker process can keep many simulations in flight.
+
+
+@csrf_exempt
+@require_POST
+async def simulate_by_player_ids_async(request):
+    """
+    Async version of simulate_by_player_ids.
+
+    POST /api/v1/simulator/async/simulate-by-ids/
+    """
+    data, error = await validated_request_data(request, PlayerInputSerializer)
+    if error is not None:
+        return error
+    return await _handle_simulation_request_async(
+        data["player_ids"],
+        data["num_games"],
+        fetch_method="ids",
+        season=data.get("season"),
+        projected=data["projected"],
+        owner=request_owner(request),
+        time_budget_ms=data.get("time_budget_ms"),
+        engine_options=_engine_options(data),
+    )
+
+
+@csrf_exempt
+@require_POST
+async def simulate_by_player_names_async(request):
+    """
+    Async version of simulate_by_player_names.
+
+    POST /api/v1/simulator/async/simulate-by-names/
+    """
+    data, error = await validated_request_data(request, PlayerNameInputSerializer)
+    if error is not None:
+        return error
+    return await _handle_simulation_request_async(
+        data["player_names"],
+        data["num_games"],
+        fetch_method="names",
+        projected=data["projected"],
+        owner=request_owner(request),
+        time_budget_ms=data.get("time_budget_ms"),
+        engine_options=_engine_options(data),
+    )
+
+
+@csrf_exempt
+@require_POST
+async def simulate_by_team_async(request):
+    """
+    Async version of simulate_by_team.
+
+    POST /api/v1/simulator/async/simulate-by-team/
+    """
+    data, error = await validated_request_data(request, TeamInputSerializer)
+    if error is not None:
+        return error
+    return await _handle_simulation_request_async(
+        data["team_id"],
+        data["num_games"],
+        fetch_method="team",
+        season=data.get("season"),
+        projected=data["projected"],
+        owner=request_owner(request),
+        time_budget_ms=data.get("time_budget_ms"),
+        engine_options=_engine_options(data),
+    )
+
+
+@csrf_exempt
+@require_POST
+async def refine_result_async(request, result_id):
+    """
+    Async version of refine_result.
+
+    POST /api/v1/simulator/async/results/<result_id>/refine/
+    """
+    data, error = await validated_request_data(request, RefineInputSerializer)
+    if error is not None:
+        return error
+    headers = None
+    try:
+        service = SimulationService(owner=request_owner(request))
+        result = await service.refine_result_async(
+            result_id, num_games=data["num_games"], time_budget_ms=data.get("time_budget_ms")
+        )
+        body, status_code = _simulation_response(result)
+    except Exception as e:
+        body, status_code, headers = _simulation_error(e)
+    return JsonResponse(body, status=status_code, headers=headers)
 
 
 def _calculate_distribution(scores):